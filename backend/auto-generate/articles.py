@@ -0,0 +1 @@
+../shared/articles.py
\ No newline at end of file
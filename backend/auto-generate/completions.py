@@ -0,0 +1 @@
+../shared/completions.py
\ No newline at end of file
@@ -0,0 +1 @@
+../shared/db.py
\ No newline at end of file
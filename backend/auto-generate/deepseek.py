@@ -0,0 +1 @@
+../shared/deepseek.py
\ No newline at end of file
@@ -0,0 +1 @@
+../shared/embeddings.py
\ No newline at end of file
@@ -1,103 +1,304 @@
 '''
-Business: Auto-generate news articles for all categories (triggered by cron/scheduler)
-Args: event with httpMethod GET
-Returns: HTTP response with generation results
+Business: Queue news for every category, drain the generation job queue and run maintenance (triggered by cron/scheduler)
+Args: event with httpMethod GET and optional drain=1 query param; context with request_id
+Returns: HTTP response with results of every job processed in this run
 '''
 
 import json
 import os
-import psycopg2
+from db import acquire_connection, release_connection
 from psycopg2.extras import RealDictCursor
-from typing import Dict, Any, List
-import requests
-from difflib import SequenceMatcher
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from plagiarism import minhash_signature, find_near_duplicate, index_buckets, backfill_signatures, make_duplicate_guard
+from embeddings import embed, count_stems, find_semantic_duplicate, similar_titles, backfill_stem_counts, backfill_embeddings
+from summary import build_summary
+from sections import split_sections, store_sections, backfill_sections
+from jobs import enqueue_job, claim_job, seconds_until_next_job, set_progress, complete_jobs, fail_job, defer_job, reap_stale_jobs
+from views import rollup_views
+from stats import apply_article_stats, refresh_trending
+from articles import CATEGORIES, prefetch_category_state, insert_articles
+from partitions import ensure_partitions, archive_partitions
+from covers import render_covers, cover_url, store_covers, backfill_covers
+from completions import prompt_hash, get_cached_completion, store_completion, consume_completion, consume_completions
+from tracing import Trace, log_event, log_generations
+from concurrent.futures import ThreadPoolExecutor
+import time
+import uuid
 
-CATEGORIES = ['IT', 'Криптовалюта', 'Игры', 'Финансы', 'Мир']
+WRITE_LOCK_ID = 7_100_016
+# each maintenance step gives up instead of queueing readers behind its ACCESS EXCLUSIVE locks (DETACH/DROP PARTITION)
+MAINTENANCE_LOCK_TIMEOUT_MS = int(os.environ.get('MAINTENANCE_LOCK_TIMEOUT_MS', '2000'))
+MAINTENANCE_STEPS = [
+    ensure_partitions,
+    archive_partitions,
+    backfill_signatures,
+    backfill_stem_counts,
+    backfill_embeddings,
+    backfill_covers,
+    backfill_sections,
+    reap_stale_jobs,
+    rollup_views,
+    refresh_trending
+]
 
-def check_similarity(text1: str, text2: str) -> float:
-    return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+class GenerationRejected(ValueError):
+    def __init__(self, message: str, usage: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.usage = usage
 
-def check_plagiarism(content: str, existing_articles: List[Dict]) -> bool:
-    for article in existing_articles:
-        similarity = check_similarity(content, article['content'])
-        if similarity > 0.7:
-            return True
-    return False
+def get_concurrency_limit() -> int:
+    return max(1, int(os.environ.get('AUTO_GENERATE_CONCURRENCY', len(CATEGORIES))))
 
-def generate_with_deepseek(category: str, existing_titles: List[str]) -> Dict[str, str]:
-    api_key = os.environ.get('DEEPSEEK_API_KEY')
-    if not api_key:
-        raise ValueError('DEEPSEEK_API_KEY not configured')
-    
-    existing_titles_text = '\n'.join([f"- {title}" for title in existing_titles[-10:]])
-    
-    prompt = f"""Создай уникальную новостную статью на русском языке для категории "{category}".
+def get_time_budget() -> float:
+    return float(os.environ.get('WORKER_TIME_BUDGET', '240'))
 
-ВАЖНО: Не повторяй эти темы:
-{existing_titles_text}
+def get_retry_headroom() -> float:
+    return float(os.environ.get('JOB_RETRY_HEADROOM_SECONDS', '60'))
 
-Требования:
-- Статья должна быть на 5000+ слов
-- Тема должна быть актуальной и интересной
-- Используй реальные технологии/компании/события
-- Структура: введение, основная часть с подзаголовками, заключение
-- Пиши профессионально, как журналист топового издания
+def check_novelty(cur, title: str, content: str, category: str, usage: Optional[Dict[str, Any]] = None) -> Tuple[List[int], List[float]]:
+    signature = minhash_signature(content)
+    embedding = embed(cur, f'{title}\n{content}')
+    check_stored_duplicates(cur, signature, embedding, category, usage)
+    return signature, embedding
 
-Верни ТОЛЬКО JSON без дополнительного текста:
-{{
-  "title": "Заголовок новости",
-  "content": "Полный текст статьи 5000+ слов"
-}}"""
+def check_stored_duplicates(cur, signature: List[int], embedding: List[float], category: str, usage: Optional[Dict[str, Any]] = None) -> None:
+    duplicate_id = find_near_duplicate(cur, signature)
+    if duplicate_id is not None:
+        raise GenerationRejected(f'Generated content near-duplicates article {duplicate_id}', usage)
+    similar = find_semantic_duplicate(cur, embedding, category)
+    if similar is not None:
+        raise GenerationRejected(f"Generated content repeats the topic of article {similar['id']} (cosine {similar['similarity']:.2f})", usage)
 
-    response = requests.post(
-        'https://api.deepseek.com/v1/chat/completions',
-        headers={
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
-        },
-        json={
-            'model': 'deepseek-chat',
-            'messages': [
-                {'role': 'system', 'content': 'Ты профессиональный журналист, пишущий длинные аналитические статьи. Отвечай ТОЛЬКО валидным JSON.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            'temperature': 0.9,
-            'max_tokens': 8000
-        },
-        timeout=120
-    )
+def build_outcome(
+    job: Dict[str, Any], trace: Trace, usage: Optional[Dict[str, Any]], completion_id: int,
+    title: str, content: str, signature: List[int], embedding: List[float]
+) -> Dict[str, Any]:
+    word_count = len(content.split())
+    summary = build_summary(content, word_count)
+    sections = split_sections(content)
+    with trace.stage('cover'):
+        cover = render_covers(title, job['category'])
     
-    if response.status_code != 200:
-        raise Exception(f'DeepSeek API error: {response.text}')
+    return {
+        'job': job,
+        'trace': trace,
+        'usage': usage,
+        'completion_id': completion_id,
+        'cover': cover,
+        'sections': sections,
+        'article': {
+            'title': title,
+            'content': content,
+            'category': job['category'],
+            'image_url': cover_url(cover[0]),
+            'word_count': word_count,
+            'view_count': 0,
+            'embedding': embedding,
+            'minhash': signature,
+            'section_count': len(sections),
+            'stems_counted': True,
+            **summary
+        }
+    }
+
+def process_job(
+    conn, cur, job: Dict[str, Any], trace: Trace, existing_titles: List[str], breaker: Any = None, deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    from deepseek import build_payload, generate_with_deepseek
+    
+    job_id = job['id']
+    category = job['category']
+    
+    with trace.stage('fetch_existing'):
+        prompt_titles = similar_titles(cur, category) or existing_titles
+        set_progress(cur, job_id, 'generating')
+        conn.commit()
     
-    result = response.json()
-    content = result['choices'][0]['message']['content']
+    def on_title(title: str) -> None:
+        set_progress(cur, job_id, 'generating', title)
+        conn.commit()
     
-    content = content.strip()
-    if content.startswith('```json'):
-        content = content[7:]
-    if content.startswith('```'):
-        content = content[3:]
-    if content.endswith('```'):
-        content = content[:-3]
-    content = content.strip()
+    payload = build_payload(category, prompt_titles)
+    cache_key = prompt_hash(payload)
+    with trace.stage('llm_request'):
+        article_data = get_cached_completion(cur, cache_key)
+        if article_data is not None:
+            completion_id = article_data['id']
+            trace.context['reused_completion'] = completion_id
+        else:
+            article_data = generate_with_deepseek(
+                category,
+                prompt_titles,
+                on_title=on_title,
+                should_abort=make_duplicate_guard(cur, existing_titles + prompt_titles),
+                breaker=breaker,
+                deadline=deadline
+            )
+            completion_id = store_completion(cur, cache_key, job_id, payload['model'], article_data)
+    parse_ms = article_data.get('parse_ms') or 0.0
+    trace.add('llm_request', -parse_ms)
+    trace.add('parse', parse_ms)
+    usage = article_data.get('usage')
     
-    article_data = json.loads(content)
-    return article_data
+    set_progress(cur, job_id, 'checking', article_data['title'])
+    conn.commit()
+    
+    title = article_data['title']
+    content = article_data['content']
+    try:
+        with trace.stage('similarity_check'):
+            signature, embedding = check_novelty(cur, title, content, category, usage)
+    except GenerationRejected:
+        consume_completion(cur, completion_id)
+        conn.commit()
+        raise
+    
+    return build_outcome(job, trace, usage, completion_id, title, content, signature, embedding)
 
-def generate_image(title: str) -> str:
-    return f'https://picsum.photos/seed/{hash(title)}/1200/630'
+def run_maintenance(conn, cur) -> List[str]:
+    failed = []
+    for step in MAINTENANCE_STEPS:
+        try:
+            cur.execute("SELECT set_config('lock_timeout', %s, true)", (f'{MAINTENANCE_LOCK_TIMEOUT_MS}ms',))
+            step(cur)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            log_event('maintenance_failed', step=step.__name__, error=str(e))
+            failed.append(step.__name__)
+    return failed
 
-def check_recent_generation(cur, category: str) -> bool:
-    five_minutes_ago = datetime.now() - timedelta(minutes=5)
-    cur.execute(
-        """SELECT COUNT(*) as count FROM news_articles 
-           WHERE category = %s AND created_at > %s""",
-        (category, five_minutes_ago)
+def drain_queue(
+    db_url: str, worker_id: str, deadline: float, category_state: Dict[str, Dict[str, Any]], breaker: Any
+) -> List[Dict[str, Any]]:
+    from llm_client import CircuitOpen
+    
+    connect_started = time.perf_counter()
+    conn = acquire_connection(db_url)
+    connect_ms = (time.perf_counter() - connect_started) * 1000
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    results = []
+    
+    try:
+        while time.monotonic() < deadline:
+            job = claim_job(cur, worker_id)
+            if not job:
+                # Wait in-run for a backed-off retry when it is due early enough to finish before the deadline
+                wait = seconds_until_next_job(cur)
+                conn.commit()
+                if wait is None or time.monotonic() + wait + get_retry_headroom() > deadline:
+                    break
+                time.sleep(max(wait, 0.5))
+                continue
+            conn.commit()
+            
+            trace = Trace('generation', job_id=job['id'], category=job['category'], worker=worker_id)
+            if not results:
+                trace.add('db_connect', connect_ms)
+            
+            try:
+                existing_titles = category_state.get(job['category'], {}).get('titles', [])
+                outcome = process_job(conn, cur, job, trace, existing_titles, breaker, deadline)
+            except CircuitOpen as e:
+                conn.rollback()
+                results.extend(store_outcomes(conn, cur, [
+                    {'job': job, 'trace': trace, 'usage': None, 'deferred': str(e), 'retry_after': e.retry_after}
+                ]))
+                break
+            except Exception as e:
+                conn.rollback()
+                outcome = {'job': job, 'trace': trace, 'usage': getattr(e, 'usage', None), 'error': str(e)}
+            results.extend(store_outcomes(conn, cur, [outcome]))
+    finally:
+        cur.close()
+        release_connection(conn)
+    
+    return results
+
+def store_outcomes(conn, cur, outcomes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    try:
+        return write_outcomes(conn, cur, outcomes)
+    except Exception as e:
+        conn.rollback()
+        return write_outcomes(conn, cur, [
+            {'job': outcome['job'], 'trace': outcome['trace'], 'usage': outcome.get('usage'), 'error': f'Failed to store the result: {e}'}
+            for outcome in outcomes
+        ])
+
+def write_outcomes(conn, cur, outcomes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    failed = [outcome for outcome in outcomes if 'error' in outcome]
+    deferred = [outcome for outcome in outcomes if 'deferred' in outcome]
+    
+    started = time.perf_counter()
+    # one writer at a time, so every draft is re-checked against the articles other workers committed during this run
+    cur.execute("SELECT pg_advisory_xact_lock(%s)", (WRITE_LOCK_ID,))
+    prepared = []
+    for outcome in outcomes:
+        if 'article' not in outcome:
+            continue
+        article = outcome['article']
+        try:
+            check_stored_duplicates(cur, article['minhash'], article['embedding'], article['category'], outcome['usage'])
+        except GenerationRejected as e:
+            consume_completion(cur, outcome['completion_id'])
+            failed.append({'job': outcome['job'], 'trace': outcome['trace'], 'usage': outcome['usage'], 'error': str(e)})
+            continue
+        prepared.append(outcome)
+    
+    article_ids = insert_articles(cur, [outcome['article'] for outcome in prepared])
+    if prepared:
+        store_covers(cur, [outcome['cover'] for outcome in prepared])
+        apply_article_stats(cur, [outcome['article'] for outcome in prepared])
+        count_stems(cur, [f"{outcome['article']['title']}\n{outcome['article']['content']}" for outcome in prepared])
+        store_sections(cur, [(article_id, outcome['sections']) for article_id, outcome in zip(article_ids, prepared)])
+        index_buckets(cur, [(article_id, outcome['article']['minhash']) for article_id, outcome in zip(article_ids, prepared)])
+        consume_completions(cur, [(outcome['completion_id'], article_id) for article_id, outcome in zip(article_ids, prepared)])
+        complete_jobs(cur, [(outcome['job']['id'], article_id) for article_id, outcome in zip(article_ids, prepared)])
+    statuses = [fail_job(cur, outcome['job'], outcome['error']) for outcome in failed]
+    for outcome in deferred:
+        defer_job(cur, outcome['job'], outcome['deferred'], outcome['retry_after'])
+    insert_ms = (time.perf_counter() - started) * 1000
+    
+    entries = []
+    for outcome in prepared:
+        outcome['trace'].add('insert', insert_ms)
+        entries.append({'category': outcome['job']['category'], 'status': 'success', 'job_id': outcome['job']['id'], 'trace': outcome['trace'], 'usage': outcome['usage']})
+    for outcome in failed:
+        entries.append({'category': outcome['job']['category'], 'status': 'error', 'job_id': outcome['job']['id'], 'trace': outcome['trace'], 'usage': outcome['usage'], 'error_message': outcome['error']})
+    for outcome in deferred:
+        entries.append({'category': outcome['job']['category'], 'status': 'circuit_open', 'job_id': outcome['job']['id'], 'trace': outcome['trace'], 'error_message': outcome['deferred']})
+    log_generations(cur, entries)
+    conn.commit()
+    
+    results = [
+        {
+            'category': outcome['job']['category'],
+            'status': 'success',
+            'job_id': outcome['job']['id'],
+            'article_id': article_id,
+            'word_count': outcome['article']['word_count']
+        }
+        for article_id, outcome in zip(article_ids, prepared)
+    ]
+    results.extend(
+        {
+            'category': outcome['job']['category'],
+            'status': 'error' if status == 'failed' else 'retrying',
+            'job_id': outcome['job']['id'],
+            'message': outcome['error']
+        }
+        for status, outcome in zip(statuses, failed)
+    )
+    results.extend(
+        {
+            'category': outcome['job']['category'],
+            'status': 'deferred',
+            'job_id': outcome['job']['id'],
+            'message': outcome['deferred']
+        }
+        for outcome in deferred
     )
-    result = cur.fetchone()
-    return result['count'] > 0
+    return results
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method = event.get('httpMethod', 'GET')
@@ -124,87 +325,56 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'isBase64Encoded': False
         }
     
-    conn = psycopg2.connect(db_url)
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
+    query_params = event.get('queryStringParameters') or {}
+    drain_only = query_params.get('drain') == '1'
     results = []
+    worker_prefix = getattr(context, 'request_id', None) or uuid.uuid4().hex
+    trace = Trace('auto-generate', request_id=worker_prefix, drain_only=drain_only)
     
-    for category in CATEGORIES:
-        if check_recent_generation(cur, category):
-            results.append({
-                'category': category,
-                'status': 'skipped',
-                'message': 'Recently generated'
-            })
-            continue
-        
-        cur.execute(
-            "SELECT title, content FROM news_articles WHERE category = %s ORDER BY created_at DESC LIMIT 20",
-            (category,)
-        )
-        existing_articles = cur.fetchall()
-        existing_titles = [article['title'] for article in existing_articles]
-        
-        max_attempts = 3
-        success = False
-        
-        for attempt in range(max_attempts):
-            try:
-                article_data = generate_with_deepseek(category, existing_titles)
-                
-                if not check_plagiarism(article_data['content'], existing_articles):
-                    title = article_data['title']
-                    content = article_data['content']
-                    word_count = len(content.split())
-                    image_url = generate_image(title)
-                    
-                    cur.execute(
-                        """INSERT INTO news_articles (title, content, category, image_url, word_count, view_count)
-                           VALUES (%s, %s, %s, %s, %s, 0)
-                           RETURNING id""",
-                        (title, content, category, image_url, word_count)
-                    )
-                    
-                    new_id = cur.fetchone()['id']
-                    conn.commit()
-                    
-                    cur.execute(
-                        "INSERT INTO generation_log (category, status) VALUES (%s, %s)",
-                        (category, 'success')
-                    )
-                    conn.commit()
-                    
-                    results.append({
-                        'category': category,
-                        'status': 'success',
-                        'article_id': new_id,
-                        'word_count': word_count
-                    })
-                    success = True
-                    break
-            except Exception as e:
-                if attempt == max_attempts - 1:
-                    cur.execute(
-                        "INSERT INTO generation_log (category, status, error_message) VALUES (%s, %s, %s)",
-                        (category, 'error', str(e))
-                    )
-                    conn.commit()
-                    
+    with trace.stage('db_connect'):
+        conn = acquire_connection(db_url)
+    try:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        with trace.stage('enqueue'):
+            category_state = prefetch_category_state(cur, CATEGORIES)
+            for category in [] if drain_only else CATEGORIES:
+                if category_state[category]['recent']:
                     results.append({
                         'category': category,
-                        'status': 'error',
-                        'message': str(e)
+                        'status': 'skipped',
+                        'message': 'Recently generated'
                     })
+                    continue
+                enqueue_job(cur, category)
+            
+            conn.commit()
         
-        if not success and attempt == max_attempts - 1:
-            results.append({
-                'category': category,
-                'status': 'failed',
-                'message': 'Plagiarism check failed after 3 attempts'
-            })
-    
-    cur.close()
-    conn.close()
+        if not drain_only:
+            with trace.stage('maintenance'):
+                trace.context['maintenance_failed'] = run_maintenance(conn, cur)
+        cur.close()
+    finally:
+        release_connection(conn)
+    
+    from llm_client import CircuitBreaker
+    
+    deadline = time.monotonic() + get_time_budget()
+    max_workers = get_concurrency_limit()
+    breaker = CircuitBreaker(db_url)
+    with trace.stage('drain'):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            worker_results = list(executor.map(
+                lambda worker: drain_queue(db_url, f'{worker_prefix}-{worker}', deadline, category_state, breaker),
+                range(max_workers)
+            ))
+    
+    results.extend(result for worker_result in worker_results for result in worker_result)
+    
+    trace.emit(
+        generated=len([r for r in results if r['status'] == 'success']),
+        failed=len([r for r in results if r['status'] in ('error', 'retrying')]),
+        deferred=len([r for r in results if r['status'] == 'deferred'])
+    )
     
     return {
         'statusCode': 200,
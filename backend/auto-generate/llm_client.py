@@ -0,0 +1 @@
+../shared/llm_client.py
\ No newline at end of file
@@ -0,0 +1 @@
+../shared/partitions.py
\ No newline at end of file
@@ -0,0 +1 @@
+../shared/plagiarism.py
\ No newline at end of file
@@ -0,0 +1 @@
+../shared/sections.py
\ No newline at end of file
@@ -0,0 +1 @@
+../shared/summary.py
\ No newline at end of file
@@ -1,90 +1,34 @@
 '''
-Business: Generate AI news articles and store in database with plagiarism check
-Args: event with httpMethod, body with category parameter
-Returns: HTTP response with generated article data
+Business: Queue AI news article generation for a category and report job progress
+Args: event with httpMethod POST and body with category parameter, or GET with job_id query param
+Returns: HTTP 202 response with the queued job, or the job status with article_id once generated
 '''
 
 import json
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import Dict, Any, List
 import requests
-from difflib import SequenceMatcher
-
-def check_similarity(text1: str, text2: str) -> float:
-    return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
-
-def check_plagiarism(content: str, existing_articles: List[Dict]) -> bool:
-    for article in existing_articles:
-        similarity = check_similarity(content, article['content'])
-        if similarity > 0.7:
-            return True
-    return False
-
-def generate_with_deepseek(category: str, existing_titles: List[str]) -> Dict[str, str]:
-    api_key = os.environ.get('DEEPSEEK_API_KEY')
-    if not api_key:
-        raise ValueError('DEEPSEEK_API_KEY not configured')
-    
-    existing_titles_text = '\n'.join([f"- {title}" for title in existing_titles[-10:]])
-    
-    prompt = f"""Создай уникальную новостную статью на русском языке для категории "{category}".
-
-ВАЖНО: Не повторяй эти темы:
-{existing_titles_text}
-
-Требования:
-- Статья должна быть на 5000+ слов
-- Тема должна быть актуальной и интересной
-- Используй реальные технологии/компании/события
-- Структура: введение, основная часть с подзаголовками, заключение
-- Пиши профессионально, как журналист топового издания
-
-Верни ТОЛЬКО JSON без дополнительного текста:
-{{
-  "title": "Заголовок новости",
-  "content": "Полный текст статьи 5000+ слов"
-}}"""
+from db import db_connection
+from jobs import enqueue_job, get_job, serialize_job
+from articles import CATEGORIES
+from tracing import log_event
+from psycopg2.extras import RealDictCursor
+from typing import Dict, Any
 
-    response = requests.post(
-        'https://api.deepseek.com/v1/chat/completions',
-        headers={
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
-        },
-        json={
-            'model': 'deepseek-chat',
-            'messages': [
-                {'role': 'system', 'content': 'Ты профессиональный журналист, пишущий длинные аналитические статьи. Отвечай ТОЛЬКО валидным JSON.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            'temperature': 0.9,
-            'max_tokens': 8000
-        },
-        timeout=120
-    )
-    
-    if response.status_code != 200:
-        raise Exception(f'DeepSeek API error: {response.text}')
-    
-    result = response.json()
-    content = result['choices'][0]['message']['content']
-    
-    content = content.strip()
-    if content.startswith('```json'):
-        content = content[7:]
-    if content.startswith('```'):
-        content = content[3:]
-    if content.endswith('```'):
-        content = content[:-3]
-    content = content.strip()
-    
-    article_data = json.loads(content)
-    return article_data
+# an empty AUTO_GENERATE_URL leaves queued jobs to the cron run; the trigger waits DRAIN_TRIGGER_TIMEOUT for a reply
+AUTO_GENERATE_URL = os.environ.get('AUTO_GENERATE_URL', 'https://functions.poehali.dev/b06f6c27-7e7d-4ba2-bce5-16d7f82654d7')
+DRAIN_CONNECT_TIMEOUT = float(os.environ.get('DRAIN_CONNECT_TIMEOUT', '3'))
+DRAIN_TRIGGER_TIMEOUT = float(os.environ.get('DRAIN_TRIGGER_TIMEOUT', '0.5'))
 
-def generate_image(title: str) -> str:
-    return f'https://picsum.photos/seed/{hash(title)}/1200/630'
+def trigger_drain() -> None:
+    # Fire and forget: the drain pass keeps running after the read timeout, and the cron run picks the job up if the call fails
+    if not AUTO_GENERATE_URL:
+        return
+    try:
+        requests.get(AUTO_GENERATE_URL, params={'drain': '1'}, timeout=(DRAIN_CONNECT_TIMEOUT, DRAIN_TRIGGER_TIMEOUT))
+    except requests.exceptions.ReadTimeout:
+        pass
+    except requests.exceptions.RequestException as e:
+        log_event('drain_trigger_failed', url=AUTO_GENERATE_URL, error=str(e))
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method = event.get('httpMethod', 'GET')
@@ -94,7 +38,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'statusCode': 200,
             'headers': {
                 'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
+                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
                 'Access-Control-Allow-Headers': 'Content-Type',
                 'Access-Control-Max-Age': '86400'
             },
@@ -102,7 +46,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'isBase64Encoded': False
         }
     
-    if method != 'POST':
+    if method not in ('GET', 'POST'):
         return {
             'statusCode': 405,
             'headers': {'Access-Control-Allow-Origin': '*'},
@@ -110,9 +54,6 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'isBase64Encoded': False
         }
     
-    body = json.loads(event.get('body', '{}'))
-    category = body.get('category', 'IT')
-    
     db_url = os.environ.get('DATABASE_URL')
     if not db_url:
         return {
@@ -122,72 +63,74 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'isBase64Encoded': False
         }
     
-    conn = psycopg2.connect(db_url)
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
-    cur.execute(
-        "SELECT title, content FROM news_articles WHERE category = %s ORDER BY created_at DESC LIMIT 20",
-        (category,)
-    )
-    existing_articles = cur.fetchall()
-    existing_titles = [article['title'] for article in existing_articles]
-    
-    max_attempts = 3
-    for attempt in range(max_attempts):
-        article_data = generate_with_deepseek(category, existing_titles)
-        
-        if not check_plagiarism(article_data['content'], existing_articles):
-            break
+    if method == 'GET':
+        query_params = event.get('queryStringParameters') or {}
+        job_id = query_params.get('job_id', '')
+        if not job_id.isdigit():
+            return {
+                'statusCode': 400,
+                'headers': {'Access-Control-Allow-Origin': '*'},
+                'body': json.dumps({'error': 'job_id is required'}),
+                'isBase64Encoded': False
+            }
         
-        if attempt == max_attempts - 1:
+        with db_connection(db_url) as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            job = get_job(cur, int(job_id))
             cur.close()
-            conn.close()
+        
+        if not job:
             return {
-                'statusCode': 500,
+                'statusCode': 404,
                 'headers': {'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'error': 'Failed to generate unique content after 3 attempts'}),
+                'body': json.dumps({'error': 'Job not found'}),
                 'isBase64Encoded': False
             }
+        
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*',
+                'Cache-Control': 'no-store'
+            },
+            'body': json.dumps(serialize_job(job)),
+            'isBase64Encoded': False
+        }
     
-    title = article_data['title']
-    content = article_data['content']
-    word_count = len(content.split())
-    image_url = generate_image(title)
-    
-    cur.execute(
-        """INSERT INTO news_articles (title, content, category, image_url, word_count, view_count)
-           VALUES (%s, %s, %s, %s, %s, 0)
-           RETURNING id, title, content, category, image_url, word_count, created_at, view_count""",
-        (title, content, category, image_url, word_count)
-    )
+    body = json.loads(event.get('body') or '{}')
+    category = body.get('category', 'IT')
+    if category not in CATEGORIES:
+        return {
+            'statusCode': 400,
+            'headers': {'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'error': f'Unknown category: {category}'}),
+            'isBase64Encoded': False
+        }
     
-    new_article = cur.fetchone()
-    conn.commit()
+    with db_connection(db_url) as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        job, created = enqueue_job(cur, category)
+        conn.commit()
+        cur.close()
     
-    cur.execute(
-        "INSERT INTO generation_log (category, status) VALUES (%s, %s)",
-        (category, 'success')
-    )
-    conn.commit()
+    if not job:
+        return {
+            'statusCode': 503,
+            'headers': {'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'error': 'Failed to queue generation job'}),
+            'isBase64Encoded': False
+        }
     
-    cur.close()
-    conn.close()
+    if job['status'] == 'queued':
+        trigger_drain()
     
     return {
-        'statusCode': 200,
+        'statusCode': 202,
         'headers': {
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*'
         },
-        'body': json.dumps({
-            'id': new_article['id'],
-            'title': new_article['title'],
-            'content': new_article['content'],
-            'category': new_article['category'],
-            'image_url': new_article['image_url'],
-            'word_count': new_article['word_count'],
-            'created_at': new_article['created_at'].isoformat(),
-            'view_count': new_article['view_count']
-        }),
+        'body': json.dumps({**serialize_job(job), 'created': created}),
         'isBase64Encoded': False
-    }
\ No newline at end of file
+    }
@@ -0,0 +1 @@
+../shared/jobs.py
\ No newline at end of file
@@ -0,0 +1,118 @@
+'''
+Business: Aggregated generation latency metrics: p50/p95/p99 per stage, overall and per category, plus token totals
+Args: event with httpMethod GET, query params hours (window, default 24) and optional category
+Returns: HTTP response with stage percentiles, token usage and circuit-breaker rejections over the window
+'''
+
+import json
+import os
+from db import db_connection
+from tracing import STAGES, TOKEN_FIELDS
+from psycopg2.extras import RealDictCursor
+from typing import Dict, Any
+
+DEFAULT_WINDOW_HOURS = 24
+MAX_WINDOW_HOURS = 24 * 30
+
+def error_response(status_code: int, message: str) -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {'Access-Control-Allow-Origin': '*'},
+        'body': json.dumps({'error': message}),
+        'isBase64Encoded': False
+    }
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    method = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'GET, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Max-Age': '86400'
+            },
+            'body': '',
+            'isBase64Encoded': False
+        }
+    
+    if method != 'GET':
+        return error_response(405, 'Method not allowed')
+    
+    db_url = os.environ.get('DATABASE_URL')
+    if not db_url:
+        return error_response(500, 'DATABASE_URL not configured')
+    
+    query_params = event.get('queryStringParameters') or {}
+    category = query_params.get('category')
+    try:
+        hours = float(query_params.get('hours', DEFAULT_WINDOW_HOURS))
+    except ValueError:
+        return error_response(400, 'hours must be a number')
+    if not 0 < hours <= MAX_WINDOW_HOURS:
+        return error_response(400, f'hours must be between 0 and {MAX_WINDOW_HOURS}')
+    
+    stage_values = ', '.join(f"('{stage}', {stage}_ms)" for stage in STAGES + ['total'])
+    category_filter = 'AND category = %s' if category else ''
+    params = (hours * 3600, category) if category else (hours * 3600,)
+    
+    with db_connection(db_url) as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(
+            f"""SELECT l.category, s.stage, COUNT(*) AS count,
+                       percentile_cont(0.5) WITHIN GROUP (ORDER BY s.ms) AS p50,
+                       percentile_cont(0.95) WITHIN GROUP (ORDER BY s.ms) AS p95,
+                       percentile_cont(0.99) WITHIN GROUP (ORDER BY s.ms) AS p99
+                FROM generation_log l
+                CROSS JOIN LATERAL (VALUES {stage_values}) AS s(stage, ms)
+                WHERE l.created_at > NOW() - make_interval(secs => %s) {category_filter}
+                  AND s.ms IS NOT NULL
+                GROUP BY GROUPING SETS ((s.stage), (l.category, s.stage))
+                ORDER BY l.category NULLS FIRST, s.stage""",
+            params
+        )
+        stages = cur.fetchall()
+        
+        cur.execute(
+            f"""SELECT category, COUNT(*) AS attempts,
+                       COUNT(*) FILTER (WHERE status = 'success') AS succeeded,
+                       COUNT(*) FILTER (WHERE status = 'circuit_open') AS circuit_open,
+                       {', '.join(f'COALESCE(SUM({field}), 0) AS {field}' for field in TOKEN_FIELDS)}
+                FROM generation_log
+                WHERE created_at > NOW() - make_interval(secs => %s) {category_filter}
+                GROUP BY category
+                ORDER BY category""",
+            params
+        )
+        categories = cur.fetchall()
+        cur.close()
+    
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Cache-Control': 'no-store'
+        },
+        'body': json.dumps({
+            'window_hours': hours,
+            'stages': [
+                {
+                    'category': row['category'] or 'all',
+                    'stage': row['stage'],
+                    'count': row['count'],
+                    'p50_ms': round(row['p50'], 1),
+                    'p95_ms': round(row['p95'], 1),
+                    'p99_ms': round(row['p99'], 1)
+                }
+                for row in stages
+            ],
+            'categories': [
+                {**row, **{field: int(row[field]) for field in TOKEN_FIELDS}}
+                for row in categories
+            ]
+        }),
+        'isBase64Encoded': False
+    }
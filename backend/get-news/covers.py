@@ -0,0 +1 @@
+../shared/covers.py
\ No newline at end of file
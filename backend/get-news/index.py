@@ -1,14 +1,196 @@
 '''
-Business: Fetch news articles from database with filtering and pagination
-Args: event with httpMethod GET, query params for category and limit
-Returns: HTTP response with array of news articles
+Business: Fetch news articles from database with filtering, keyset pagination and field projection; record article views
+Args: event with httpMethod GET and list, search, article, stats or cover query params; POST body with article_ids
+Returns: HTTP response with news articles, one article, category stats or a cover image; 304 when unchanged; 202 for views
 '''
 
+import base64
 import json
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import Dict, Any
+from datetime import datetime
+from db import db_connection
+from http_cache import get_header, fetch_validator, make_etag, cache_headers, is_not_modified, not_modified_response, get_cached_response, put_cached_response
+from payload import dumps, rows_to_json, rows_to_objects_json, json_response
+from views import record_views, flush_views
+from articles import FIELD_COLUMNS, SORT_COLUMNS, LIST_FIELDS, ARTICLE_FIELDS, READER_FIELDS, build_search_query, fetch_feed, fetch_article
+from sections import SECTION_FIELDS, split_sections, fetch_sections
+from covers import COVER_CACHE_CONTROL, parse_cover_request, fetch_cover
+from stats import STATS_FIELDS, TRENDING_FIELDS, fetch_stats_validator, fetch_category_stats, fetch_trending
+from typing import Dict, Any, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+MAX_QUERY_LENGTH = 200
+MAX_VIEW_BATCH = 100
+INITIAL_SECTIONS = 2
+MAX_SECTION_RANGE = 10
+SECTIONS_CACHE_CONTROL = 'public, max-age=86400'
+
+def error_response(status_code: int, message: str) -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {'Access-Control-Allow-Origin': '*'},
+        'body': json.dumps({'error': message}),
+        'isBase64Encoded': False
+    }
+
+def parse_fields(raw: Optional[str]) -> List[str]:
+    if not raw:
+        return LIST_FIELDS
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in FIELD_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def parse_limit(raw: Optional[str]) -> int:
+    if raw is None:
+        return DEFAULT_PAGE_SIZE
+    limit = int(raw)
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+def parse_sort(raw: Optional[str], query: Optional[str]) -> str:
+    sort = raw or ('rank' if query else 'date')
+    if sort not in SORT_COLUMNS or (sort == 'rank' and not query) or (sort == 'popular' and query):
+        raise ValueError('sort must be date or popular, or date or rank for search queries')
+    return sort
+
+def parse_format(raw: Optional[str]) -> str:
+    output_format = raw or 'objects'
+    if output_format not in ('objects', 'columnar'):
+        raise ValueError('format must be objects or columnar')
+    return output_format
+
+def parse_view_ids(raw_body: Optional[str]) -> List[int]:
+    try:
+        body = json.loads(raw_body or '{}')
+    except ValueError:
+        raise ValueError('Invalid JSON body')
+    ids = body.get('article_ids') if isinstance(body, dict) else None
+    if ids is None and isinstance(body, dict) and 'article_id' in body:
+        ids = [body['article_id']]
+    if not isinstance(ids, list) or not ids or len(ids) > MAX_VIEW_BATCH:
+        raise ValueError(f'article_id or 1-{MAX_VIEW_BATCH} article_ids are required')
+    if not all(isinstance(article_id, int) and not isinstance(article_id, bool) and article_id > 0 for article_id in ids):
+        raise ValueError('article ids must be positive integers')
+    return ids
+
+def parse_section_range(raw: str) -> Tuple[int, int]:
+    try:
+        start, end = (int(part) for part in raw.split('-'))
+    except ValueError:
+        raise ValueError('sections must be a range like 2-5')
+    if start < 0 or end < start or end - start >= MAX_SECTION_RANGE:
+        raise ValueError(f'sections must be an ascending range of at most {MAX_SECTION_RANGE} sections')
+    return start, end
+
+def encode_cursor(sort_value: Any, article_id: int) -> str:
+    value = sort_value.isoformat() if isinstance(sort_value, datetime) else repr(sort_value)
+    raw = f'{value}|{article_id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, article_id = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8').split('|')
+        if sort == 'rank':
+            return float(value), int(article_id)
+        if sort == 'popular':
+            return int(value), int(article_id)
+        return datetime.fromisoformat(value), int(article_id)
+    except ValueError:
+        raise ValueError('Invalid cursor')
+
+def cover_response(event: Dict[str, Any], db_url: str, digest: str, width: int) -> Dict[str, Any]:
+    etag = f'"{digest}-{width}"'
+    headers = {
+        'Access-Control-Allow-Origin': '*',
+        'Cache-Control': COVER_CACHE_CONTROL,
+        'ETag': etag
+    }
+    if get_header(event, 'If-None-Match') == etag:
+        return {'statusCode': 304, 'headers': headers, 'body': '', 'isBase64Encoded': False}
+    
+    with db_connection(db_url) as conn:
+        cur = conn.cursor()
+        content = fetch_cover(cur, digest, width)
+        cur.close()
+    
+    if content is None:
+        return error_response(404, 'Cover not found')
+    
+    return {
+        'statusCode': 200,
+        'headers': {**headers, 'Content-Type': 'image/webp'},
+        'body': base64.b64encode(content).decode('ascii'),
+        'isBase64Encoded': True
+    }
+
+def reader_response(event: Dict[str, Any], db_url: str, article_id: int, section_range: Optional[Tuple[int, int]]) -> Dict[str, Any]:
+    with db_connection(db_url) as conn:
+        cur = conn.cursor()
+        header = fetch_article(cur, article_id, READER_FIELDS)
+        if header:
+            header = dict(zip(READER_FIELDS, header))
+            start, end = section_range or (0, INITIAL_SECTIONS - 1)
+            if header['section_count'] is None:
+                split = split_sections(fetch_article(cur, article_id, ['content'])[0])
+                header['section_count'] = len(split)
+                sections = [{field: section[field] for field in SECTION_FIELDS} for section in split[start:end + 1]]
+            else:
+                sections = [dict(zip(SECTION_FIELDS, row)) for row in fetch_sections(cur, article_id, start, end)]
+        cur.close()
+    
+    if not header:
+        return error_response(404, 'Article not found')
+    
+    next_section = end + 1 if end + 1 < header['section_count'] else None
+    if section_range:
+        body = {'id': article_id, 'section_count': header['section_count'], 'sections': sections, 'next_section': next_section}
+        headers = {'Access-Control-Allow-Origin': '*', 'Cache-Control': SECTIONS_CACHE_CONTROL}
+    else:
+        body = {**header, 'sections': sections, 'next_section': next_section}
+        headers = {'Access-Control-Allow-Origin': '*'}
+    return json_response(event, dumps(body), headers)
+
+def stats_response(event: Dict[str, Any], db_url: str, category: Optional[str]) -> Dict[str, Any]:
+    scope = category or 'all'
+    cache_key = ('stats', scope)
+    
+    with db_connection(db_url) as conn:
+        cur = conn.cursor()
+        validator = fetch_stats_validator(cur)
+        etag = make_etag(validator, cache_key)
+        validator_headers = cache_headers(etag, validator)
+        
+        if is_not_modified(event, etag, validator):
+            cur.close()
+            return not_modified_response(validator_headers)
+        
+        cached = get_cached_response(cache_key, etag)
+        if cached is None:
+            cached = {
+                'body': dumps({
+                    'categories': [dict(zip(STATS_FIELDS, row)) for row in fetch_category_stats(cur)],
+                    'trending': [dict(zip(TRENDING_FIELDS + ['score'], row)) for row in fetch_trending(cur, scope)]
+                }),
+                'compressed': {}
+            }
+            put_cached_response(cache_key, etag, cached)
+        cur.close()
+    
+    return json_response(
+        event,
+        cached['body'],
+        {
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Expose-Headers': 'ETag, Last-Modified',
+            **validator_headers
+        },
+        compressed=cached['compressed']
+    )
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method = event.get('httpMethod', 'GET')
@@ -18,80 +200,128 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'statusCode': 200,
             'headers': {
                 'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type, If-None-Match, If-Modified-Since',
                 'Access-Control-Max-Age': '86400'
             },
             'body': '',
             'isBase64Encoded': False
         }
     
-    if method != 'GET':
-        return {
-            'statusCode': 405,
-            'headers': {'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Method not allowed'}),
-            'isBase64Encoded': False
-        }
+    if method not in ('GET', 'POST'):
+        return error_response(405, 'Method not allowed')
     
     db_url = os.environ.get('DATABASE_URL')
     if not db_url:
+        return error_response(500, 'DATABASE_URL not configured')
+    
+    if method == 'POST':
+        try:
+            view_ids = parse_view_ids(event.get('body'))
+        except ValueError as e:
+            return error_response(400, str(e))
+        
+        accepted = record_views(view_ids)
+        with db_connection(db_url) as conn:
+            flush_views(conn)
+        
         return {
-            'statusCode': 500,
-            'headers': {'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'DATABASE_URL not configured'}),
+            'statusCode': 202,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'accepted': accepted}),
             'isBase64Encoded': False
         }
     
     query_params = event.get('queryStringParameters') or {}
+    if query_params.get('cover'):
+        try:
+            digest, width = parse_cover_request(query_params['cover'], query_params.get('w'))
+        except ValueError as e:
+            return error_response(400, str(e))
+        return cover_response(event, db_url, digest, width)
+    
+    if query_params.get('stats'):
+        return stats_response(event, db_url, query_params.get('category'))
+    
+    article_id = query_params.get('id')
     category = query_params.get('category')
-    limit = int(query_params.get('limit', 100))
-    
-    conn = psycopg2.connect(db_url)
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
-    if category:
-        cur.execute(
-            """SELECT id, title, content, category, image_url, word_count, created_at, view_count
-               FROM news_articles 
-               WHERE category = %s 
-               ORDER BY created_at DESC 
-               LIMIT %s""",
-            (category, limit)
-        )
-    else:
-        cur.execute(
-            """SELECT id, title, content, category, image_url, word_count, created_at, view_count
-               FROM news_articles 
-               ORDER BY created_at DESC 
-               LIMIT %s""",
-            (limit,)
-        )
+    cursor = query_params.get('cursor')
+    query = (query_params.get('q') or '').strip()[:MAX_QUERY_LENGTH] or None
     
-    articles = cur.fetchall()
+    try:
+        section_range = parse_section_range(query_params['sections']) if query_params.get('sections') else None
+        fields = parse_fields(query_params.get('fields'))
+        limit = parse_limit(query_params.get('limit'))
+        sort = parse_sort(query_params.get('sort'), query)
+        output_format = parse_format(query_params.get('format'))
+        after = decode_cursor(cursor, sort) if cursor else None
+        article_id = int(article_id) if article_id else None
+    except ValueError as e:
+        return error_response(400, str(e))
     
-    result = []
-    for article in articles:
-        result.append({
-            'id': article['id'],
-            'title': article['title'],
-            'content': article['content'],
-            'category': article['category'],
-            'image_url': article['image_url'],
-            'word_count': article['word_count'],
-            'created_at': article['created_at'].isoformat(),
-            'view_count': article['view_count']
-        })
+    if article_id is not None and (query_params.get('paged') or section_range):
+        return reader_response(event, db_url, article_id, section_range)
     
-    cur.close()
-    conn.close()
+    if article_id is not None:
+        with db_connection(db_url) as conn:
+            cur = conn.cursor()
+            article = fetch_article(cur, article_id)
+            cur.close()
+        
+        if not article:
+            return error_response(404, 'Article not found')
+        
+        return json_response(
+            event,
+            dumps(dict(zip(ARTICLE_FIELDS, article))),
+            {'Access-Control-Allow-Origin': '*'}
+        )
     
-    return {
-        'statusCode': 200,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'
-        },
-        'body': json.dumps(result),
-        'isBase64Encoded': False
+    cache_key = (output_format, category, cursor, limit, tuple(fields), query, sort)
+    output_fields = list(dict.fromkeys(fields + ['rank', 'snippet'])) if query else fields
+    
+    with db_connection(db_url) as conn:
+        cur = conn.cursor()
+        validator = fetch_validator(cur, category, views='view_count' in output_fields or sort == 'popular')
+        etag = make_etag(validator, cache_key)
+        validator_headers = cache_headers(etag, validator)
+        
+        if is_not_modified(event, etag, validator):
+            cur.close()
+            return not_modified_response(validator_headers)
+        
+        cached = get_cached_response(cache_key, etag)
+        if cached is None:
+            if query:
+                sql, params, selected = build_search_query(fields, query, sort, category, after, limit)
+                cur.execute(sql, tuple(params))
+                articles = cur.fetchall()
+            else:
+                articles, selected = fetch_feed(cur, fields, category, after, limit, sort)
+            
+            next_cursor = None
+            if len(articles) > limit:
+                articles = articles[:limit]
+                last = articles[-1]
+                next_cursor = encode_cursor(last[selected.index(SORT_COLUMNS[sort])], last[selected.index('id')])
+            
+            cached = {
+                'body': (rows_to_json if output_format == 'columnar' else rows_to_objects_json)(output_fields, articles),
+                'next_cursor': next_cursor,
+                'compressed': {}
+            }
+            put_cached_response(cache_key, etag, cached)
+        cur.close()
+    
+    headers = {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Expose-Headers': 'X-Next-Cursor, ETag, Last-Modified',
+        **validator_headers
     }
+    if cached['next_cursor']:
+        headers['X-Next-Cursor'] = cached['next_cursor']
+    
+    return json_response(event, cached['body'], headers, compressed=cached['compressed'])
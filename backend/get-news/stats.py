@@ -0,0 +1 @@
+../shared/stats.py
\ No newline at end of file
@@ -0,0 +1 @@
+../shared/views.py
\ No newline at end of file
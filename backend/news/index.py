@@ -1,14 +1,20 @@
 '''
-Business: Get all news articles from database
+Business: Get the latest news articles from database (legacy list endpoint over news_articles)
 Args: event with httpMethod and queryStringParameters; context with request_id
-Returns: HTTP response with list of news articles
+Returns: HTTP response with list of news articles, or 304 when the list is unchanged
 '''
 
 import json
 import os
-import psycopg2
+from db import db_connection
+from http_cache import fetch_validator, make_etag, cache_headers, is_not_modified, not_modified_response, get_cached_response, put_cached_response
+from payload import rows_to_objects_json, json_response
+from articles import fetch_feed
 from typing import Dict, Any
 
+NEWS_COLUMNS = ['id', 'title', 'category', 'excerpt', 'image_url', 'created_at', 'word_count', 'view_count', 'reading_time']
+NEWS_LIMIT = 100
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
     
@@ -18,7 +24,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Allow-Headers': 'Content-Type, If-None-Match, If-Modified-Since',
                 'Access-Control-Max-Age': '86400'
             },
             'body': '',
@@ -49,40 +55,34 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'isBase64Encoded': False
         }
     
-    conn = psycopg2.connect(database_url)
-    cur = conn.cursor()
-    
-    cur.execute('''
-        SELECT id, title, category, content, image_url, created_at, word_count, view_count
-        FROM news
-        ORDER BY created_at DESC
-        LIMIT 100
-    ''')
-    
-    rows = cur.fetchall()
-    
-    news_list = []
-    for row in rows:
-        news_list.append({
-            'id': row[0],
-            'title': row[1],
-            'category': row[2],
-            'content': row[3],
-            'image_url': row[4],
-            'created_at': row[5].isoformat() if row[5] else None,
-            'word_count': row[6],
-            'view_count': row[7]
-        })
+    cache_key = ('news',)
     
-    cur.close()
-    conn.close()
+    with db_connection(database_url) as conn:
+        cur = conn.cursor()
+        validator = fetch_validator(cur, views=True)
+        etag = make_etag(validator, cache_key)
+        validator_headers = cache_headers(etag, validator)
+        
+        if is_not_modified(event, etag, validator):
+            cur.close()
+            return not_modified_response(validator_headers)
+        
+        cached = get_cached_response(cache_key, etag)
+        if cached is None:
+            rows, _ = fetch_feed(cur, NEWS_COLUMNS, None, None, NEWS_LIMIT)
+            rows = rows[:NEWS_LIMIT]
+            cached = {'body': rows_to_objects_json(NEWS_COLUMNS, rows), 'compressed': {}}
+            put_cached_response(cache_key, etag, cached)
+        
+        cur.close()
     
-    return {
-        'statusCode': 200,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'
+    return json_response(
+        event,
+        cached['body'],
+        {
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Expose-Headers': 'ETag, Last-Modified',
+            **validator_headers
         },
-        'body': json.dumps(news_list),
-        'isBase64Encoded': False
-    }
+        compressed=cached['compressed']
+    )
@@ -0,0 +1 @@
+../shared/payload.py
\ No newline at end of file
@@ -0,0 +1,266 @@
+'''
+Business: Shared data access for news_articles: field projection, feed/search queries, article reads and writes
+Args: psycopg2 cursor; field lists, filters and keyset positions
+Returns: SQL with parameters and selected fields, feed pages, article rows (falling back to the archive), inserted ids
+'''
+
+import os
+import time
+import zlib
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+CATEGORIES = ['IT', 'Криптовалюта', 'Игры', 'Финансы', 'Мир']
+
+HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=12, FragmentDelimiter= … '
+
+FIELD_COLUMNS = {
+    'id': 'a.id',
+    'title': 'a.title',
+    'category': 'a.category',
+    'image_url': 'a.image_url',
+    'word_count': 'a.word_count',
+    'created_at': 'a.created_at',
+    'view_count': 'COALESCE(vc.view_count, 0) AS view_count',
+    'excerpt': 'a.excerpt',
+    'preview': 'a.preview',
+    'reading_time': 'a.reading_time',
+    'content': 'a.content',
+    'section_count': 'a.section_count'
+}
+SORT_COLUMNS = {'date': 'created_at', 'rank': 'rank', 'popular': 'view_count'}
+LIST_FIELDS = ['id', 'title', 'category', 'image_url', 'word_count', 'created_at', 'view_count', 'excerpt', 'reading_time']
+ARTICLE_FIELDS = ['id', 'title', 'content', 'category', 'image_url', 'word_count', 'created_at', 'view_count', 'excerpt', 'reading_time']
+READER_FIELDS = [field for field in ARTICLE_FIELDS if field != 'content'] + ['section_count']
+ARCHIVE_COLUMNS = {**FIELD_COLUMNS, 'preview': 'NULL AS preview', 'section_count': 'NULL AS section_count'}
+# months the date feed reads before widening to every partition; seconds the month -> first id index is cached
+FEED_WINDOW_MONTHS = int(os.environ.get('FEED_WINDOW_MONTHS', '1'))
+MONTH_INDEX_TTL = float(os.environ.get('MONTH_INDEX_TTL', '300'))
+INSERT_COLUMNS = ['title', 'content', 'category', 'image_url', 'word_count', 'view_count', 'excerpt', 'preview', 'reading_time', 'embedding', 'minhash', 'section_count', 'stems_counted']
+
+_month_index: Dict[str, Any] = {'expires': 0.0, 'months': [], 'first_ids': []}
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def compress_content(content: str) -> bytes:
+    return zlib.compress(content.encode('utf-8'), 9)
+
+def decompress_content(data: Any) -> str:
+    return zlib.decompress(bytes(data)).decode('utf-8')
+
+def build_feed_query(
+    fields: List[str], category: Optional[str], after: Optional[Tuple], limit: int, sort: str = 'date', window: int = 0
+) -> Tuple[str, List[Any], List[str]]:
+    selected = list(dict.fromkeys(fields + ['id', SORT_COLUMNS[sort]]))
+    conditions = []
+    params: List[Any] = []
+    if category:
+        conditions.append('a.category = %s')
+        params.append(category)
+    if after and sort == 'popular':
+        conditions.append('(vc.view_count, vc.article_id) < (%s, %s)')
+        params.extend(after)
+    elif after:
+        conditions.append('(a.created_at, a.id) < (%s, %s)')
+        params.extend(after)
+    if window and sort == 'date':
+        # Literal bounds on the partition key let the planner skip all but the months around the page
+        # (row comparisons and LOCALTIMESTAMP do not prune at plan time)
+        conditions.append('a.created_at >= %s')
+        params.append(add_months(after[0] if after else datetime.now(), -window))
+        if after:
+            conditions.append('a.created_at <= %s')
+            params.append(after[0])
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    params.append(limit + 1)
+
+    if sort == 'popular':
+        source = 'article_view_counts vc JOIN news_articles a ON a.id = vc.article_id'
+        order = 'vc.view_count DESC, vc.article_id DESC'
+    else:
+        source = 'news_articles a LEFT JOIN article_view_counts vc ON vc.article_id = a.id'
+        order = 'a.created_at DESC, a.id DESC'
+
+    sql = f"""SELECT {', '.join(FIELD_COLUMNS[field] for field in selected)}
+               FROM {source}
+               {where}
+               ORDER BY {order}
+               LIMIT %s"""
+    return sql, params, selected
+
+def fetch_feed(
+    cur, fields: List[str], category: Optional[str], after: Optional[Tuple], limit: int, sort: str = 'date',
+    window: int = FEED_WINDOW_MONTHS
+) -> Tuple[List[Any], List[str]]:
+    sql, params, selected = build_feed_query(fields, category, after, limit, sort, window)
+    cur.execute(sql, tuple(params))
+    rows = cur.fetchall()
+    if window and sort == 'date' and len(rows) <= limit:
+        # The window ran short of a full page: repeat without it to reach older partitions
+        sql, params, selected = build_feed_query(fields, category, after, limit, sort)
+        cur.execute(sql, tuple(params))
+        rows = cur.fetchall()
+    return rows, selected
+
+def build_search_query(
+    fields: List[str], query: str, sort: str, category: Optional[str], after: Optional[Tuple], limit: int
+) -> Tuple[str, List[Any], List[str]]:
+    selected = list(dict.fromkeys(fields + ['rank', 'snippet', 'id', 'created_at']))
+    # The tsquery is repeated inline so the planner sees how selective it is: through the q CTE it guesses, and for
+    # sort=date walks the created_at index of every partition instead of the GIN index
+    conditions = ["a.search_vector @@ websearch_to_tsquery('russian', %s)"]
+    params: List[Any] = [query, query]
+    if category:
+        conditions.append('a.category = %s')
+        params.append(category)
+    if after and sort == 'rank':
+        conditions.append('(ts_rank_cd(a.search_vector, q.query), a.id) < (%s::real, %s)')
+        params.extend(after)
+    elif after:
+        conditions.append('(a.created_at, a.id) < (%s, %s)')
+        params.extend(after)
+    params.append(limit + 1)
+    order = 'rank DESC, id DESC' if sort == 'rank' else 'created_at DESC, id DESC'
+
+    columns = []
+    for field in selected:
+        if field == 'rank':
+            columns.append('hits.rank')
+        elif field == 'snippet':
+            columns.append(f"ts_headline('russian', a.content, q.query, '{HEADLINE_OPTIONS}') AS snippet")
+        else:
+            columns.append(FIELD_COLUMNS[field])
+
+    sql = f"""WITH q AS (SELECT websearch_to_tsquery('russian', %s) AS query),
+               hits AS (
+                   SELECT a.id, a.created_at, ts_rank_cd(a.search_vector, q.query) AS rank
+                   FROM news_articles a, q
+                   WHERE {' AND '.join(conditions)}
+                   ORDER BY {order}
+                   LIMIT %s
+               )
+               SELECT {', '.join(columns)}
+               FROM hits
+               JOIN news_articles a ON a.id = hits.id
+               LEFT JOIN article_view_counts vc ON vc.article_id = a.id
+               CROSS JOIN q
+               ORDER BY {', '.join(f'hits.{part}' for part in order.split(', '))}"""
+    return sql, params, selected
+
+def article_month(cur, article_id: int) -> Optional[Tuple[datetime, Optional[datetime]]]:
+    if time.monotonic() >= _month_index['expires']:
+        # First id of every live month; ids grow with created_at, so an id maps to one monthly partition
+        cur.execute(
+            """SELECT m.month, (
+                   SELECT a.id FROM news_articles a
+                   WHERE a.created_at >= m.month
+                   ORDER BY a.created_at, a.id
+                   LIMIT 1
+               ) AS first_id
+               FROM generate_series(
+                   date_trunc('month', (SELECT MIN(created_at) FROM news_articles)), LOCALTIMESTAMP, INTERVAL '1 month'
+               ) AS m(month)
+               ORDER BY m.month"""
+        )
+        rows = [(row['month'], row['first_id']) if isinstance(row, dict) else tuple(row) for row in cur.fetchall()]
+        rows = [(month, first_id) for month, first_id in rows if first_id is not None]
+        _month_index.update({
+            'expires': time.monotonic() + MONTH_INDEX_TTL,
+            'months': [month for month, _ in rows],
+            'first_ids': [first_id for _, first_id in rows]
+        })
+    months, first_ids = _month_index['months'], _month_index['first_ids']
+    index = bisect_right(first_ids, article_id) - 1
+    if index < 0:
+        return None
+    return months[index], months[index + 1] if index + 1 < len(months) else None
+
+def fetch_live_article(
+    cur, article_id: int, fields: Sequence[str] = ARTICLE_FIELDS, month: Optional[Tuple[datetime, Optional[datetime]]] = None
+) -> Optional[Any]:
+    conditions = ['a.id = %s']
+    params: List[Any] = [article_id]
+    if month:
+        # Literal bounds on the partition key: the lookup plans and probes a single partition
+        conditions.append('a.created_at >= %s')
+        params.append(month[0])
+        if month[1]:
+            conditions.append('a.created_at < %s')
+            params.append(month[1])
+    cur.execute(
+        f"""SELECT {', '.join(FIELD_COLUMNS[field] for field in fields)}
+            FROM news_articles a
+            LEFT JOIN article_view_counts vc ON vc.article_id = a.id
+            WHERE {' AND '.join(conditions)}""",
+        tuple(params)
+    )
+    return cur.fetchone()
+
+def fetch_article(cur, article_id: int, fields: Sequence[str] = ARTICLE_FIELDS) -> Optional[Any]:
+    month = article_month(cur, article_id)
+    if month is None:
+        # Older than every live month: the archive is the likely home
+        row = fetch_archived_article(cur, article_id, fields)
+        return row if row is not None else fetch_live_article(cur, article_id, fields)
+    row = fetch_live_article(cur, article_id, fields, month)
+    if row is None:
+        # Articles written concurrently across a month boundary can take ids out of created_at order
+        row = fetch_live_article(cur, article_id, fields)
+    return row if row is not None else fetch_archived_article(cur, article_id, fields)
+
+def fetch_archived_article(cur, article_id: int, fields: Sequence[str] = ARTICLE_FIELDS) -> Optional[Any]:
+    cur.execute(
+        f"""SELECT {', '.join(ARCHIVE_COLUMNS[field] for field in fields)}
+            FROM news_articles_archive a
+            LEFT JOIN article_view_counts vc ON vc.article_id = a.id
+            WHERE a.id = %s""",
+        (article_id,)
+    )
+    row = cur.fetchone()
+    if row is None or 'content' not in fields:
+        return row
+    if isinstance(row, dict):
+        return {**row, 'content': decompress_content(row['content'])}
+    index = list(fields).index('content')
+    return (*row[:index], decompress_content(row[index]), *row[index + 1:])
+
+def prefetch_category_state(cur, categories: Sequence[str], limit: int = 20, recent_minutes: int = 5) -> Dict[str, Dict[str, Any]]:
+    cur.execute(
+        """SELECT c.category, r.title, r.created_at > LOCALTIMESTAMP - make_interval(mins => %s) AS recent
+           FROM unnest(%s::text[]) AS c(category)
+           LEFT JOIN LATERAL (
+               SELECT a.title, a.created_at
+               FROM news_articles a
+               WHERE a.category = c.category
+               ORDER BY a.created_at DESC, a.id DESC
+               LIMIT %s
+           ) r ON TRUE""",
+        (recent_minutes, list(categories), limit)
+    )
+    state: Dict[str, Dict[str, Any]] = {category: {'titles': [], 'recent': False} for category in categories}
+    for row in cur.fetchall():
+        if row['title'] is not None:
+            state[row['category']]['titles'].append(row['title'])
+            state[row['category']]['recent'] = state[row['category']]['recent'] or bool(row['recent'])
+    return state
+
+def insert_articles(cur, articles: List[Dict[str, Any]]) -> List[int]:
+    from psycopg2.extras import execute_values
+
+    if not articles:
+        return []
+    cur.execute(
+        "SELECT nextval(pg_get_serial_sequence('news_articles', 'id')) AS id FROM generate_series(1, %s)",
+        (len(articles),)
+    )
+    ids = [row['id'] if isinstance(row, dict) else row[0] for row in cur.fetchall()]
+    columns = [column for column in INSERT_COLUMNS if column in articles[0]]
+    execute_values(
+        cur,
+        f"INSERT INTO news_articles (id, {', '.join(columns)}) VALUES %s",
+        [(article_id, *(article[column] for column in columns)) for article_id, article in zip(ids, articles)]
+    )
+    return ids
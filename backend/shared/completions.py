@@ -0,0 +1,69 @@
+'''
+Business: Content-addressed store of paid LLM completions so retried jobs reuse them
+Args: request payload (model, messages, sampling params); RealDictCursor over llm_completions
+Returns: prompt hashes, unconsumed cached articles and recorded token usage
+'''
+
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from psycopg2.extras import execute_values
+
+# stored completions older than this are not reused
+LLM_CACHE_TTL_HOURS = float(os.environ.get('LLM_CACHE_TTL_HOURS', '24'))
+USAGE_FIELDS = ['prompt_tokens', 'completion_tokens', 'total_tokens', 'prompt_cache_hit_tokens', 'prompt_cache_miss_tokens']
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+def prompt_hash(payload: Dict[str, Any]) -> str:
+    normalized = {
+        'model': payload['model'],
+        'messages': [
+            {'role': message['role'], 'content': WHITESPACE_RE.sub(' ', message['content']).strip()}
+            for message in payload['messages']
+        ],
+        'temperature': payload.get('temperature'),
+        'max_tokens': payload.get('max_tokens')
+    }
+    encoded = json.dumps(normalized, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def get_cached_completion(cur, key: str) -> Optional[Dict[str, Any]]:
+    cur.execute(
+        """SELECT id, title, content FROM llm_completions
+           WHERE prompt_hash = %s AND consumed_at IS NULL
+             AND created_at > NOW() - make_interval(secs => %s)
+           ORDER BY id DESC
+           LIMIT 1""",
+        (key, LLM_CACHE_TTL_HOURS * 3600)
+    )
+    return cur.fetchone()
+
+def store_completion(cur, key: str, job_id: Optional[int], model: str, article: Dict[str, Any]) -> int:
+    usage = article.get('usage') or {}
+    cur.execute(
+        f"""INSERT INTO llm_completions (prompt_hash, job_id, model, title, content, {', '.join(USAGE_FIELDS)})
+            VALUES (%s, %s, %s, %s, %s, {', '.join(['%s'] * len(USAGE_FIELDS))})
+            RETURNING id""",
+        (key, job_id, model, article['title'], article['content'], *(usage.get(field) for field in USAGE_FIELDS))
+    )
+    return cur.fetchone()['id']
+
+def consume_completion(cur, completion_id: int, article_id: Optional[int] = None) -> None:
+    cur.execute(
+        "UPDATE llm_completions SET consumed_at = NOW(), article_id = %s WHERE id = %s",
+        (article_id, completion_id)
+    )
+
+def consume_completions(cur, consumed: List[Tuple[int, Optional[int]]]) -> None:
+    execute_values(
+        cur,
+        """UPDATE llm_completions AS c
+           SET consumed_at = NOW(), article_id = v.article_id
+           FROM (VALUES %s) AS v(id, article_id)
+           WHERE c.id = v.id""",
+        consumed,
+        template='(%s, %s::integer)'
+    )
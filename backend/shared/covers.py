@@ -0,0 +1,159 @@
+'''
+Business: Deterministic article cover images rendered locally and stored content-addressed
+Args: article title and category; cursor over cover_images
+Returns: WebP variants keyed by the SHA-256 of the full-size image, cover URLs and stored image bytes
+'''
+
+import colorsys
+import hashlib
+import io
+import os
+import re
+import textwrap
+from typing import Any, Dict, List, Optional, Tuple
+
+RENDER_VERSION = 1
+COVER_WIDTH = 1200
+COVER_HEIGHT = 630
+COVER_SIZES = [1200, 640, 320]
+# WebP encoder quality and method (0 fastest, 6 smallest)
+COVER_QUALITY = int(os.environ.get('COVER_QUALITY', '80'))
+COVER_METHOD = int(os.environ.get('COVER_METHOD', '2'))
+COVER_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# function serving ?cover=<digest>; COVER_FONT_PATH overrides the bundled font
+COVER_BASE_URL = os.environ.get('COVER_BASE_URL', 'https://functions.poehali.dev/af8bded5-e442-41d9-b777-b7b7c0f5a349')
+
+CATEGORY_HUES = {'IT': 205, 'Криптовалюта': 38, 'Игры': 285, 'Финансы': 145, 'Мир': 355}
+# Shipped next to this module (Latin + Cyrillic subset of DejaVu Sans Bold); Pillow's built-in font has no Cyrillic glyphs
+FONT_PATH = os.environ.get('COVER_FONT_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'DejaVuSans-Bold.ttf')
+MAX_TITLE_LINES = 4
+
+DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+
+_fonts: Dict[int, Any] = {}
+
+def cover_seed(title: str, category: str) -> bytes:
+    return hashlib.blake2b(f'{RENDER_VERSION}|{category}|{title}'.encode('utf-8'), digest_size=16).digest()
+
+def cover_palette(seed: bytes, category: str) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]]:
+    base = CATEGORY_HUES.get(category, seed[0] * 360 // 256)
+    hue = (base + seed[1] % 30 - 15) % 360
+    shift = 25 + seed[2] % 50
+    start = colorsys.hls_to_rgb(hue / 360, 0.22 + seed[3] % 10 / 100, 0.65)
+    end = colorsys.hls_to_rgb((hue + shift) % 360 / 360, 0.45 + seed[4] % 10 / 100, 0.75)
+    return tuple(round(c * 255) for c in start), tuple(round(c * 255) for c in end)
+
+def load_font(size: int) -> Any:
+    from PIL import ImageFont
+
+    if size not in _fonts:
+        if not os.path.exists(FONT_PATH):
+            raise FileNotFoundError(f'Cover font not found at {FONT_PATH}; deploy DejaVuSans-Bold.ttf with the function or set COVER_FONT_PATH')
+        _fonts[size] = ImageFont.truetype(FONT_PATH, size)
+    return _fonts[size]
+
+def wrap_title(draw: Any, title: str, font: Any, max_width: int) -> List[str]:
+    chars = max(8, int(max_width / max(1.0, draw.textlength('о', font=font))))
+    lines = textwrap.wrap(title, width=chars)
+    while any(draw.textlength(line, font=font) > max_width for line in lines) and chars > 8:
+        chars -= 2
+        lines = textwrap.wrap(title, width=chars)
+    if len(lines) > MAX_TITLE_LINES:
+        lines = lines[:MAX_TITLE_LINES]
+        lines[-1] = lines[-1].rstrip(' .,:;') + '…'
+    return lines
+
+def render_cover(title: str, category: str) -> Any:
+    from PIL import Image, ImageDraw
+
+    seed = cover_seed(title, category)
+    start, end = cover_palette(seed, category)
+
+    mask = Image.linear_gradient('L').rotate(seed[5] * 360 / 256, resample=Image.BILINEAR).crop((40, 40, 216, 216))
+    mask = mask.resize((COVER_WIDTH, COVER_HEIGHT), Image.BILINEAR)
+    image = Image.composite(Image.new('RGB', mask.size, end), Image.new('RGB', mask.size, start), mask)
+
+    overlay = Image.new('RGBA', image.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    for i in range(3):
+        radius = 120 + seed[6 + i] * 2
+        x = seed[9 + i] * COVER_WIDTH // 256
+        y = seed[12 + i] * COVER_HEIGHT // 256
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=(255, 255, 255, 18 + seed[15] % 16))
+    image = Image.alpha_composite(image.convert('RGBA'), overlay)
+    shade = Image.linear_gradient('L').resize((1, COVER_HEIGHT)).resize((COVER_WIDTH, COVER_HEIGHT), Image.NEAREST).point(lambda value: value * 3 // 5)
+    image = Image.composite(Image.new('RGBA', image.size, (0, 0, 0, 255)), image, shade)
+
+    draw = ImageDraw.Draw(image)
+    margin = 64
+    label_font = load_font(30)
+    draw.rounded_rectangle(
+        (margin, margin, margin + draw.textlength(category, font=label_font) + 40, margin + 52),
+        radius=26, fill=(255, 255, 255)
+    )
+    draw.text((margin + 20, margin + 26), category, font=label_font, fill=start, anchor='lm')
+
+    title_font = load_font(56)
+    lines = wrap_title(draw, title, title_font, COVER_WIDTH - 2 * margin)
+    line_height = 68
+    y = COVER_HEIGHT - margin - line_height * len(lines)
+    for line in lines:
+        draw.text((margin, y), line, font=title_font, fill=(255, 255, 255))
+        y += line_height
+    return image.convert('RGB')
+
+def encode_variants(image: Any) -> Dict[int, bytes]:
+    from PIL import Image
+
+    variants = {}
+    for width in sorted(COVER_SIZES, reverse=True):
+        if width != image.width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS, reducing_gap=2.0)
+        buffer = io.BytesIO()
+        image.save(buffer, 'WEBP', quality=COVER_QUALITY, method=COVER_METHOD)
+        variants[width] = buffer.getvalue()
+    return variants
+
+def render_covers(title: str, category: str) -> Tuple[str, Dict[int, bytes]]:
+    variants = encode_variants(render_cover(title, category))
+    return hashlib.sha256(variants[COVER_WIDTH]).hexdigest(), variants
+
+def cover_url(digest: str, width: int = COVER_WIDTH) -> str:
+    return f'{COVER_BASE_URL}?cover={digest}&w={width}'
+
+def parse_cover_request(digest: str, raw_width: Optional[str]) -> Tuple[str, int]:
+    if not DIGEST_RE.match(digest):
+        raise ValueError('cover must be a 64-character hex digest')
+    width = int(raw_width) if raw_width else COVER_WIDTH
+    if width not in COVER_SIZES:
+        raise ValueError(f"w must be one of {', '.join(map(str, COVER_SIZES))}")
+    return digest, width
+
+def store_covers(cur, covers: List[Tuple[str, Dict[int, bytes]]]) -> None:
+    from psycopg2 import Binary
+    from psycopg2.extras import execute_values
+
+    rows = [(digest, width, Binary(content)) for digest, variants in covers for width, content in variants.items()]
+    if rows:
+        execute_values(cur, "INSERT INTO cover_images (digest, width, content) VALUES %s ON CONFLICT DO NOTHING", rows)
+
+def fetch_cover(cur, digest: str, width: int) -> Optional[bytes]:
+    cur.execute("SELECT content FROM cover_images WHERE digest = %s AND width = %s", (digest, width))
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return bytes(row['content'] if isinstance(row, dict) else row[0])
+
+def backfill_covers(cur, limit: int = 5) -> int:
+    cur.execute(
+        """SELECT id, title, category FROM news_articles
+           WHERE image_url IS NULL OR image_url NOT LIKE %s
+           ORDER BY id DESC LIMIT %s""",
+        (f'{COVER_BASE_URL}?cover=%', limit)
+    )
+    rows: List[Any] = cur.fetchall()
+    covers = [render_covers(row['title'], row['category']) for row in rows]
+    store_covers(cur, covers)
+    for row, (digest, _) in zip(rows, covers):
+        cur.execute("UPDATE news_articles SET image_url = %s WHERE id = %s", (cover_url(digest), row['id']))
+    return len(rows)
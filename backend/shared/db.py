@@ -0,0 +1,99 @@
+'''
+Business: Process-wide PostgreSQL connection pool reused across warm function invocations
+Args: database URL
+Returns: pooled psycopg2 connections, health-checked and replaced after failover
+'''
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+# pool bounds per container; a connection idle longer than DB_HEALTH_CHECK_INTERVAL seconds is pinged before reuse
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', '10'))
+DB_HEALTH_CHECK_INTERVAL = float(os.environ.get('DB_HEALTH_CHECK_INTERVAL', '30'))
+
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_url: Optional[str] = None
+_pool_lock = threading.Lock()
+_last_used: Dict[int, float] = {}
+
+def get_pool(db_url: str) -> ThreadedConnectionPool:
+    global _pool, _pool_url
+    with _pool_lock:
+        if _pool is None or _pool.closed or _pool_url != db_url:
+            if _pool is not None and not _pool.closed:
+                _pool.closeall()
+            _pool = ThreadedConnectionPool(DB_POOL_MIN, max(DB_POOL_MIN, DB_POOL_MAX), db_url)
+            _pool_url = db_url
+            _last_used.clear()
+        return _pool
+
+def reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+        _pool = None
+        _last_used.clear()
+
+def is_healthy(conn) -> bool:
+    if conn.closed:
+        return False
+    last_used = _last_used.get(id(conn))
+    if last_used is None or time.monotonic() - last_used < DB_HEALTH_CHECK_INTERVAL:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute('SELECT 1')
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+def acquire_connection(db_url: str):
+    pool = get_pool(db_url)
+    for _ in range(DB_POOL_MAX + 1):
+        conn = pool.getconn()
+        if is_healthy(conn):
+            return conn
+        _last_used.pop(id(conn), None)
+        pool.putconn(conn, close=True)
+
+    reset_pool()
+    return get_pool(db_url).getconn()
+
+def release_connection(conn) -> None:
+    pool = _pool
+    if pool is None or pool.closed:
+        conn.close()
+        return
+
+    broken = bool(conn.closed)
+    if not broken and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            broken = True
+
+    if broken:
+        _last_used.pop(id(conn), None)
+    else:
+        _last_used[id(conn)] = time.monotonic()
+    try:
+        pool.putconn(conn, close=broken)
+    except PoolError:
+        conn.close()
+
+@contextmanager
+def db_connection(db_url: str) -> Iterator:
+    conn = acquire_connection(db_url)
+    try:
+        yield conn
+    finally:
+        release_connection(conn)
@@ -0,0 +1,317 @@
+'''
+Business: DeepSeek chat client that generates a news article as a {"title", "content"} JSON object
+Args: category and existing titles to avoid; optional streaming callbacks, circuit breaker and deadline
+Returns: dict with title and content of the generated article and the token usage of the call
+'''
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from llm_client import CircuitBreaker, LLMRequestError, post_with_retries
+
+DEEPSEEK_API_URL = os.environ.get('DEEPSEEK_API_URL', 'https://api.deepseek.com/v1/chat/completions')
+DEEPSEEK_MODEL = 'deepseek-chat'
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=10))
+            _session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=10))
+        return _session
+
+class StreamAborted(Exception):
+    pass
+
+class ArticleStreamParser:
+    '''Incremental parser for a flat JSON object of string values, optionally wrapped in a ``` fence'''
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.state = 'start'
+        self.key: Optional[str] = None
+        self.parts: List[str] = []
+        self.fields: Dict[str, str] = {}
+        self.content_length = 0
+
+    @property
+    def done(self) -> bool:
+        return self.state == 'end'
+
+    @property
+    def title(self) -> Optional[str]:
+        return self.fields.get('title')
+
+    @property
+    def partial_content(self) -> str:
+        if 'content' in self.fields:
+            return self.fields['content']
+        if self.state == 'value' and self.key == 'content':
+            return ''.join(self.parts)
+        return ''
+
+    def feed(self, chunk: str) -> None:
+        self.buffer += chunk
+        while self.pos < len(self.buffer) and self.state != 'end':
+            if not self._step():
+                break
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+
+    def finish(self) -> Dict[str, str]:
+        if self.state != 'end':
+            raise ValueError('DeepSeek response ended before the JSON object was complete')
+        if 'title' not in self.fields or 'content' not in self.fields:
+            raise ValueError('DeepSeek response is missing title or content')
+        return {'title': self.fields['title'], 'content': self.fields['content']}
+
+    def _fail(self, expected: str) -> None:
+        found = self.buffer[self.pos:self.pos + 20]
+        raise ValueError(f'Invalid JSON from DeepSeek: expected {expected}, got {found!r}')
+
+    def _skip_whitespace(self) -> bool:
+        while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+            self.pos += 1
+        return self.pos < len(self.buffer)
+
+    def _step(self) -> bool:
+        if self.state in ('value', 'key'):
+            return self._read_string()
+        if not self._skip_whitespace():
+            return False
+
+        char = self.buffer[self.pos]
+        if self.state == 'start':
+            if char == '`':
+                newline = self.buffer.find('\n', self.pos)
+                if newline == -1:
+                    if len(self.buffer) - self.pos > 16:
+                        self._fail('code fence')
+                    return False
+                self.pos = newline + 1
+                return True
+            if char != '{':
+                self._fail('"{"')
+            self.state = 'key_or_end'
+        elif self.state in ('key_or_end', 'key_start'):
+            if char == '}' and self.state == 'key_or_end':
+                self.state = 'end'
+            elif char == '"':
+                self.state = 'key'
+                self.parts = []
+            else:
+                self._fail('object key')
+        elif self.state == 'colon':
+            if char != ':':
+                self._fail('":"')
+            self.state = 'value_start'
+        elif self.state == 'value_start':
+            if char != '"':
+                self._fail('string value')
+            self.state = 'value'
+            self.parts = []
+        elif self.state == 'comma_or_end':
+            if char == ',':
+                self.state = 'key_start'
+            elif char == '}':
+                self.state = 'end'
+            else:
+                self._fail('"," or "}"')
+        self.pos += 1
+        return True
+
+    def _read_string(self) -> bool:
+        buffer = self.buffer
+        while self.pos < len(buffer):
+            char = buffer[self.pos]
+            if char == '"':
+                self.pos += 1
+                value = ''.join(self.parts).encode('utf-16', 'surrogatepass').decode('utf-16')
+                if self.state == 'key':
+                    self.key = value
+                    self.state = 'colon'
+                else:
+                    self.fields[self.key] = value
+                    self.state = 'comma_or_end'
+                return True
+            if char == '\\':
+                if self.pos + 1 >= len(buffer):
+                    return False
+                escape = buffer[self.pos + 1]
+                if escape == 'u':
+                    if self.pos + 6 > len(buffer):
+                        return False
+                    try:
+                        char = chr(int(buffer[self.pos + 2:self.pos + 6], 16))
+                    except ValueError:
+                        self._fail('unicode escape')
+                    self.pos += 6
+                else:
+                    if escape not in ESCAPES:
+                        self._fail('escape sequence')
+                    char = ESCAPES[escape]
+                    self.pos += 2
+            else:
+                end = self.pos
+                while end < len(buffer) and buffer[end] not in '"\\':
+                    end += 1
+                char = buffer[self.pos:end]
+                self.pos = end
+            self.parts.append(char)
+            if self.state == 'value' and self.key == 'content':
+                self.content_length += len(char)
+        return False
+
+ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+def is_streaming_enabled() -> bool:
+    return os.environ.get('DEEPSEEK_STREAM', '1') not in ('0', 'false', 'no')
+
+SYSTEM_PROMPT = """Ты профессиональный журналист, пишущий длинные аналитические статьи. Отвечай ТОЛЬКО валидным JSON.
+
+Требования к каждой статье:
+- Статья на русском языке, на 5000+ слов
+- Тема должна быть актуальной и интересной
+- Используй реальные технологии/компании/события
+- Структура: введение, основная часть с подзаголовками, заключение
+- Пиши профессионально, как журналист топового издания
+
+Верни ТОЛЬКО JSON без дополнительного текста:
+{
+  "title": "Заголовок новости",
+  "content": "Полный текст статьи 5000+ слов"
+}"""
+
+def build_messages(category: str, existing_titles: List[str]) -> List[Dict[str, str]]:
+    existing_titles_text = '\n'.join([f"- {title}" for title in existing_titles[:10]])
+
+    prompt = f"""Создай уникальную новостную статью для категории "{category}".
+
+ВАЖНО: Не повторяй эти темы:
+{existing_titles_text}"""
+
+    return [
+        {'role': 'system', 'content': SYSTEM_PROMPT},
+        {'role': 'user', 'content': prompt}
+    ]
+
+def build_payload(category: str, existing_titles: List[str]) -> Dict[str, Any]:
+    return {
+        'model': DEEPSEEK_MODEL,
+        'messages': build_messages(category, existing_titles),
+        'temperature': 0.9,
+        'max_tokens': 8000
+    }
+
+def parse_article(content: str) -> Dict[str, str]:
+    parser = ArticleStreamParser()
+    parser.feed(content)
+    return parser.finish()
+
+def generate_with_deepseek(
+    category: str,
+    existing_titles: List[str],
+    on_title: Optional[Callable[[str], None]] = None,
+    should_abort: Optional[Callable[[ArticleStreamParser], Optional[str]]] = None,
+    stream: Optional[bool] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    api_key = os.environ.get('DEEPSEEK_API_KEY')
+    if not api_key:
+        raise ValueError('DEEPSEEK_API_KEY not configured')
+
+    if stream is None:
+        stream = is_streaming_enabled()
+
+    response = post_with_retries(
+        get_session(),
+        DEEPSEEK_API_URL,
+        breaker=breaker,
+        deadline=deadline,
+        stream=stream,
+        headers={
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        },
+        json={
+            **build_payload(category, existing_titles),
+            'stream': stream,
+            **({'stream_options': {'include_usage': True}} if stream else {})
+        }
+    )
+
+    try:
+        if not stream:
+            started = time.perf_counter()
+            result = response.json()
+            article = parse_article(result['choices'][0]['message']['content'])
+            parse_ms = (time.perf_counter() - started) * 1000
+            return {**article, 'usage': result.get('usage'), 'parse_ms': parse_ms}
+
+        return read_article_stream(response, on_title, should_abort, deadline)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        if breaker and (deadline is None or time.monotonic() < deadline):
+            breaker.record_failure()
+        raise LLMRequestError(f'DeepSeek response interrupted: {type(e).__name__}: {e}')
+    finally:
+        response.close()
+
+def check_deadline(deadline: Optional[float]) -> None:
+    if deadline is not None and time.monotonic() > deadline:
+        raise LLMRequestError('DeepSeek stream is still running past the time budget')
+
+def read_article_stream(
+    response: requests.Response,
+    on_title: Optional[Callable[[str], None]] = None,
+    should_abort: Optional[Callable[[ArticleStreamParser], Optional[str]]] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    parser = ArticleStreamParser()
+    title_reported = False
+    usage = None
+    parse_seconds = 0.0
+
+    for line in response.iter_lines():
+        check_deadline(deadline)
+        if not line.startswith(b'data:'):
+            continue
+        data = line[5:].strip()
+        if data == b'[DONE]':
+            break
+
+        started = time.perf_counter()
+        chunk = json.loads(data)
+        usage = chunk.get('usage') or usage
+        choices = chunk.get('choices') or []
+        delta = choices[0].get('delta', {}).get('content') if choices else None
+        fed = bool(delta) and not parser.done
+        if fed:
+            parser.feed(delta)
+        parse_seconds += time.perf_counter() - started
+        if not fed:
+            continue
+
+        if not title_reported and parser.title is not None:
+            title_reported = True
+            if on_title:
+                on_title(parser.title)
+
+        if should_abort:
+            reason = should_abort(parser)
+            if reason:
+                raise StreamAborted(reason)
+
+    started = time.perf_counter()
+    article = parser.finish()
+    parse_seconds += time.perf_counter() - started
+    return {**article, 'usage': usage, 'parse_ms': parse_seconds * 1000}
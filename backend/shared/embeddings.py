@@ -0,0 +1,217 @@
+'''
+Business: Semantic novelty check for generated articles via hashed TF-IDF vectors of word stems
+Args: article text; cursor over article embeddings and stem_document_frequency
+Returns: L2-normalized embeddings, the most similar titles of the category and the id of a semantic duplicate
+'''
+
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+EMBEDDING_DIM = 512
+STEM_LENGTH = 5
+MIN_WORD_LENGTH = 3
+# Calibrated with bench/embedding_calibration.py: same-topic pairs score 0.13-0.53 (median 0.30), different topics at most 0.20
+DEFAULT_SIMILARITY_THRESHOLD = 0.22
+MAX_DOCUMENT_SHARE = 0.5
+# HNSW candidates per index scan; the category filter is applied to them, so it is well above the result limit
+SEMANTIC_EF_SEARCH = int(os.environ.get('SEMANTIC_EF_SEARCH', '100'))
+# articles embedded per maintenance tick; scripts/rebuild_embeddings.py catches up a whole table
+EMBEDDING_BACKFILL_BATCH = int(os.environ.get('EMBEDDING_BACKFILL_BATCH', '50'))
+CORPUS_KEY = ''
+
+WORD_RE = re.compile(r'\w+')
+
+STOP_WORDS = frozenset('''
+и в во не что он на я с со как а то все она так его но да ты к у же вы за бы по только ее мне было вот от меня
+еще нет о из ему теперь когда даже ну вдруг ли если уже или ни быть был него до вас нибудь опять уж вам ведь там
+потом себя ничего ей может они тут где есть надо ней для мы тебя их чем была сам чтоб без будто чего раз тоже
+себе под будет ж тогда кто этот того потому этого какой совсем ним здесь этом один почти мой тем чтобы нее
+сейчас были куда зачем всех никогда можно при наконец два об другой хоть после над больше тот через эти нас
+про всего них какая много разве три эту моя впрочем хорошо свою этой перед иногда лучше чуть том нельзя такой
+им более всегда конечно всю между также которые который которая которое это год года году также является
+'''.split())
+
+def get_similarity_threshold() -> float:
+    return float(os.environ.get('SEMANTIC_SIMILARITY_THRESHOLD', DEFAULT_SIMILARITY_THRESHOLD))
+
+def terms(text: str) -> List[str]:
+    return [
+        word[:STEM_LENGTH]
+        for word in WORD_RE.findall(text.lower())
+        if len(word) >= MIN_WORD_LENGTH and word not in STOP_WORDS and not word.isdigit()
+    ]
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def idf_weights(cur, stems: Iterable[str]) -> Dict[str, float]:
+    stems = sorted(set(stems))
+    cur.execute(
+        "SELECT stem, documents FROM stem_document_frequency WHERE stem = ANY(%s)",
+        ([CORPUS_KEY] + stems,)
+    )
+    documents = {row['stem']: row['documents'] for row in cur.fetchall()}
+    total = documents.pop(CORPUS_KEY, 0)
+    # stems found in most articles are this corpus's stop words; even a small weight on them would be
+    # normalized up into noise for a text made almost only of them
+    return {
+        stem: 0.0 if documents.get(stem, 0) > total * MAX_DOCUMENT_SHARE else math.log((1 + total) / (1 + documents.get(stem, 0)))
+        for stem in stems
+    }
+
+def embed(cur, text: str) -> List[float]:
+    counts = Counter(terms(text))
+    idf = idf_weights(cur, counts)
+    vector = [0.0] * EMBEDDING_DIM
+    for stem, count in counts.items():
+        digest = _hash64(stem)
+        weight = (1.0 + math.log(count)) * idf[stem]
+        vector[(digest >> 1) % EMBEDDING_DIM] += weight if digest & 1 else -weight
+
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        return vector
+    return [value / norm for value in vector]
+
+def count_stems(cur, texts: List[str]) -> None:
+    from psycopg2.extras import execute_values
+
+    if not texts:
+        return
+    documents = Counter({CORPUS_KEY: len(texts)})
+    for text in texts:
+        documents.update(set(terms(text)))
+    # sorted so concurrent writers lock the counter rows in the same order
+    execute_values(
+        cur,
+        """INSERT INTO stem_document_frequency AS f (stem, documents) VALUES %s
+           ON CONFLICT (stem) DO UPDATE SET documents = f.documents + EXCLUDED.documents""",
+        sorted(documents.items())
+    )
+
+def cosine(vector1: List[float], vector2: List[float]) -> float:
+    return sum(x * y for x, y in zip(vector1, vector2))
+
+def find_similar(cur, embedding: List[float], category: str, limit: int = 10) -> List[Dict[str, Any]]:
+    cur.execute("SELECT set_config('hnsw.ef_search', %s, true)", (str(max(SEMANTIC_EF_SEARCH, limit)),))
+    cur.execute(
+        """SELECT id, title, -distance AS similarity
+           FROM (
+               (SELECT id, title, embedding <#> %(query)s::vector AS distance FROM news_articles
+                WHERE category = %(category)s AND embedding IS NOT NULL
+                ORDER BY embedding <#> %(query)s::vector
+                LIMIT %(limit)s)
+               UNION ALL
+               (SELECT id, title, embedding <#> %(query)s::vector AS distance FROM news_articles_archive
+                WHERE category = %(category)s AND embedding IS NOT NULL
+                ORDER BY embedding <#> %(query)s::vector
+                LIMIT %(limit)s)
+           ) candidates
+           ORDER BY distance
+           LIMIT %(limit)s""",
+        {'query': embedding, 'category': category, 'limit': limit}
+    )
+    return cur.fetchall()
+
+def find_semantic_duplicate(cur, embedding: List[float], category: str, threshold: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    if threshold is None:
+        threshold = get_similarity_threshold()
+    matches = find_similar(cur, embedding, category, limit=1)
+    if matches and matches[0]['similarity'] >= threshold:
+        return matches[0]
+    return None
+
+def category_centroid(cur, category: str, recent: int = 20) -> Optional[List[float]]:
+    cur.execute(
+        """SELECT AVG(embedding)::text AS centroid
+           FROM (
+               SELECT embedding FROM news_articles
+               WHERE category = %s AND embedding IS NOT NULL
+               ORDER BY created_at DESC
+               LIMIT %s
+           ) recent""",
+        (category, recent)
+    )
+    row = cur.fetchone()
+    if row['centroid'] is None:
+        return None
+    centroid = json.loads(row['centroid'])
+    norm = math.sqrt(sum(value * value for value in centroid))
+    return [value / norm for value in centroid] if norm else None
+
+def similar_titles(cur, category: str, limit: int = 10) -> List[str]:
+    centroid = category_centroid(cur, category)
+    if centroid is None:
+        return []
+    return [row['title'] for row in find_similar(cur, centroid, category, limit)]
+
+def _store_embeddings(cur, table: str, embeddings: List[Tuple[int, List[float]]]) -> None:
+    from psycopg2.extras import execute_values
+
+    if not embeddings:
+        return
+    execute_values(
+        cur,
+        f"UPDATE {table} AS a SET embedding = v.embedding FROM (VALUES %s) AS v(id, embedding) WHERE a.id = v.id",
+        embeddings,
+        template='(%s, %s::vector)'
+    )
+
+def backfill_stem_counts(cur, limit: int = 200) -> int:
+    cur.execute(
+        """SELECT id, title, content FROM news_articles
+           WHERE NOT stems_counted
+           ORDER BY id DESC LIMIT %s
+           FOR UPDATE SKIP LOCKED""",
+        (limit,)
+    )
+    rows: List[Any] = cur.fetchall()
+    count_stems(cur, [f"{row['title']}\n{row['content']}" for row in rows])
+    if rows:
+        cur.execute("UPDATE news_articles SET stems_counted = TRUE WHERE id = ANY(%s)", ([row['id'] for row in rows],))
+    return len(rows)
+
+def backfill_embeddings(cur, limit: int = EMBEDDING_BACKFILL_BATCH) -> int:
+    from articles import decompress_content
+
+    # IDF weights from a partly counted corpus would skew the vectors; wait until every article is counted
+    # (scripts/rebuild_embeddings.py counts and embeds everything at once instead of a batch per tick)
+    cur.execute("SELECT EXISTS (SELECT 1 FROM news_articles WHERE NOT stems_counted) AS pending")
+    if cur.fetchone()['pending']:
+        return 0
+    cur.execute(
+        "SELECT id, title, content FROM news_articles WHERE embedding IS NULL ORDER BY id DESC LIMIT %s",
+        (limit,)
+    )
+    live = [(row['id'], embed(cur, f"{row['title']}\n{row['content']}")) for row in cur.fetchall()]
+    archived = []
+    if len(live) < limit:
+        cur.execute(
+            "SELECT id, title, content FROM news_articles_archive WHERE embedding IS NULL ORDER BY id DESC LIMIT %s",
+            (limit - len(live),)
+        )
+        archived = [(row['id'], embed(cur, f"{row['title']}\n{decompress_content(row['content'])}")) for row in cur.fetchall()]
+    _store_embeddings(cur, 'news_articles', live)
+    _store_embeddings(cur, 'news_articles_archive', archived)
+    return len(live) + len(archived)
+
+def rebuild_embeddings(conn, batch: int = 500) -> int:
+    from psycopg2.extras import RealDictCursor
+
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    while backfill_stem_counts(cur, batch):
+        conn.commit()
+    total = 0
+    while True:
+        embedded = backfill_embeddings(cur, batch)
+        conn.commit()
+        if not embedded:
+            break
+        total += embedded
+    cur.close()
+    return total
@@ -0,0 +1,96 @@
+'''
+Business: Conditional GET support and an in-process response cache for read endpoints
+Args: request event headers; per-category validators read from category_stats
+Returns: ETag / Last-Modified / Cache-Control headers, 304 responses and cached serialized bodies
+'''
+
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Cache-Control max-age for clients; lifetime and entry count of the in-process response cache
+CACHE_MAX_AGE = int(os.environ.get('CACHE_MAX_AGE', '30'))
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '60'))
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '256'))
+
+_responses: Dict[Tuple, Tuple[str, float, Any]] = {}
+
+def get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    headers = event.get('headers') or {}
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+def fetch_validator(cur, category: Optional[str] = None, views: bool = False) -> Tuple[int, Optional[datetime]]:
+    # category_stats.updated_at also moves on every view rollup, so it versions responses that show or sort by views
+    changed = 'updated_at' if views else 'latest_created_at'
+    where = 'WHERE category = %s' if category else ''
+    cur.execute(
+        f"SELECT COALESCE(SUM(article_count - archived_count), 0) AS count, MAX({changed}) AS max FROM category_stats {where}",
+        (category,) if category else None
+    )
+    row = cur.fetchone()
+    if isinstance(row, dict):
+        return int(row['count']), row['max']
+    return int(row[0]), row[1]
+
+def make_etag(validator: Tuple[int, Optional[datetime]], key: Tuple) -> str:
+    count, last_created = validator
+    raw = f"{count}|{last_created.isoformat() if last_created else ''}|{key!r}"
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+def cache_headers(etag: str, validator: Tuple[int, Optional[datetime]]) -> Dict[str, str]:
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'public, max-age={CACHE_MAX_AGE}, stale-while-revalidate={CACHE_MAX_AGE * 2}'
+    }
+    last_created = validator[1]
+    if last_created:
+        headers['Last-Modified'] = format_datetime(last_created.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+    return headers
+
+def is_not_modified(event: Dict[str, Any], etag: str, validator: Tuple[int, Optional[datetime]]) -> bool:
+    if_none_match = get_header(event, 'If-None-Match')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+
+    if_modified_since = get_header(event, 'If-Modified-Since')
+    last_created = validator[1]
+    if if_modified_since and last_created:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_created.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+def not_modified_response(headers: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        'statusCode': 304,
+        'headers': {'Access-Control-Allow-Origin': '*', **headers},
+        'body': '',
+        'isBase64Encoded': False
+    }
+
+def get_cached_response(key: Tuple, etag: str) -> Optional[Any]:
+    entry = _responses.get(key)
+    if entry is None:
+        return None
+    cached_etag, expires_at, response = entry
+    if cached_etag != etag or expires_at < time.monotonic():
+        _responses.pop(key, None)
+        return None
+    return response
+
+def put_cached_response(key: Tuple, etag: str, response: Any) -> None:
+    if RESPONSE_CACHE_TTL <= 0:
+        return
+    _responses.pop(key, None)
+    while len(_responses) >= RESPONSE_CACHE_SIZE:
+        _responses.pop(next(iter(_responses)))
+    _responses[key] = (etag, time.monotonic() + RESPONSE_CACHE_TTL, response)
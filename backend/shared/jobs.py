@@ -0,0 +1,146 @@
+'''
+Business: Postgres-backed generation job queue: enqueue, claim with SKIP LOCKED, retry with backoff
+Args: RealDictCursor over generation_jobs
+Returns: job rows as dicts
+'''
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# first retry delay, doubled per attempt; a running job older than JOB_LOCK_TIMEOUT_SECONDS is reaped as stale
+JOB_RETRY_BASE_SECONDS = int(os.environ.get('JOB_RETRY_BASE_SECONDS', '30'))
+JOB_LOCK_TIMEOUT_SECONDS = int(os.environ.get('JOB_LOCK_TIMEOUT_SECONDS', '600'))
+DEFAULT_MAX_ATTEMPTS = 3
+
+JOB_COLUMNS = '''id, category, status, progress, title, attempts, max_attempts,
+    article_id, error_message, run_after, created_at, updated_at'''
+
+def enqueue_job(cur, category: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Tuple[Optional[Dict[str, Any]], bool]:
+    for _ in range(2):
+        cur.execute(
+            f"""INSERT INTO generation_jobs (category, max_attempts)
+                VALUES (%s, %s)
+                ON CONFLICT (category) WHERE status IN ('queued', 'running') DO NOTHING
+                RETURNING {JOB_COLUMNS}""",
+            (category, max_attempts)
+        )
+        job = cur.fetchone()
+        if job:
+            return job, True
+
+        cur.execute(
+            f"""SELECT {JOB_COLUMNS} FROM generation_jobs
+                WHERE category = %s AND status IN ('queued', 'running')""",
+            (category,)
+        )
+        job = cur.fetchone()
+        if job:
+            return job, False
+    return None, False
+
+def get_job(cur, job_id: int) -> Optional[Dict[str, Any]]:
+    cur.execute(f"SELECT {JOB_COLUMNS} FROM generation_jobs WHERE id = %s", (job_id,))
+    return cur.fetchone()
+
+def reap_stale_jobs(cur) -> int:
+    cur.execute(
+        """UPDATE generation_jobs
+           SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+               error_message = COALESCE(error_message, 'Worker lock expired'),
+               locked_at = NULL,
+               locked_by = NULL,
+               updated_at = NOW()
+           WHERE status = 'running' AND locked_at < NOW() - make_interval(secs => %s)""",
+        (JOB_LOCK_TIMEOUT_SECONDS,)
+    )
+    return cur.rowcount
+
+def seconds_until_next_job(cur) -> Optional[float]:
+    cur.execute(
+        """SELECT EXTRACT(EPOCH FROM MIN(run_after) - NOW()) AS wait
+           FROM generation_jobs
+           WHERE status = 'queued'"""
+    )
+    wait = cur.fetchone()['wait']
+    return max(float(wait), 0.0) if wait is not None else None
+
+def claim_job(cur, worker_id: str) -> Optional[Dict[str, Any]]:
+    cur.execute(
+        f"""UPDATE generation_jobs
+            SET status = 'running',
+                progress = 'claimed',
+                attempts = attempts + 1,
+                locked_at = NOW(),
+                locked_by = %s,
+                updated_at = NOW()
+            WHERE id = (
+                SELECT id FROM generation_jobs
+                WHERE status = 'queued' AND run_after <= NOW()
+                ORDER BY run_after, id
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {JOB_COLUMNS}""",
+        (worker_id,)
+    )
+    return cur.fetchone()
+
+def set_progress(cur, job_id: int, progress: str, title: Optional[str] = None) -> None:
+    cur.execute(
+        """UPDATE generation_jobs
+           SET progress = %s, title = COALESCE(%s, title), updated_at = NOW()
+           WHERE id = %s""",
+        (progress, title, job_id)
+    )
+
+def complete_jobs(cur, completed: List[Tuple[int, int]]) -> None:
+    from psycopg2.extras import execute_values
+
+    execute_values(
+        cur,
+        """UPDATE generation_jobs AS j
+           SET status = 'succeeded', progress = 'done', article_id = v.article_id, error_message = NULL,
+               locked_at = NULL, locked_by = NULL, updated_at = NOW()
+           FROM (VALUES %s) AS v(id, article_id)
+           WHERE j.id = v.id""",
+        completed
+    )
+
+def fail_job(cur, job: Dict[str, Any], error: str) -> str:
+    status = 'queued' if job['attempts'] < job['max_attempts'] else 'failed'
+    backoff = JOB_RETRY_BASE_SECONDS * 2 ** max(job['attempts'] - 1, 0)
+    cur.execute(
+        """UPDATE generation_jobs
+           SET status = %s, progress = NULL, error_message = %s,
+               run_after = NOW() + make_interval(secs => %s),
+               locked_at = NULL, locked_by = NULL, updated_at = NOW()
+           WHERE id = %s""",
+        (status, error, backoff, job['id'])
+    )
+    return status
+
+def defer_job(cur, job: Dict[str, Any], reason: str, delay_seconds: float) -> None:
+    cur.execute(
+        """UPDATE generation_jobs
+           SET status = 'queued', progress = NULL, error_message = %s,
+               attempts = GREATEST(attempts - 1, 0),
+               run_after = NOW() + make_interval(secs => %s),
+               locked_at = NULL, locked_by = NULL, updated_at = NOW()
+           WHERE id = %s""",
+        (reason, delay_seconds, job['id'])
+    )
+
+def serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'job_id': job['id'],
+        'category': job['category'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'title': job['title'],
+        'attempts': job['attempts'],
+        'max_attempts': job['max_attempts'],
+        'article_id': job['article_id'],
+        'error': job['error_message'],
+        'created_at': job['created_at'].isoformat() if job['created_at'] else None,
+        'updated_at': job['updated_at'].isoformat() if job['updated_at'] else None
+    }
@@ -0,0 +1,229 @@
+'''
+Business: Resilient HTTP calls to the LLM provider: rate limit, retries with backoff and a circuit breaker
+Args: requests session, URL and request kwargs
+Returns: a successful response, or CircuitOpen / LLMRequestError raised instead of waiting out timeouts
+'''
+
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+import requests
+from tracing import log_event
+
+# token bucket shared by every invocation
+LLM_RATE_PER_SECOND = float(os.environ.get('LLM_RATE_PER_SECOND', '1'))
+LLM_BURST = float(os.environ.get('LLM_BURST', '5'))
+# jittered exponential backoff between attempts, unless the provider sends Retry-After
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '3'))
+LLM_BACKOFF_BASE = float(os.environ.get('LLM_BACKOFF_BASE', '1'))
+LLM_BACKOFF_MAX = float(os.environ.get('LLM_BACKOFF_MAX', '30'))
+# the stream read timeout bounds the gap between chunks, not the whole response
+LLM_CONNECT_TIMEOUT = float(os.environ.get('LLM_CONNECT_TIMEOUT', '5'))
+LLM_READ_TIMEOUT = float(os.environ.get('LLM_READ_TIMEOUT', '120'))
+LLM_STREAM_READ_TIMEOUT = float(os.environ.get('LLM_STREAM_READ_TIMEOUT', '45'))
+# consecutive failures that open the breaker, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get('BREAKER_FAILURE_THRESHOLD', '5'))
+BREAKER_OPEN_SECONDS = float(os.environ.get('BREAKER_OPEN_SECONDS', '120'))
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+class LLMRequestError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class CircuitOpen(LLMRequestError):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f'Circuit breaker {name} is open, next probe in {retry_after:.0f}s')
+        self.retry_after = retry_after
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, deadline: Optional[float] = None) -> float:
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                raise LLMRequestError(f'Rate limiter wait of {wait:.1f}s exceeds the time budget')
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+_bucket = TokenBucket(LLM_RATE_PER_SECOND, LLM_BURST)
+
+def get_bucket() -> TokenBucket:
+    return _bucket
+
+class CircuitBreaker:
+    '''Consecutive-failure breaker shared by every invocation through the llm_circuit_breakers row'''
+
+    def __init__(self, db_url: str, name: str = 'deepseek',
+                 failure_threshold: int = BREAKER_FAILURE_THRESHOLD, open_seconds: float = BREAKER_OPEN_SECONDS):
+        self.db_url = db_url
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.open_until = 0.0
+
+    def _execute(self, sql: str, params: tuple) -> Optional[tuple]:
+        from db import db_connection
+
+        with db_connection(self.db_url) as conn:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            row = cur.fetchone() if cur.description else None
+            conn.commit()
+            cur.close()
+        return row
+
+    def _fail_fast(self, remaining: float) -> None:
+        self.open_until = time.monotonic() + remaining
+        raise CircuitOpen(self.name, remaining)
+
+    def before_request(self) -> None:
+        remaining = self.open_until - time.monotonic()
+        if remaining > 0:
+            raise CircuitOpen(self.name, remaining)
+
+        row = self._execute(
+            """WITH probe AS (
+                   UPDATE llm_circuit_breakers
+                   SET state = 'half_open', opened_until = NOW() + make_interval(secs => %s), updated_at = NOW()
+                   WHERE name = %s AND state <> 'closed' AND opened_until <= NOW()
+                   RETURNING name
+               )
+               SELECT b.state, EXTRACT(EPOCH FROM b.opened_until - NOW()), EXISTS (SELECT 1 FROM probe)
+               FROM llm_circuit_breakers b
+               WHERE b.name = %s""",
+            (self.open_seconds, self.name, self.name)
+        )
+        if row is None:
+            return
+        state, remaining, probing = row
+        if state != 'closed' and not probing:
+            self._fail_fast(max(0.0, float(remaining or 0)))
+
+    def record_success(self) -> None:
+        self._execute(
+            """UPDATE llm_circuit_breakers
+               SET state = 'closed', failures = 0, updated_at = NOW()
+               WHERE name = %s AND (state <> 'closed' OR failures > 0)""",
+            (self.name,)
+        )
+
+    def record_failure(self) -> str:
+        row = self._execute(
+            """INSERT INTO llm_circuit_breakers AS b (name, state, failures, opened_until, updated_at)
+               VALUES (%s, CASE WHEN %s <= 1 THEN 'open' ELSE 'closed' END, 1, NOW() + make_interval(secs => %s), NOW())
+               ON CONFLICT (name) DO UPDATE SET
+                   failures = b.failures + 1,
+                   state = CASE WHEN b.state = 'half_open' OR b.failures + 1 >= %s THEN 'open' ELSE b.state END,
+                   opened_until = CASE WHEN b.state = 'half_open' OR b.failures + 1 >= %s
+                                       THEN NOW() + make_interval(secs => %s) ELSE b.opened_until END,
+                   updated_at = NOW()
+               RETURNING state""",
+            (self.name, self.failure_threshold, self.open_seconds, self.failure_threshold, self.failure_threshold, self.open_seconds)
+        )
+        state = row[0]
+        if state == 'open':
+            self.open_until = time.monotonic() + self.open_seconds
+        return state
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    if retry_after is not None:
+        return min(retry_after, LLM_BACKOFF_MAX)
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+def post_with_retries(
+    session: requests.Session,
+    url: str,
+    breaker: Optional[CircuitBreaker] = None,
+    deadline: Optional[float] = None,
+    stream: bool = False,
+    **kwargs: Any
+) -> requests.Response:
+    read_timeout = LLM_STREAM_READ_TIMEOUT if stream else LLM_READ_TIMEOUT
+    failure = 'no attempts made'
+    status_code = None
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        if breaker:
+            breaker.before_request()
+        get_bucket().acquire(deadline)
+
+        retry_after = None
+        # a read never waits past the caller's time budget
+        timeout = (LLM_CONNECT_TIMEOUT, read_timeout if deadline is None else max(1.0, min(read_timeout, deadline - time.monotonic())))
+        try:
+            response = session.post(url, timeout=timeout, stream=stream, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            failure = f'{type(e).__name__}: {e}'
+            status_code = None
+        else:
+            if response.status_code < 400:
+                if breaker:
+                    breaker.record_success()
+                return response
+            status_code = response.status_code
+            failure = f'HTTP {status_code}: {response.text[:500]}'
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            response.close()
+            if status_code not in RETRYABLE_STATUSES:
+                raise LLMRequestError(f'LLM API error {failure}', status_code)
+
+        exhausted = attempt == LLM_MAX_RETRIES
+        within_budget = deadline is None or time.monotonic() < deadline
+        if breaker and within_budget and (status_code != 429 or exhausted):
+            breaker.record_failure()
+        delay = backoff_delay(attempt, retry_after)
+        if status_code == 429:
+            get_bucket().pause(delay)
+        if exhausted or (deadline is not None and time.monotonic() + delay > deadline):
+            break
+        log_event('llm_retry', attempt=attempt + 1, status_code=status_code, error=failure, delay_s=round(delay, 1))
+        if status_code != 429:
+            time.sleep(delay)
+
+    raise LLMRequestError(f'LLM API unavailable after {attempt + 1} attempts: {failure}', status_code)
@@ -0,0 +1,101 @@
+'''
+Business: Monthly range partitions of news_articles: create upcoming months, move cold months into the archive
+Args: cursor over news_articles partitions and news_articles_archive
+Returns: names of created partitions and the number of articles archived per call
+'''
+
+import os
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from articles import add_months, compress_content
+
+# months created ahead of inserts; months older than ARCHIVE_AFTER_MONTHS (0 disables archiving)
+# move to the archive, at most ARCHIVE_BATCH articles per call
+PARTITION_AHEAD_MONTHS = int(os.environ.get('PARTITION_AHEAD_MONTHS', '2'))
+ARCHIVE_AFTER_MONTHS = int(os.environ.get('ARCHIVE_AFTER_MONTHS', '12'))
+ARCHIVE_BATCH = int(os.environ.get('ARCHIVE_BATCH', '50'))
+ARCHIVE_COLUMNS = ['id', 'title', 'category', 'image_url', 'word_count', 'created_at', 'excerpt', 'reading_time', 'minhash', 'embedding']
+# LSH buckets stay and signatures and embeddings are copied: archived articles are still candidates for duplicate checks
+DEPENDENT_TABLES = ['article_sections', 'trending_articles']
+
+BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+def _bound(value: str) -> Optional[datetime]:
+    return None if value in ('MINVALUE', 'MAXVALUE') else datetime.fromisoformat(value.strip("'"))
+
+def list_partitions(cur) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    cur.execute(
+        """SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound
+           FROM pg_inherits i
+           JOIN pg_class c ON c.oid = i.inhrelid
+           WHERE i.inhparent = 'news_articles'::regclass"""
+    )
+    partitions = []
+    for row in cur.fetchall():
+        match = BOUND_RE.search(row['bound'])
+        if match:
+            partitions.append((row['name'], _bound(match.group(1)), _bound(match.group(2))))
+    return sorted(partitions, key=lambda partition: partition[1] or datetime.min)
+
+def current_month(cur) -> datetime:
+    cur.execute("SELECT date_trunc('month', LOCALTIMESTAMP) AS month")
+    return cur.fetchone()['month']
+
+def ensure_partitions(cur, since: Optional[datetime] = None, ahead: int = PARTITION_AHEAD_MONTHS) -> List[str]:
+    partitions = list_partitions(cur)
+    newest = current_month(cur)
+    month = datetime(since.year, since.month, 1) if since else newest
+    created = []
+    while month <= add_months(newest, ahead):
+        upper = add_months(month, 1)
+        covered = any(
+            (lower is None or lower < upper) and (bound is None or month < bound)
+            for _, lower, bound in partitions
+        )
+        if not covered:
+            name = f'news_articles_p{month:%Y%m}'
+            cur.execute(f"CREATE TABLE {name} PARTITION OF news_articles FOR VALUES FROM (%s) TO (%s)", (month, upper))
+            created.append(name)
+        month = upper
+    return created
+
+def archive_partitions(cur, months: int = ARCHIVE_AFTER_MONTHS, limit: int = ARCHIVE_BATCH) -> int:
+    from psycopg2.extras import execute_values
+
+    if months <= 0:
+        return 0
+    cutoff = add_months(current_month(cur), -months)
+    cold = [name for name, _, upper in list_partitions(cur) if upper is not None and upper <= cutoff]
+    archived = 0
+    for name in cold:
+        cur.execute(
+            f"SELECT {', '.join(ARCHIVE_COLUMNS)}, content FROM {name} ORDER BY id LIMIT %s FOR UPDATE",
+            (limit - archived,)
+        )
+        rows: List[Any] = cur.fetchall()
+        if rows:
+            execute_values(
+                cur,
+                f"INSERT INTO news_articles_archive ({', '.join(ARCHIVE_COLUMNS)}, content) VALUES %s ON CONFLICT (id) DO NOTHING",
+                [(*(row[column] for column in ARCHIVE_COLUMNS), compress_content(row['content'])) for row in rows]
+            )
+            execute_values(
+                cur,
+                """UPDATE category_stats s
+                   SET archived_count = s.archived_count + v.archived, updated_at = NOW()
+                   FROM (VALUES %s) AS v(category, archived)
+                   WHERE s.category = v.category""",
+                sorted(Counter(row['category'] for row in rows).items())
+            )
+            ids = [row['id'] for row in rows]
+            for table in DEPENDENT_TABLES:
+                cur.execute(f"DELETE FROM {table} WHERE article_id = ANY(%s)", (ids,))
+            cur.execute(f"DELETE FROM {name} WHERE id = ANY(%s)", (ids,))
+            archived += len(rows)
+        if archived >= limit:
+            break
+        cur.execute(f"ALTER TABLE news_articles DETACH PARTITION {name}")
+        cur.execute(f"DROP TABLE {name}")
+    return archived
@@ -0,0 +1,101 @@
+'''
+Business: Fast JSON serialization and Accept-Encoding negotiated compression for response bodies
+Args: cursor rows with column names; request event headers
+Returns: JSON bytes (columnar or objects) and HTTP responses with compressed base64 bodies when cheaper
+'''
+
+import base64
+import gzip
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_BYTES = 1024
+SUPPORTED_ENCODINGS = ['br', 'gzip'] if brotli else ['gzip']
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default).encode('utf-8')
+
+def rows_to_json(columns: Sequence[str], rows: List[Sequence[Any]]) -> bytes:
+    width = len(columns)
+    if rows and len(rows[0]) > width:
+        rows = [row[:width] for row in rows]
+    return dumps({'columns': list(columns), 'rows': rows})
+
+def rows_to_objects_json(columns: Sequence[str], rows: List[Sequence[Any]]) -> bytes:
+    return dumps([dict(zip(columns, row)) for row in rows])
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    for encoding in SUPPORTED_ENCODINGS:
+        if weights.get(encoding, weights.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+def json_response(
+    event: Dict[str, Any],
+    body: bytes,
+    headers: Dict[str, str],
+    status_code: int = 200,
+    compressed: Optional[Dict[str, bytes]] = None
+) -> Dict[str, Any]:
+    headers = {'Content-Type': 'application/json', 'Vary': 'Accept-Encoding', **headers}
+    request_headers = {key.lower(): value for key, value in (event.get('headers') or {}).items()}
+    encoding = negotiate_encoding(request_headers.get('accept-encoding'))
+
+    if encoding and len(body) >= COMPRESSION_MIN_BYTES:
+        packed = compressed.get(encoding) if compressed is not None else None
+        if packed is None:
+            packed = compress(body, encoding)
+            if compressed is not None:
+                compressed[encoding] = packed
+        encoded = base64.b64encode(packed).decode('ascii')
+        if len(encoded) < len(body):
+            headers['Content-Encoding'] = encoding
+            return {
+                'statusCode': status_code,
+                'headers': headers,
+                'body': encoded,
+                'isBase64Encoded': True
+            }
+
+    return {
+        'statusCode': status_code,
+        'headers': headers,
+        'body': body.decode('utf-8'),
+        'isBase64Encoded': False
+    }
@@ -0,0 +1,178 @@
+'''
+Business: Near-duplicate detection for generated articles via MinHash signatures and LSH buckets
+Args: article text; cursor over news_articles / news_articles_archive / article_lsh_buckets
+Returns: signatures, Jaccard estimates and the id of a matching live or archived article
+'''
+
+import hashlib
+import os
+from functools import lru_cache
+import random
+import re
+from typing import Any, Callable, List, Optional, Set, Tuple
+from psycopg2.extras import execute_values
+
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+DEFAULT_JACCARD_THRESHOLD = 0.5
+PARTIAL_CHECK_CHARS = 8000
+# 2^31 - 1 keeps a * h + b below 2^62, so the permutations fit uint64 arrays without overflow
+MERSENNE_PRIME = (1 << 31) - 1
+MINHASH_CHUNK = 2048
+# articles signed per maintenance tick; scripts/rebuild_signatures.py catches up a whole table
+SIGNATURE_BACKFILL_BATCH = int(os.environ.get('SIGNATURE_BACKFILL_BATCH', '50'))
+
+_rng = random.Random(1729)
+PERMUTATIONS = [
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+WORD_RE = re.compile(r'\w+')
+
+def get_jaccard_threshold() -> float:
+    return float(os.environ.get('PLAGIARISM_JACCARD_THRESHOLD', DEFAULT_JACCARD_THRESHOLD))
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    words = WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+@lru_cache(maxsize=None)
+def _permutation_arrays() -> Optional[Tuple[Any, Any]]:
+    # numpy is imported on the first signature so importing this module stays cheap
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return (
+        numpy.array([[a] for a, _ in PERMUTATIONS], dtype=numpy.uint64),
+        numpy.array([[b] for _, b in PERMUTATIONS], dtype=numpy.uint64)
+    )
+
+def minhash_signature(text: str) -> List[int]:
+    hashes = [_hash64(shingle) % MERSENNE_PRIME for shingle in shingles(text)]
+    if not hashes:
+        return [MERSENNE_PRIME] * NUM_PERM
+    arrays = _permutation_arrays()
+    if arrays is None:
+        return [min([(a * h + b) % MERSENNE_PRIME for h in hashes]) for a, b in PERMUTATIONS]
+    import numpy
+
+    perm_a, perm_b = arrays
+    values = numpy.array(hashes, dtype=numpy.uint64)
+    signature = numpy.full(NUM_PERM, MERSENNE_PRIME, dtype=numpy.uint64)
+    for start in range(0, len(values), MINHASH_CHUNK):
+        block = values[start:start + MINHASH_CHUNK]
+        numpy.minimum(signature, ((perm_a * block + perm_b) % MERSENNE_PRIME).min(axis=1), out=signature)
+    return signature.tolist()
+
+def estimate_jaccard(signature1: List[int], signature2: List[int]) -> float:
+    matches = sum(1 for x, y in zip(signature1, signature2) if x == y)
+    return matches / NUM_PERM
+
+def lsh_buckets(signature: List[int]) -> List[Tuple[int, int]]:
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(','.join(map(str, rows)).encode('ascii'), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'big', signed=True)))
+    return buckets
+
+def find_near_duplicate(cur, signature: List[int], threshold: Optional[float] = None) -> Optional[int]:
+    if threshold is None:
+        threshold = get_jaccard_threshold()
+
+    cur.execute(
+        """WITH candidates AS (
+               SELECT DISTINCT article_id FROM article_lsh_buckets
+               WHERE (band, bucket) IN %s
+           )
+           SELECT id, minhash FROM news_articles WHERE id IN (SELECT article_id FROM candidates)
+           UNION ALL
+           SELECT id, minhash FROM news_articles_archive WHERE id IN (SELECT article_id FROM candidates) AND minhash IS NOT NULL""",
+        (tuple(lsh_buckets(signature)),)
+    )
+    for candidate in cur.fetchall():
+        if estimate_jaccard(signature, candidate['minhash']) >= threshold:
+            return candidate['id']
+    return None
+
+def index_buckets(cur, signatures: List[Tuple[int, List[int]]]) -> None:
+    if not signatures:
+        return
+    execute_values(
+        cur,
+        "INSERT INTO article_lsh_buckets (band, bucket, article_id) VALUES %s ON CONFLICT DO NOTHING",
+        [(band, bucket, article_id) for article_id, signature in signatures for band, bucket in lsh_buckets(signature)]
+    )
+
+def _store_signatures(cur, table: str, signatures: List[Tuple[int, List[int]]]) -> None:
+    if not signatures:
+        return
+    execute_values(
+        cur,
+        f"UPDATE {table} AS a SET minhash = v.minhash FROM (VALUES %s) AS v(id, minhash) WHERE a.id = v.id",
+        signatures,
+        template='(%s, %s::bigint[])'
+    )
+
+def backfill_signatures(cur, limit: int = SIGNATURE_BACKFILL_BATCH) -> int:
+    from articles import decompress_content
+
+    cur.execute(
+        "SELECT id, content FROM news_articles WHERE minhash IS NULL ORDER BY id DESC LIMIT %s",
+        (limit,)
+    )
+    live = [(row['id'], minhash_signature(row['content'])) for row in cur.fetchall()]
+    archived = []
+    if len(live) < limit:
+        cur.execute(
+            "SELECT id, content FROM news_articles_archive WHERE minhash IS NULL ORDER BY id DESC LIMIT %s",
+            (limit - len(live),)
+        )
+        archived = [(row['id'], minhash_signature(decompress_content(row['content']))) for row in cur.fetchall()]
+    _store_signatures(cur, 'news_articles', live)
+    _store_signatures(cur, 'news_articles_archive', archived)
+    index_buckets(cur, live + archived)
+    return len(live) + len(archived)
+
+def rebuild_signatures(conn, batch: int = 500) -> int:
+    from psycopg2.extras import RealDictCursor
+
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    total = 0
+    while True:
+        signed = backfill_signatures(cur, batch)
+        conn.commit()
+        if not signed:
+            break
+        total += signed
+    cur.close()
+    return total
+
+def normalize_title(title: str) -> str:
+    return ' '.join(WORD_RE.findall(title.lower()))
+
+def make_duplicate_guard(cur, existing_titles: List[str], check_every: int = PARTIAL_CHECK_CHARS) -> Callable[[Any], Optional[str]]:
+    known_titles = {normalize_title(title) for title in existing_titles}
+    next_check = check_every
+
+    def guard(parser: Any) -> Optional[str]:
+        nonlocal next_check
+        if parser.title is not None and normalize_title(parser.title) in known_titles:
+            return f'Title repeats an existing article: {parser.title}'
+        if parser.content_length >= next_check:
+            next_check = parser.content_length + check_every
+            duplicate_id = find_near_duplicate(cur, minhash_signature(parser.partial_content))
+            if duplicate_id is not None:
+                return f'Content near-duplicates article {duplicate_id}'
+        return None
+
+    return guard
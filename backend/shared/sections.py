@@ -0,0 +1,109 @@
+'''
+Business: Split article content into sections at its subheadings so readers can page through long articles
+Args: article content (plain text or markdown headings); cursor over article_sections
+Returns: ordered sections with heading, body and word count; bulk inserts and section range reads
+'''
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+MAX_SECTION_WORDS = 600
+MAX_HEADING_WORDS = 12
+SECTION_FIELDS = ['ordinal', 'heading', 'body']
+
+MARKDOWN_HEADING_RE = re.compile(r'^\s*#{1,6}\s+(.+?)\s*#*\s*$')
+BOLD_HEADING_RE = re.compile(r'^\s*\*\*(.+?)\*\*\s*$')
+TERMINAL_PUNCTUATION = '.!?…;,»"'
+
+def heading_text(line: str, next_line: Optional[str]) -> Optional[str]:
+    match = MARKDOWN_HEADING_RE.match(line) or BOLD_HEADING_RE.match(line)
+    if match:
+        return match.group(1).strip()
+    stripped = line.strip()
+    if (
+        stripped and next_line is not None and next_line.strip()
+        and len(stripped.split()) <= MAX_HEADING_WORDS
+        and stripped[-1] not in TERMINAL_PUNCTUATION
+        and stripped[0].isupper()
+    ):
+        return stripped.rstrip(':')
+    return None
+
+def _chunk(heading: Optional[str], paragraphs: List[str]) -> List[Tuple[Optional[str], List[str]]]:
+    chunks: List[Tuple[Optional[str], List[str]]] = []
+    current: List[str] = []
+    words = 0
+    for paragraph in paragraphs:
+        paragraph_words = len(paragraph.split())
+        if current and words + paragraph_words > MAX_SECTION_WORDS:
+            chunks.append((heading if not chunks else None, current))
+            current, words = [], 0
+        current.append(paragraph)
+        words += paragraph_words
+    if current or heading:
+        chunks.append((heading if not chunks else None, current))
+    return chunks
+
+def split_sections(content: str) -> List[Dict[str, Any]]:
+    lines = [line for line in content.splitlines() if line.strip()]
+    groups: List[Tuple[Optional[str], List[str]]] = []
+    heading: Optional[str] = None
+    paragraphs: List[str] = []
+    for index, line in enumerate(lines):
+        title = heading_text(line, lines[index + 1] if index + 1 < len(lines) else None)
+        if title is not None:
+            if heading is not None or paragraphs:
+                groups.append((heading, paragraphs))
+            heading, paragraphs = title, []
+        else:
+            paragraphs.append(line.strip())
+    if heading is not None or paragraphs:
+        groups.append((heading, paragraphs))
+
+    sections = []
+    for group_heading, group_paragraphs in groups:
+        for chunk_heading, chunk_paragraphs in _chunk(group_heading, group_paragraphs):
+            body = '\n'.join(chunk_paragraphs)
+            sections.append({
+                'ordinal': len(sections),
+                'heading': chunk_heading,
+                'body': body,
+                'word_count': len(body.split())
+            })
+    return sections
+
+def store_sections(cur, articles: List[Tuple[int, List[Dict[str, Any]]]]) -> None:
+    from psycopg2.extras import execute_values
+
+    rows = [
+        (article_id, section['ordinal'], section['heading'], section['body'], section['word_count'])
+        for article_id, sections in articles
+        for section in sections
+    ]
+    if rows:
+        execute_values(
+            cur,
+            "INSERT INTO article_sections (article_id, ordinal, heading, body, word_count) VALUES %s ON CONFLICT DO NOTHING",
+            rows
+        )
+
+def fetch_sections(cur, article_id: int, start: int, end: int) -> List[Sequence[Any]]:
+    cur.execute(
+        f"""SELECT {', '.join(SECTION_FIELDS)} FROM article_sections
+            WHERE article_id = %s AND ordinal BETWEEN %s AND %s
+            ORDER BY ordinal""",
+        (article_id, start, end)
+    )
+    return cur.fetchall()
+
+def backfill_sections(cur, limit: int = 20) -> int:
+    cur.execute(
+        "SELECT id, content FROM news_articles WHERE section_count IS NULL ORDER BY id DESC LIMIT %s",
+        (limit,)
+    )
+    rows: List[Any] = cur.fetchall()
+    articles = [(row['id'], split_sections(row['content'])) for row in rows]
+    store_sections(cur, articles)
+    for article_id, sections in articles:
+        cur.execute("UPDATE news_articles SET section_count = %s WHERE id = %s", (len(sections), article_id))
+    return len(rows)
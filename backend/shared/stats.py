@@ -0,0 +1,94 @@
+'''
+Business: Materialized per-category aggregates and precomputed trending lists ranked by time-decayed views
+Args: cursor over category_stats, trending_articles and article_view_counts; inserted articles
+Returns: updated category rows, refreshed trending lists and cheap reads for the stats endpoint
+'''
+
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from articles import FIELD_COLUMNS
+from views import TRENDING_HALF_LIFE_HOURS
+
+# articles per trending list; only articles viewed within TRENDING_WINDOW_HOURS are ranked
+TRENDING_LIMIT = int(os.environ.get('TRENDING_LIMIT', '20'))
+TRENDING_WINDOW_HOURS = float(os.environ.get('TRENDING_WINDOW_HOURS', str(TRENDING_HALF_LIFE_HOURS * 6)))
+STATS_FIELDS = ['category', 'article_count', 'total_words', 'total_views', 'latest_created_at']
+TRENDING_LOCK_ID = 7_100_019
+TRENDING_FIELDS = ['id', 'title', 'category', 'image_url', 'created_at', 'view_count', 'excerpt', 'reading_time']
+
+def apply_article_stats(cur, articles: List[Dict[str, Any]]) -> None:
+    from psycopg2.extras import execute_values
+
+    totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for article in articles:
+        totals[article['category']][0] += 1
+        totals[article['category']][1] += article['word_count']
+    if not totals:
+        return
+    execute_values(
+        cur,
+        """INSERT INTO category_stats AS s (category, article_count, total_words, latest_created_at, updated_at)
+           VALUES %s
+           ON CONFLICT (category) DO UPDATE
+           SET article_count = s.article_count + EXCLUDED.article_count,
+               total_words = s.total_words + EXCLUDED.total_words,
+               latest_created_at = GREATEST(s.latest_created_at, EXCLUDED.latest_created_at),
+               updated_at = EXCLUDED.updated_at""",
+        [(category, count, words) for category, (count, words) in sorted(totals.items())],
+        template='(%s, %s, %s, LOCALTIMESTAMP, NOW())'
+    )
+
+def refresh_trending(cur, limit: int = TRENDING_LIMIT) -> int:
+    cur.execute("SELECT pg_try_advisory_xact_lock(%s) AS locked", (TRENDING_LOCK_ID,))
+    row = cur.fetchone()
+    if not (row['locked'] if isinstance(row, dict) else row[0]):
+        return 0
+    cur.execute("DELETE FROM trending_articles")
+    cur.execute(
+        """WITH scored AS (
+               SELECT vc.article_id, a.category,
+                      vc.trending_score * exp(-ln(2) * EXTRACT(EPOCH FROM (NOW() - vc.updated_at)) / %s) AS score
+               FROM article_view_counts vc
+               JOIN news_articles a ON a.id = vc.article_id
+               WHERE vc.updated_at > NOW() - make_interval(secs => %s) AND vc.trending_score > 0
+           ),
+           ranked AS (
+               SELECT article_id, category, score,
+                      ROW_NUMBER() OVER (ORDER BY score DESC, article_id DESC) AS overall,
+                      ROW_NUMBER() OVER (PARTITION BY category ORDER BY score DESC, article_id DESC) AS in_category
+               FROM scored
+           )
+           INSERT INTO trending_articles (scope, position, article_id, score, refreshed_at)
+           SELECT 'all', overall, article_id, score, NOW() FROM ranked WHERE overall <= %s
+           UNION ALL
+           SELECT category, in_category, article_id, score, NOW() FROM ranked WHERE in_category <= %s""",
+        (TRENDING_HALF_LIFE_HOURS * 3600, TRENDING_WINDOW_HOURS * 3600, limit, limit)
+    )
+    return cur.rowcount
+
+def fetch_stats_validator(cur) -> Tuple[int, Optional[datetime]]:
+    cur.execute(
+        """SELECT (SELECT COALESCE(SUM(article_count), 0) FROM category_stats),
+                  GREATEST((SELECT MAX(updated_at) FROM category_stats), (SELECT MAX(refreshed_at) FROM trending_articles))"""
+    )
+    row = cur.fetchone()
+    return int(row[0]), row[1]
+
+def fetch_category_stats(cur) -> List[Sequence[Any]]:
+    cur.execute(f"SELECT {', '.join(STATS_FIELDS)} FROM category_stats ORDER BY category")
+    return cur.fetchall()
+
+def fetch_trending(cur, scope: str = 'all', limit: int = TRENDING_LIMIT) -> List[Sequence[Any]]:
+    cur.execute(
+        f"""SELECT {', '.join(FIELD_COLUMNS[field] for field in TRENDING_FIELDS)}, t.score
+            FROM trending_articles t
+            JOIN news_articles a ON a.id = t.article_id
+            LEFT JOIN article_view_counts vc ON vc.article_id = a.id
+            WHERE t.scope = %s
+            ORDER BY t.position
+            LIMIT %s""",
+        (scope, limit)
+    )
+    return cur.fetchall()
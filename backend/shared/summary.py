@@ -0,0 +1,49 @@
+'''
+Business: Precompute list-view summary fields for an article at write time
+Args: article content as generated (plain text with optional markdown markup)
+Returns: dict with excerpt, preview and reading_time stored next to the article
+'''
+
+import math
+import re
+from typing import Any, Dict, List
+
+EXCERPT_LENGTH = 280
+PREVIEW_LENGTH = 1000
+WORDS_PER_MINUTE = 200
+
+HEADING_RE = re.compile(r'^\s*#{1,6}\s+')
+LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+MARKUP_RE = re.compile(r'[*_`~>]+')
+LIST_MARKER_RE = re.compile(r'^\s*(?:[-+•]|\d+[.)])\s+')
+SPACES_RE = re.compile(r'\s+')
+
+def plain_paragraphs(content: str) -> List[str]:
+    paragraphs = []
+    for line in content.splitlines():
+        if not line.strip() or HEADING_RE.match(line):
+            continue
+        line = LINK_RE.sub(r'\1', line)
+        line = LIST_MARKER_RE.sub('', line)
+        line = MARKUP_RE.sub('', line)
+        line = SPACES_RE.sub(' ', line).strip()
+        if line:
+            paragraphs.append(line)
+    return paragraphs
+
+def truncate(text: str, length: int) -> str:
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(' ', 1)[0].rstrip(' ,.;:—-')
+    return f'{cut}…'
+
+def reading_time(word_count: int) -> int:
+    return max(1, math.ceil(word_count / WORDS_PER_MINUTE))
+
+def build_summary(content: str, word_count: int) -> Dict[str, Any]:
+    plain_text = ' '.join(plain_paragraphs(content))
+    return {
+        'excerpt': truncate(plain_text, EXCERPT_LENGTH),
+        'preview': truncate(plain_text, PREVIEW_LENGTH),
+        'reading_time': reading_time(word_count)
+    }
@@ -0,0 +1,72 @@
+'''
+Business: Per-stage timing for handler invocations with structured JSON logs persisted into generation_log
+Args: trace name and context fields; named stages timed with a context manager
+Returns: stage durations in milliseconds, JSON log lines and bulk-inserted generation_log rows
+'''
+
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+STAGES = ['db_connect', 'fetch_existing', 'llm_request', 'parse', 'similarity_check', 'insert']
+TOKEN_FIELDS = ['prompt_tokens', 'completion_tokens', 'prompt_cache_hit_tokens']
+
+class Trace:
+    def __init__(self, name: str, **context: Any):
+        self.name = name
+        self.context = context
+        self.durations: Dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + elapsed_ms
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def emit(self, **fields: Any) -> None:
+        print(json.dumps({
+            'trace': self.name,
+            **self.context,
+            **fields,
+            'stages_ms': {name: round(value, 1) for name, value in self.durations.items()},
+            'total_ms': round(self.total_ms, 1)
+        }, ensure_ascii=False, default=str))
+
+def log_event(name: str, **fields: Any) -> None:
+    print(json.dumps({'event': name, **fields}, ensure_ascii=False, default=str))
+
+def log_generations(cur, entries: List[Dict[str, Any]]) -> None:
+    from psycopg2.extras import execute_values
+
+    columns = ['category', 'status', 'job_id', 'error_message', 'total_ms'] + [f'{stage}_ms' for stage in STAGES] + TOKEN_FIELDS
+    rows = []
+    for entry in entries:
+        trace: Trace = entry['trace']
+        usage = entry.get('usage') or {}
+        rows.append(
+            [entry['category'], entry['status'], entry.get('job_id'), entry.get('error_message'), round(trace.total_ms, 1)]
+            + [round(trace.durations[stage], 1) if stage in trace.durations else None for stage in STAGES]
+            + [usage.get(field) for field in TOKEN_FIELDS]
+        )
+    if not rows:
+        return
+
+    execute_values(cur, f"INSERT INTO generation_log ({', '.join(columns)}) VALUES %s", rows)
+    for entry in entries:
+        usage = entry.get('usage') or {}
+        entry['trace'].emit(
+            status=entry['status'],
+            error=entry.get('error_message'),
+            **{field: usage.get(field) for field in TOKEN_FIELDS}
+        )
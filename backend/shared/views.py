@@ -0,0 +1,137 @@
+'''
+Business: Write-behind article view counting: in-process buffer, append-only delta log, periodic rollup
+Args: article ids per view event
+Returns: view counts folded into article_view_counts, trending scores and category_stats view totals
+'''
+
+import os
+import threading
+import time
+from collections import Counter
+from typing import Iterable
+
+# minimum interval between rollups from a container; trending scores halve every TRENDING_HALF_LIFE_HOURS
+VIEW_ROLLUP_SECONDS = float(os.environ.get('VIEW_ROLLUP_SECONDS', '60'))
+TRENDING_HALF_LIFE_HOURS = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', '12'))
+ROLLUP_LOCK_ID = 7_100_011
+
+_buffer: Counter = Counter()
+_buffered_events = 0
+_buffer_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_last_rollup = 0.0
+
+def record_views(article_ids: Iterable[int]) -> int:
+    global _buffered_events
+    count = 0
+    with _buffer_lock:
+        for article_id in article_ids:
+            _buffer[article_id] += 1
+            count += 1
+        _buffered_events += count
+    return count
+
+def take_buffer() -> Counter:
+    global _buffer, _buffered_events
+    with _buffer_lock:
+        pending = _buffer
+        _buffer = Counter()
+        _buffered_events = 0
+    return pending
+
+def restore_buffer(pending: Counter) -> None:
+    global _buffered_events
+    with _buffer_lock:
+        _buffer.update(pending)
+        _buffered_events += sum(pending.values())
+
+def flush_views(conn) -> int:
+    from psycopg2.extras import execute_values
+
+    # Nothing may stay buffered once an invocation returns: the container can be frozen or recycled before the next one.
+    # Waiting on the lock lets one insert carry the views of every thread that recorded while the previous flush ran.
+    _flush_lock.acquire()
+    try:
+        pending = take_buffer()
+        if not pending:
+            return 0
+        cur = conn.cursor()
+        try:
+            execute_values(
+                cur,
+                "INSERT INTO article_views (article_id, views) VALUES %s",
+                sorted(pending.items())
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            restore_buffer(pending)
+            raise
+        finally:
+            cur.close()
+        maybe_rollup(conn)
+        return len(pending)
+    finally:
+        _flush_lock.release()
+
+def rollup_views(cur) -> int:
+    # Archived articles are still served by id, so their views count too; events for ids that exist in neither table
+    # (deleted articles or forged ids) are dropped with the rest of the log on purpose.
+    cur.execute("SELECT pg_try_advisory_xact_lock(%s) AS locked", (ROLLUP_LOCK_ID,))
+    row = cur.fetchone()
+    if not (row['locked'] if isinstance(row, dict) else row[0]):
+        return 0
+    cur.execute(
+        """WITH moved AS (
+               DELETE FROM article_views
+               RETURNING article_id, views
+           ),
+           totals AS (
+               SELECT m.article_id, a.category, SUM(m.views) AS views
+               FROM moved m
+               JOIN (
+                   SELECT id, category FROM news_articles
+                   UNION ALL
+                   SELECT id, category FROM news_articles_archive
+               ) a ON a.id = m.article_id
+               GROUP BY m.article_id, a.category
+           ),
+           counted AS (
+               INSERT INTO article_view_counts AS vc (article_id, view_count, trending_score, updated_at)
+               SELECT article_id, views, views, NOW()
+               FROM totals
+               ON CONFLICT (article_id) DO UPDATE
+               SET view_count = vc.view_count + EXCLUDED.view_count,
+                   trending_score = vc.trending_score
+                       * exp(GREATEST(-ln(2) * EXTRACT(EPOCH FROM (EXCLUDED.updated_at - vc.updated_at)) / %s, -700))
+                       + EXCLUDED.trending_score,
+                   updated_at = EXCLUDED.updated_at
+               RETURNING article_id
+           ),
+           categorized AS (
+               UPDATE category_stats s
+               SET total_views = s.total_views + c.views, updated_at = NOW()
+               FROM (SELECT category, SUM(views) AS views FROM totals GROUP BY category) c
+               WHERE s.category = c.category
+           )
+           SELECT COUNT(*) AS updated FROM counted""",
+        (TRENDING_HALF_LIFE_HOURS * 3600,)
+    )
+    row = cur.fetchone()
+    return row['updated'] if isinstance(row, dict) else row[0]
+
+def maybe_rollup(conn) -> int:
+    global _last_rollup
+    if time.monotonic() - _last_rollup < VIEW_ROLLUP_SECONDS:
+        return 0
+    _last_rollup = time.monotonic()
+    cur = conn.cursor()
+    try:
+        updated = rollup_views(cur)
+        conn.commit()
+        return updated
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
@@ -0,0 +1,75 @@
+'''
+Synthetic Russian news corpus for the benchmarks: a small fixed vocabulary or a Zipf-distributed one with topic words
+'''
+
+import bisect
+import itertools
+import random
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+VOCABULARY = (
+    'рынок компания технология разработка данные сеть система пользователь проект решение '
+    'инвестиция криптовалюта биржа токен блокчейн игра студия релиз игрок платформа '
+    'экономика банк ставка инфляция рост снижение правительство страна мир событие '
+    'эксперт аналитик исследование отчёт квартал год новый крупный мировой российский '
+    'облако сервер искусственный интеллект модель алгоритм безопасность атака защита '
+    'запуск обновление версия функция интерфейс рынка компании данных системы проекта '
+    'который также однако поэтому кроме того более менее очень уже ещё только '
+    'заявил сообщил отметил подчеркнул объявил представил выпустил увеличил сократил'
+).split()
+
+def synthetic_article(rng: random.Random, words: int) -> str:
+    sentences = []
+    total = 0
+    while total < words:
+        length = rng.randint(8, 20)
+        sentence = ' '.join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + '.')
+        total += length
+    return ' '.join(sentences)
+
+def mutate(rng: random.Random, text: str, ratio: float) -> str:
+    words = text.split()
+    for i in range(len(words)):
+        if rng.random() < ratio:
+            words[i] = rng.choice(VOCABULARY)
+    return ' '.join(words)
+
+SYLLABLES = [consonant + vowel for consonant in 'бвгдзклмнпрстфхцчшщ' for vowel in 'аеиоуыэюя']
+ENDINGS = ['', 'а', 'ы', 'ов', 'ой', 'ами', 'ение', 'ость', 'ский', 'ать']
+ZIPF_VOCABULARY_SIZE = 50000
+ZIPF_EXPONENT = 1.05
+TOPIC_WORDS = 40
+TOPIC_SHARE = 0.2
+
+@lru_cache(maxsize=None)
+def zipf_vocabulary(size: int = ZIPF_VOCABULARY_SIZE) -> Tuple[List[str], List[float]]:
+    rng = random.Random(1861)
+    words, seen = [], set()
+    while len(words) < size:
+        word = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) + rng.choice(ENDINGS)
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words, list(itertools.accumulate(1 / rank ** ZIPF_EXPONENT for rank in range(1, size + 1)))
+
+def topic_words(topic: int) -> List[str]:
+    words, _ = zipf_vocabulary()
+    # mid-frequency words: rare enough to carry IDF weight, common enough to recur across a topic's articles
+    return random.Random(topic).sample(words[200:20000], TOPIC_WORDS)
+
+def zipf_article(rng: random.Random, words: int, topic: Optional[int] = None) -> str:
+    vocabulary, cumulative = zipf_vocabulary()
+    focus = topic_words(topic if topic is not None else rng.randrange(1000))
+    sentences = []
+    total = 0
+    while total < words:
+        length = rng.randint(8, 20)
+        sentence = ' '.join(
+            rng.choice(focus) if rng.random() < TOPIC_SHARE else vocabulary[bisect.bisect(cumulative, rng.random() * cumulative[-1])]
+            for _ in range(length)
+        )
+        sentences.append(sentence.capitalize() + '.')
+        total += length
+    return ' '.join(sentences)
@@ -0,0 +1,60 @@
+'''
+Benchmark: bulk cover rendering throughput, WebP variant sizes and determinism of content-addressed digests
+Usage: python bench/covers_bench.py [--covers 200] [--processes 4]
+'''
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from corpus import synthetic_article
+from pg import ROOT, CATEGORIES, percentile
+
+sys.path.insert(0, os.path.join(ROOT, 'backend', 'shared'))
+import covers
+
+def render_timed(item: tuple) -> tuple:
+    title, category = item
+    start = time.perf_counter()
+    digest, variants = covers.render_covers(title, category)
+    return digest, {width: len(content) for width, content in variants.items()}, (time.perf_counter() - start) * 1000
+
+def run(label: str, items: list, processes: int) -> list:
+    start = time.perf_counter()
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(render_timed, items, chunksize=8))
+    else:
+        results = [render_timed(item) for item in items]
+    total = time.perf_counter() - start
+    latencies = [elapsed for _, _, elapsed in results]
+    print(
+        f'{label:<12}: {len(items) / total:7.1f} covers/s | p50 {percentile(latencies, 0.5):7.1f} ms | '
+        f'p95 {percentile(latencies, 0.95):7.1f} ms | p99 {percentile(latencies, 0.99):7.1f} ms'
+    )
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--covers', type=int, default=200)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    items = [(synthetic_article(rng, rng.randint(6, 24)), CATEGORIES[i % len(CATEGORIES)]) for i in range(args.covers)]
+
+    serial = run('serial', items, 1)
+    if args.processes > 1:
+        parallel = run(f'{args.processes} procs', items, args.processes)
+        assert [digest for digest, _, _ in serial] == [digest for digest, _, _ in parallel], 'cover digests differ between runs'
+
+    for width in covers.COVER_SIZES:
+        sizes = [variants[width] for _, variants, _ in serial]
+        print(f'{width:>5}w WebP : avg {sum(sizes) / len(sizes) / 1024:6.1f} KiB | max {max(sizes) / 1024:6.1f} KiB')
+    print(f'unique digests: {len({digest for digest, _, _ in serial})} of {len(items)}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+'''
+Fault-injection check of the DeepSeek client: Retry-After, backoff, timeouts, rate limit and circuit breaker
+Usage: python bench/deepseek_faults.py [--dsn postgresql://localhost/postgres]
+'''
+
+import argparse
+import os
+import sys
+import time
+
+from fake_deepseek import FakeDeepSeek
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dsn', help='run the circuit breaker scenarios against this Postgres')
+    parser.add_argument('--schema', default='bench_breaker')
+    args = parser.parse_args()
+
+    fake = FakeDeepSeek(words=200).start()
+    os.environ.update({
+        'DEEPSEEK_API_URL': fake.url,
+        'DEEPSEEK_API_KEY': 'test',
+        'LLM_CONNECT_TIMEOUT': '1',
+        'LLM_READ_TIMEOUT': '0.5',
+        'LLM_STREAM_READ_TIMEOUT': '0.5',
+        'LLM_BACKOFF_BASE': '0.05',
+        'LLM_BACKOFF_MAX': '2',
+        'LLM_MAX_RETRIES': '3',
+        'LLM_RATE_PER_SECOND': '1000',
+        'LLM_BURST': '1000'
+    })
+    sys.path.insert(0, os.path.join(ROOT, 'backend', 'shared'))
+    import llm_client
+    from deepseek import generate_with_deepseek
+
+    failures = []
+
+    def check(name: str, faults: list, expect: str, stream: bool = False, breaker=None,
+              requests: int = None, min_seconds: float = 0.0, max_seconds: float = 30.0, budget: float = None) -> None:
+        fake.script(*faults)
+        start = time.perf_counter()
+        deadline = time.monotonic() + budget if budget is not None else None
+        try:
+            generate_with_deepseek('IT', [], stream=stream, breaker=breaker, deadline=deadline)
+            outcome = 'ok'
+        except llm_client.CircuitOpen:
+            outcome = 'circuit_open'
+        except llm_client.LLMRequestError:
+            outcome = 'error'
+        elapsed = time.perf_counter() - start
+        problems = []
+        if outcome != expect:
+            problems.append(f'expected {expect}, got {outcome}')
+        if requests is not None and fake.requests != requests:
+            problems.append(f'expected {requests} requests, got {fake.requests}')
+        if not min_seconds <= elapsed <= max_seconds:
+            problems.append(f'took {elapsed:.2f}s, expected {min_seconds}-{max_seconds}s')
+        print(f"{'PASS' if not problems else 'FAIL'} {name:<28} {outcome:<13} {fake.requests} requests {elapsed:6.2f}s {'; '.join(problems)}")
+        if problems:
+            failures.append(name)
+
+    check('429 honours Retry-After', ['retry:429:1', 'ok'], 'ok', requests=2, min_seconds=1.0)
+    check('5xx backoff then success', ['status:503', 'status:502', 'ok'], 'ok', requests=3)
+    check('dropped connection', ['drop', 'ok'], 'ok', requests=2)
+    check('read timeout exhausts', ['hang:2'] * 4, 'error', requests=4, max_seconds=6.0)
+    check('400 is not retried', ['status:400'], 'error', requests=1, max_seconds=1.0)
+    check('stalled stream', ['stall:2'], 'error', stream=True, requests=1, max_seconds=2.0)
+    check('stream past deadline', ['trickle:0.3'], 'error', stream=True, requests=1, max_seconds=1.0, budget=0.5)
+    check('stream within deadline', ['trickle:0.01'], 'ok', stream=True, requests=1, budget=5.0)
+
+    llm_client._bucket = llm_client.TokenBucket(rate=5, capacity=1)
+    start = time.perf_counter()
+    for _ in range(6):
+        llm_client.get_bucket().acquire()
+    elapsed = time.perf_counter() - start
+    print(f"{'PASS' if elapsed >= 0.95 else 'FAIL'} {'token bucket 5/s':<28} 6 acquires {elapsed:6.2f}s")
+    if elapsed < 0.95:
+        failures.append('token bucket')
+    llm_client._bucket = llm_client.TokenBucket(rate=1000, capacity=1000)
+
+    if args.dsn:
+        from pg import connect, schema_dsn, apply_migrations
+
+        conn = connect(args.dsn, args.schema)
+        apply_migrations(conn)
+        conn.close()
+        dsn = schema_dsn(args.dsn, args.schema)
+
+        def breaker():
+            return llm_client.CircuitBreaker(dsn, failure_threshold=3, open_seconds=1.5)
+
+        check('breaker opens on failures', ['status:503'] * 10, 'circuit_open', breaker=breaker(), requests=3)
+        check('open breaker fails fast', ['ok'], 'circuit_open', breaker=breaker(), requests=0, max_seconds=0.5)
+        time.sleep(1.6)
+        check('failed probe reopens', ['status:503'], 'circuit_open', breaker=breaker(), requests=1)
+        time.sleep(1.6)
+        check('probe closes breaker', ['ok'], 'ok', breaker=breaker(), requests=1)
+        check('closed breaker passes', ['ok'], 'ok', breaker=breaker(), requests=1)
+
+    fake.stop()
+    if failures:
+        print(f"failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+'''
+Concurrency check of the job queue: every job generated exactly once, in-flight requests capped by workers
+Usage: python bench/drain_concurrency.py --dsn postgresql://localhost/postgres [--workers 1,2,5] [--latency 0.5]
+'''
+
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from psycopg2.extras import RealDictCursor
+
+from fake_deepseek import FakeDeepSeek
+from pg import CATEGORIES, connect, schema_dsn, apply_migrations, load_articles, load_function
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dsn', required=True)
+    parser.add_argument('--schema', default='bench_drain')
+    parser.add_argument('--workers', default='1,2,5')
+    parser.add_argument('--latency', type=float, default=0.5, help='fake DeepSeek response latency in seconds')
+    parser.add_argument('--slack', type=float, default=1.5, help='seconds allowed on top of the ideal wall time')
+    args = parser.parse_args()
+
+    fake = FakeDeepSeek(words=300, latency=args.latency).start()
+    os.environ.update({
+        'DEEPSEEK_API_URL': fake.url,
+        'DEEPSEEK_API_KEY': 'bench',
+        'LLM_RATE_PER_SECOND': '1000',
+        'LLM_BURST': '1000'
+    })
+    auto_generate = load_function('auto-generate')
+    from articles import prefetch_category_state
+    from jobs import enqueue_job
+
+    failures = []
+
+    def check(name: str, workers: int) -> None:
+        conn = connect(args.dsn, args.schema)
+        apply_migrations(conn)
+        load_articles(conn, 20, 300)
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        for category in CATEGORIES:
+            enqueue_job(cur, category)
+        category_state = prefetch_category_state(cur, CATEGORIES)
+        conn.commit()
+
+        dsn = schema_dsn(args.dsn, args.schema)
+        deadline = time.monotonic() + 60
+        fake.script()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = [
+                result
+                for worker_results in executor.map(
+                    lambda worker: auto_generate.drain_queue(dsn, f'check-{worker}', deadline, category_state, None),
+                    range(workers)
+                )
+                for result in worker_results
+            ]
+        elapsed = time.perf_counter() - start
+
+        cur.execute(
+            """SELECT COUNT(*) FILTER (WHERE status = 'succeeded') AS succeeded,
+                      MAX(attempts) AS attempts,
+                      COUNT(DISTINCT article_id) AS articles
+               FROM generation_jobs"""
+        )
+        jobs = cur.fetchone()
+        conn.close()
+
+        calls = len(CATEGORIES)
+        expected_peak = min(workers, calls)
+        ideal = math.ceil(calls / workers) * args.latency
+        problems = []
+        if sorted(result['status'] for result in results) != ['success'] * len(CATEGORIES):
+            problems.append(f"results {[result.get('message') or result['status'] for result in results]}")
+        if (jobs['succeeded'], jobs['attempts'], jobs['articles']) != (len(CATEGORIES), 1, len(CATEGORIES)):
+            problems.append(f"{jobs['succeeded']} jobs succeeded with {jobs['articles']} articles, up to {jobs['attempts']} attempts")
+        if fake.requests != calls:
+            problems.append(f'expected {calls} requests, got {fake.requests}')
+        if fake.peak != expected_peak:
+            problems.append(f'expected {expected_peak} requests in flight at peak, got {fake.peak}')
+        if elapsed > ideal + args.slack:
+            problems.append(f'took {elapsed:.2f}s, ideal {ideal:.2f}s')
+        print(
+            f"{'PASS' if not problems else 'FAIL'} {name:<24} {len(results)} jobs {fake.requests} requests "
+            f"peak {fake.peak} in flight {elapsed:6.2f}s {'; '.join(problems)}"
+        )
+        if problems:
+            failures.append(name)
+
+    for workers in [int(value) for value in args.workers.split(',')]:
+        check(f'{workers} workers', workers)
+
+    fake.stop()
+    if failures:
+        print(f"failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+'''
+End-to-end check of on-demand generation: a queued job succeeds, retries included, within the drain pass it triggers
+Usage: python bench/drain_trigger_check.py --dsn postgresql://localhost/postgres [--latency 2] [--retry-base 3]
+'''
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qsl
+
+from fake_deepseek import FakeDeepSeek, QuietServer
+from pg import connect, schema_dsn, apply_migrations, load_articles, load_function
+
+def serve_function(module, calls: list) -> QuietServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            calls.append(time.perf_counter())
+            response = module.handler({'httpMethod': 'GET', 'queryStringParameters': dict(parse_qsl(urlparse(self.path).query))}, None)
+            body = response['body'].encode('utf-8')
+            self.send_response(response['statusCode'])
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = QuietServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dsn', required=True)
+    parser.add_argument('--schema', default='bench_drain_trigger')
+    parser.add_argument('--latency', type=float, default=2.0, help='fake DeepSeek response latency in seconds')
+    parser.add_argument('--retry-base', type=int, default=3, help='JOB_RETRY_BASE_SECONDS for the retry scenario')
+    parser.add_argument('--slack', type=float, default=2.0, help='seconds allowed on top of the ideal latency')
+    args = parser.parse_args()
+
+    conn = connect(args.dsn, args.schema)
+    apply_migrations(conn)
+    load_articles(conn, 20, 300)
+    conn.close()
+
+    fake = FakeDeepSeek(words=300, latency=args.latency).start()
+    calls = []
+    os.environ.update({
+        'DATABASE_URL': schema_dsn(args.dsn, args.schema),
+        'DEEPSEEK_API_URL': fake.url,
+        'DEEPSEEK_API_KEY': 'bench',
+        'LLM_RATE_PER_SECOND': '1000',
+        'LLM_BURST': '1000',
+        'JOB_RETRY_BASE_SECONDS': str(args.retry_base),
+        'JOB_RETRY_HEADROOM_SECONDS': str(args.latency + 2),
+        'WORKER_TIME_BUDGET': '60',
+        'DB_POOL_MAX': '10'
+    })
+    auto_generate = load_function('auto-generate')
+    server = serve_function(auto_generate, calls)
+    os.environ['AUTO_GENERATE_URL'] = f'http://127.0.0.1:{server.server_address[1]}/'
+    generate_news = load_function('generate-news')
+
+    failures = []
+
+    def check(name: str, faults: list, ideal: float, attempts: int) -> None:
+        fake.script(*faults)
+        calls.clear()
+        start = time.perf_counter()
+        response = generate_news.handler({'httpMethod': 'POST', 'body': json.dumps({'category': 'IT'})}, None)
+        enqueue_s = time.perf_counter() - start
+        job = json.loads(response['body'])
+        while time.perf_counter() - start < ideal + args.slack * 5:
+            job = json.loads(generate_news.handler({'httpMethod': 'GET', 'queryStringParameters': {'job_id': str(job['job_id'])}}, None)['body'])
+            if job['status'] in ('succeeded', 'failed'):
+                break
+            time.sleep(0.1)
+        elapsed = time.perf_counter() - start
+
+        problems = []
+        if response['statusCode'] != 202:
+            problems.append(f"enqueue returned {response['statusCode']}")
+        if job['status'] != 'succeeded' or job['attempts'] != attempts:
+            problems.append(f"job {job['status']} after {job['attempts']} attempts ({job['error']})")
+        if len(calls) != 1:
+            problems.append(f'{len(calls)} drain passes triggered')
+        if elapsed > ideal + args.slack:
+            problems.append(f'took {elapsed:.2f}s, ideal {ideal:.2f}s')
+        print(
+            f"{'PASS' if not problems else 'FAIL'} {name:<26} enqueue {enqueue_s:5.2f}s  article ready {elapsed:6.2f}s "
+            f"{job['attempts']} attempts {'; '.join(problems)}"
+        )
+        if problems:
+            failures.append(name)
+
+    check('drained on enqueue', [], args.latency, 1)
+    time.sleep(1)
+    check('retried within the pass', ['status:400'], args.retry_base + args.latency, 2)
+
+    server.shutdown()
+    fake.stop()
+    if failures:
+        print(f"failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
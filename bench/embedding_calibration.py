@@ -0,0 +1,67 @@
+'''
+Calibration of SEMANTIC_SIMILARITY_THRESHOLD on same-topic and different-topic pairs from bench/topic_pairs.json
+Usage: python bench/embedding_calibration.py --dsn postgresql://localhost/postgres [--pad 0,200,600] [--background 170]
+'''
+
+import argparse
+import itertools
+import json
+import os
+import random
+
+from psycopg2.extras import RealDictCursor
+
+from corpus import synthetic_article
+from pg import ROOT, connect, apply_migrations, load_function, percentile
+
+THRESHOLDS = [0.15, 0.18, 0.2, 0.22, 0.25, 0.3, 0.35, 0.5]
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dsn', required=True)
+    parser.add_argument('--schema', default='bench_calibration')
+    parser.add_argument('--pad', default='0,200,600', help='words of shared vocabulary appended to every article')
+    parser.add_argument('--background', type=int, default=170, help='other articles counted into the document frequencies')
+    parser.add_argument('--seed', type=int, default=5)
+    args = parser.parse_args()
+
+    load_function('auto-generate')
+    from embeddings import count_stems, embed, cosine, get_similarity_threshold
+
+    with open(os.path.join(ROOT, 'bench', 'topic_pairs.json'), encoding='utf-8') as fixture:
+        topics = json.load(fixture)['topics']
+    articles = [(index, topic['category'], text) for index, topic in enumerate(topics) for text in topic['articles']]
+
+    print(f'{"pad":>4} {"pairs":>10} {"min":>6} {"p50":>6} {"p99":>6} {"max":>6}   ' + ' '.join(f'{threshold:>5}' for threshold in THRESHOLDS))
+    for pad in [int(value) for value in args.pad.split(',')]:
+        rng = random.Random(args.seed)
+        texts = [f'{text} {synthetic_article(rng, pad)}' if pad else text for _, _, text in articles]
+        background = [synthetic_article(rng, max(pad, 100)) for _ in range(args.background)]
+
+        conn = connect(args.dsn, args.schema)
+        apply_migrations(conn)
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        count_stems(cur, texts + background)
+        vectors = [embed(cur, text) for text in texts]
+        conn.close()
+
+        same, related, unrelated = [], [], []
+        for (a, (topic_a, category_a, _)), (b, (topic_b, category_b, _)) in itertools.combinations(enumerate(articles), 2):
+            similarity = cosine(vectors[a], vectors[b])
+            if topic_a == topic_b:
+                same.append(similarity)
+            elif category_a == category_b:
+                related.append(similarity)
+            else:
+                unrelated.append(similarity)
+
+        # same-topic rows show the share flagged as repeats (recall), the others the share wrongly flagged
+        for label, values in [('same', same), ('same cat', related), ('other cat', unrelated)]:
+            print(
+                f'{pad:>4} {label:>10} {min(values):6.3f} {percentile(values, 0.5):6.3f} {percentile(values, 0.99):6.3f} {max(values):6.3f}   '
+                + ' '.join(f'{sum(value >= threshold for value in values) / len(values):5.2f}' for threshold in THRESHOLDS)
+            )
+    print(f'current threshold: {get_similarity_threshold()}')
+
+if __name__ == '__main__':
+    main()
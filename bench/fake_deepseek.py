@@ -0,0 +1,172 @@
+'''
+Local stand-in for the DeepSeek chat completions API with scripted fault injection
+Faults are consumed one per request: ok, status:<code>, retry:<code>:<seconds>, hang:<seconds>, drop, stall:<seconds>, trickle:<seconds per chunk>
+Tracks the number of requests in flight and its peak since the last script(), and streams the client closed early
+Streamed chunks are chunk_size characters, or random 1..chunk_size with jitter; completion overrides the generated reply
+'''
+
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from corpus import synthetic_article
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        pass
+
+class FakeDeepSeek:
+    def __init__(self, words: int = 300, latency: float = 0.0, chunk_size: int = 400, seed: int = 3, token_latency: float = 0.0,
+                 jitter: bool = False):
+        self.words = words
+        self.latency = latency
+        self.token_latency = token_latency
+        self.chunk_size = chunk_size
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.completion = None
+        self.disconnects = 0
+        self.faults = deque()
+        self.requests = 0
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.server = QuietServer(('127.0.0.1', 0), self._handler_class())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions'
+
+    def start(self) -> 'FakeDeepSeek':
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def script(self, *faults: str) -> None:
+        with self.lock:
+            self.faults = deque(faults)
+            self.requests = 0
+            self.peak = self.active
+
+    def _next_fault(self) -> str:
+        with self.lock:
+            self.requests += 1
+            return self.faults.popleft() if self.faults else 'ok'
+
+    def _track(self, delta: int) -> None:
+        with self.lock:
+            self.active += delta
+            self.peak = max(self.peak, self.active)
+
+    def _article(self) -> dict:
+        with self.lock:
+            title = synthetic_article(self.rng, 8).rstrip('.')
+            content = synthetic_article(self.rng, self.words)
+        return {'title': title, 'content': content}
+
+    def _completion(self, messages: list) -> str:
+        if self.completion is not None:
+            return self.completion
+        return json.dumps(self._article(), ensure_ascii=False)
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send(self, status: int, body: bytes, headers: dict = None) -> None:
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                fake._track(1)
+                try:
+                    self._respond()
+                finally:
+                    fake._track(-1)
+
+            def _respond(self) -> None:
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                fault = fake._next_fault()
+                kind, _, argument = fault.partition(':')
+
+                if kind == 'drop':
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+                if kind == 'hang':
+                    time.sleep(float(argument))
+                if kind == 'status':
+                    self._send(int(argument), json.dumps({'error': {'message': f'injected {argument}'}}).encode())
+                    return
+                if kind == 'retry':
+                    code, _, seconds = argument.partition(':')
+                    self._send(int(code), b'{"error": {"message": "rate limited"}}', {'Retry-After': seconds})
+                    return
+
+                if fake.latency:
+                    time.sleep(fake.latency)
+                messages = request.get('messages') or []
+                content = fake._completion(messages)
+                usage = {
+                    'prompt_tokens': sum(len(message['content']) for message in messages) // 3,
+                    'completion_tokens': len(content) // 4,
+                    'prompt_cache_hit_tokens': len(messages[0]['content']) // 3 if messages else 0
+                }
+                if not request.get('stream') and fake.token_latency:
+                    time.sleep(usage['completion_tokens'] * fake.token_latency)
+                if not request.get('stream'):
+                    body = {'choices': [{'message': {'role': 'assistant', 'content': content}}], 'usage': usage}
+                    self._send(200, json.dumps(body, ensure_ascii=False).encode('utf-8'), {'Content-Type': 'application/json'})
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                try:
+                    index = 0
+                    while index < len(content):
+                        with fake.lock:
+                            size = fake.rng.randint(1, fake.chunk_size) if fake.jitter else fake.chunk_size
+                        if fake.token_latency:
+                            time.sleep(size / 4 * fake.token_latency)
+                        self._chunk({'choices': [{'delta': {'content': content[index:index + size]}}]})
+                        if kind == 'stall' and index == 0:
+                            time.sleep(float(argument))
+                        if kind == 'trickle':
+                            time.sleep(float(argument))
+                        index += size
+                    self._chunk({'choices': [], 'usage': usage})
+                    self._event(b'data: [DONE]\n\n')
+                    self.wfile.write(b'0\r\n\r\n')
+                except (BrokenPipeError, ConnectionResetError):
+                    with fake.lock:
+                        fake.disconnects += 1
+                    self.close_connection = True
+
+            def _chunk(self, payload: dict) -> None:
+                self._event(b'data: ' + json.dumps(payload, ensure_ascii=False).encode('utf-8') + b'\n\n')
+
+            def _event(self, data: bytes) -> None:
+                self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+                self.wfile.flush()
+
+        return Handler
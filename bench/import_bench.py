@@ -0,0 +1,79 @@
+'''
+Benchmark: cold-start import cost of every backend function (fresh interpreter per sample, python -X importtime)
+Usage: python bench/import_bench.py [--runs 10] [--function get-news]
+'''
+
+import argparse
+import glob
+import os
+import re
+import subprocess
+import sys
+import time
+
+from pg import ROOT, percentile
+
+IMPORT_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+READ_ONLY_FUNCTIONS = {'get-news', 'news'}
+HEAVY_MODULES = ('requests', 'difflib', 'urllib3', 'psycopg2.extras')
+
+def cold_import(directory: str) -> tuple:
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import index'],
+        cwd=directory,
+        capture_output=True,
+        text=True
+    )
+    wall = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f'{directory}: {completed.stderr.strip().splitlines()[-1]}')
+
+    modules = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORT_RE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2)) / 1000
+    return wall, modules
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--function', action='append')
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    directories = sorted(os.path.dirname(path) for path in glob.glob(os.path.join(ROOT, 'backend', '*', 'index.py')))
+    failures = []
+    for directory in directories:
+        name = os.path.basename(directory)
+        if args.function and name not in args.function:
+            continue
+
+        walls, totals, modules = [], [], {}
+        for _ in range(args.runs):
+            wall, modules = cold_import(directory)
+            walls.append(wall)
+            totals.append(modules.get('index', 0.0))
+
+        heavy = [module for module in HEAVY_MODULES if module in modules]
+        print(
+            f'{name:<15}: interpreter+import p50 {percentile(walls, 0.5):7.1f} ms | '
+            f'import index p50 {percentile(totals, 0.5):7.1f} ms | max {max(totals):7.1f} ms | '
+            f"heavy: {', '.join(heavy) or '-'}"
+        )
+        top = sorted(
+            ((module, cumulative) for module, cumulative in modules.items() if module != 'index' and '.' not in module),
+            key=lambda item: item[1],
+            reverse=True
+        )[:args.top]
+        print('                 ' + ' | '.join(f'{module} {cumulative:.1f} ms' for module, cumulative in top))
+
+        if name in READ_ONLY_FUNCTIONS and {'requests', 'difflib'} & set(heavy):
+            failures.append(name)
+
+    if failures:
+        sys.exit(f"read-only functions import generation dependencies: {', '.join(failures)}")
+
+if __name__ == '__main__':
+    main()
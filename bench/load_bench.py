@@ -0,0 +1,474 @@
+'''
+Load test: every backend handler in-process and through a local HTTP shim, against a disposable Postgres and a fake DeepSeek
+Reports throughput, latency percentiles, peak RSS and DB queries per request; exits 1 on regression against bench/baseline.json
+Usage: python bench/load_bench.py --dsn postgresql://localhost/postgres [--articles 10000] [--mode both] [--save-baseline]
+'''
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import psycopg2
+import psycopg2.extensions
+
+from fake_deepseek import FakeDeepSeek, QuietServer
+from pg import ROOT, CATEGORIES, connect, schema_dsn, apply_migrations, load_articles, load_function, percentile
+
+BASELINE_PATH = os.path.join(ROOT, 'bench', 'baseline.json')
+FUNCTIONS = ['get-news', 'news', 'generate-news', 'generation-metrics', 'auto-generate']
+SEARCH_TERMS = ['рынок', 'технологии', 'инвесторы', 'данные', 'игра', 'биткоин']
+CONFIG_KEYS = ['articles', 'words', 'latency', 'concurrency', 'requests', 'rounds', 'generate_runs']
+P50_SLACK_MS = 1.0
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def add(self) -> None:
+        with self.lock:
+            self.count += 1
+
+    def reset(self) -> int:
+        with self.lock:
+            count, self.count = self.count, 0
+        return count
+
+QUERIES = QueryCounter()
+_counting_cursors: Dict[type, type] = {}
+
+def counting_cursor(factory: type) -> type:
+    if factory not in _counting_cursors:
+        class CountingCursor(factory):
+            def execute(self, *args, **kwargs):
+                QUERIES.add()
+                return super().execute(*args, **kwargs)
+
+            def executemany(self, *args, **kwargs):
+                QUERIES.add()
+                return super().executemany(*args, **kwargs)
+
+            def copy_expert(self, *args, **kwargs):
+                QUERIES.add()
+                return super().copy_expert(*args, **kwargs)
+
+        _counting_cursors[factory] = CountingCursor
+    return _counting_cursors[factory]
+
+class CountingConnection(psycopg2.extensions.connection):
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get('cursor_factory') or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs['cursor_factory'] = counting_cursor(factory)
+        return super().cursor(*args, **kwargs)
+
+def count_queries() -> None:
+    connect_db = psycopg2.connect
+
+    def counting_connect(*args, **kwargs):
+        kwargs.setdefault('connection_factory', CountingConnection)
+        return connect_db(*args, **kwargs)
+
+    psycopg2.connect = counting_connect
+
+def current_rss() -> int:
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class RssSampler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = current_rss()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self) -> 'RssSampler':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stopped.set()
+        self.thread.join()
+        self.peak = max(self.peak, current_rss())
+
+def seed_views(conn, articles: int) -> None:
+    hot = max(1, articles // 100)
+    cur = conn.cursor()
+    cur.execute(
+        """INSERT INTO article_view_counts (article_id, view_count, trending_score, updated_at)
+           SELECT id, (random() * 50)::int + CASE WHEN id <= %s THEN 5000 ELSE 0 END,
+                  (random() * 10) + CASE WHEN id <= %s THEN 500 ELSE 0 END, NOW()
+           FROM news_articles""",
+        (hot, hot)
+    )
+    cur.execute('TRUNCATE category_stats')
+    cur.execute(
+        """INSERT INTO category_stats (category, article_count, total_words, total_views, latest_created_at)
+           SELECT a.category, COUNT(*), COALESCE(SUM(a.word_count), 0), COALESCE(SUM(vc.view_count), 0), MAX(a.created_at)
+           FROM news_articles a
+           LEFT JOIN article_view_counts vc ON vc.article_id = a.id
+           GROUP BY a.category"""
+    )
+    conn.commit()
+    conn.autocommit = True
+    cur.execute('VACUUM ANALYZE')
+    conn.autocommit = False
+    cur.close()
+
+def scenarios(articles: int, requests: int, generate_runs: int) -> List[Dict[str, Any]]:
+    def article_id(rng: random.Random) -> str:
+        return str(rng.randint(1, articles))
+
+    def fixed(params: Dict[str, str]) -> Callable[[random.Random], Tuple[Dict[str, str], Optional[str]]]:
+        return lambda rng: (params, None)
+
+    return [
+        {'name': 'get-news feed', 'function': 'get-news', 'method': 'GET',
+         'request': fixed({'limit': '20', 'fields': 'id,title,excerpt,category,created_at', 'format': 'columnar'}), 'expect': (200,)},
+        {'name': 'get-news category', 'function': 'get-news', 'method': 'GET',
+         'request': lambda rng: ({'category': rng.choice(CATEGORIES), 'limit': '20'}, None), 'expect': (200,)},
+        {'name': 'get-news popular', 'function': 'get-news', 'method': 'GET',
+         'request': fixed({'sort': 'popular', 'limit': '10'}), 'expect': (200,)},
+        {'name': 'get-news search', 'function': 'get-news', 'method': 'GET',
+         'request': lambda rng: ({'q': rng.choice(SEARCH_TERMS), 'limit': '10', 'format': 'columnar'}, None), 'expect': (200,)},
+        {'name': 'get-news article', 'function': 'get-news', 'method': 'GET',
+         'request': lambda rng: ({'id': article_id(rng)}, None), 'expect': (200,)},
+        {'name': 'get-news reader', 'function': 'get-news', 'method': 'GET',
+         'request': lambda rng: ({'id': article_id(rng), 'paged': '1'}, None), 'expect': (200,)},
+        {'name': 'get-news stats', 'function': 'get-news', 'method': 'GET',
+         'request': fixed({'stats': '1'}), 'expect': (200,)},
+        {'name': 'get-news views', 'function': 'get-news', 'method': 'POST',
+         'request': lambda rng: ({}, json.dumps({'article_ids': [int(article_id(rng)) for _ in range(3)]})), 'expect': (202,)},
+        {'name': 'news list', 'function': 'news', 'method': 'GET',
+         'request': fixed({}), 'expect': (200,)},
+        {'name': 'generate-news enqueue', 'function': 'generate-news', 'method': 'POST',
+         'request': lambda rng: ({}, json.dumps({'category': rng.choice(CATEGORIES)})), 'expect': (200, 202)},
+        {'name': 'generate-news status', 'function': 'generate-news', 'method': 'GET',
+         'request': fixed({'job_id': '1'}), 'expect': (200, 404)},
+        {'name': 'generation-metrics', 'function': 'generation-metrics', 'method': 'GET',
+         'request': fixed({'hours': '24'}), 'expect': (200,)},
+        {'name': 'auto-generate', 'function': 'auto-generate', 'method': 'GET',
+         'request': fixed({}), 'expect': (200,), 'requests': generate_runs, 'concurrency': 1, 'warmup': 0, 'rounds': 1}
+    ]
+
+def make_event(method: str, params: Dict[str, str], body: Optional[str], headers: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        'httpMethod': method,
+        'headers': headers,
+        'queryStringParameters': params,
+        'body': body,
+        'isBase64Encoded': False
+    }
+
+def invoke(handler: Callable, event: Dict[str, Any]) -> Tuple[int, bytes]:
+    response = handler(event, SimpleNamespace(request_id=uuid.uuid4().hex))
+    body = response.get('body') or ''
+    return response['statusCode'], base64.b64decode(body) if response.get('isBase64Encoded') else body.encode('utf-8')
+
+class InProcessClient:
+    def __init__(self, handlers: Dict[str, Callable]):
+        self.handlers = handlers
+
+    def call(self, function: str, method: str, params: Dict[str, str], body: Optional[str]) -> Tuple[int, int]:
+        event = make_event(method, params, body, {'Accept-Encoding': 'br, gzip', 'Content-Type': 'application/json'})
+        status, payload = invoke(self.handlers[function], event)
+        return status, len(payload)
+
+    def close(self) -> None:
+        pass
+
+class HandlerShim:
+    '''Serves /<function>?query by turning the HTTP request into a Cloud Functions event'''
+
+    def __init__(self, handlers: Dict[str, Callable]):
+        self.handlers = handlers
+        self.server = QuietServer(('127.0.0.1', 0), self._handler_class())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self) -> 'HandlerShim':
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self):
+        shim = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _dispatch(self) -> None:
+                url = urlsplit(self.path)
+                handler = shim.handlers.get(url.path.strip('/'))
+                if handler is None:
+                    self._send(404, b'{"error": "Unknown function"}', {'Content-Type': 'application/json'})
+                    return
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length).decode('utf-8') if length else None
+                event = make_event(self.command, dict(parse_qsl(url.query)), body, dict(self.headers.items()))
+                response = handler(event, SimpleNamespace(request_id=uuid.uuid4().hex))
+                payload = response.get('body') or ''
+                payload = base64.b64decode(payload) if response.get('isBase64Encoded') else payload.encode('utf-8')
+                self._send(response['statusCode'], payload, response.get('headers') or {})
+
+            def _send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _dispatch
+
+        return Handler
+
+class HttpClient:
+    def __init__(self, port: int):
+        self.port = port
+        self.local = threading.local()
+        self.connections: List[http.client.HTTPConnection] = []
+        self.lock = threading.Lock()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if not hasattr(self.local, 'connection'):
+            self.local.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=120)
+            with self.lock:
+                self.connections.append(self.local.connection)
+        return self.local.connection
+
+    def call(self, function: str, method: str, params: Dict[str, str], body: Optional[str]) -> Tuple[int, int]:
+        connection = self._connection()
+        path = f'/{function}' + (f'?{urlencode(params)}' if params else '')
+        headers = {'Accept-Encoding': 'br, gzip', 'Content-Type': 'application/json'}
+        connection.request(method, path, body=body.encode('utf-8') if body else None, headers=headers)
+        response = connection.getresponse()
+        return response.status, len(response.read())
+
+    def close(self) -> None:
+        for connection in self.connections:
+            connection.close()
+
+def measure(client, scenario: Dict[str, Any], calls: List[Tuple[Dict[str, str], Optional[str]]], concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: List[str] = []
+    transferred = [0]
+    lock = threading.Lock()
+
+    def worker(call: Tuple[Dict[str, str], Optional[str]]) -> None:
+        params, body = call
+        start = time.perf_counter()
+        try:
+            status, size = client.call(scenario['function'], scenario['method'], params, body)
+        except Exception as e:
+            status, size = None, 0
+            error = f'{type(e).__name__}: {e}'
+        else:
+            error = None if status in scenario['expect'] else f'status {status}'
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            transferred[0] += size
+            if error:
+                errors.append(error)
+
+    QUERIES.reset()
+    with RssSampler() as sampler:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, calls))
+        total = time.perf_counter() - start
+    queries = QUERIES.reset()
+
+    return {
+        'requests': len(calls),
+        'concurrency': concurrency,
+        'throughput': round(len(calls) / total, 1),
+        'p50_ms': round(percentile(latencies, 0.5), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'peak_rss_mb': round(sampler.peak / 1024 / 1024, 1),
+        'queries_per_request': round(queries / len(calls), 2),
+        'bytes_per_request': transferred[0] // len(calls),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None
+    }
+
+def run_scenario(client, scenario: Dict[str, Any], requests: int, concurrency: int, rounds: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    for _ in range(scenario.get('warmup', 5)):
+        params, body = scenario['request'](rng)
+        client.call(scenario['function'], scenario['method'], params, body)
+
+    measured = [
+        measure(
+            client,
+            scenario,
+            [scenario['request'](rng) for _ in range(scenario.get('requests', requests))],
+            scenario.get('concurrency', concurrency)
+        )
+        for _ in range(scenario.get('rounds', rounds))
+    ]
+    best = dict(max(measured, key=lambda result: result['throughput']))
+    best['rounds'] = len(measured)
+    best['errors'] = sum(result['errors'] for result in measured)
+    best['first_error'] = next((result['first_error'] for result in measured if result['first_error']), None)
+    best['peak_rss_mb'] = max(result['peak_rss_mb'] for result in measured)
+    return best
+
+def compare(result: Dict[str, Any], expected: Optional[Dict[str, Any]], tolerance: float) -> List[str]:
+    regressions = []
+    if result['errors']:
+        regressions.append(f"{result['errors']} failed requests ({result['first_error']})")
+    if expected is None:
+        return regressions
+    if result['throughput'] < expected['throughput'] * (1 - tolerance):
+        regressions.append(f"throughput {result['throughput']}/s < baseline {expected['throughput']}/s")
+    if result['p50_ms'] > expected['p50_ms'] * (1 + tolerance) + P50_SLACK_MS:
+        regressions.append(f"p50 {result['p50_ms']} ms > baseline {expected['p50_ms']} ms")
+    if result['peak_rss_mb'] > expected['peak_rss_mb'] * (1 + tolerance):
+        regressions.append(f"peak RSS {result['peak_rss_mb']} MiB > baseline {expected['peak_rss_mb']} MiB")
+    if result['queries_per_request'] > expected['queries_per_request'] + max(0.5, expected['queries_per_request'] * 0.1):
+        regressions.append(f"{result['queries_per_request']} queries/request > baseline {expected['queries_per_request']}")
+    return regressions
+
+def load_baseline(path: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as stored:
+        baseline = json.load(stored)
+    if baseline.get('config') != config:
+        print(f"baseline config {baseline.get('config')} differs from {config}; only failed requests are checked")
+        return {}
+    return baseline
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dsn', required=True)
+    parser.add_argument('--schema', default='bench_load')
+    parser.add_argument('--articles', type=int, default=10000, help='synthetic corpus size, 10k-1M')
+    parser.add_argument('--words', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=0.2, help='fake DeepSeek response latency in seconds')
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=3, help='measure each scenario this many times and keep the fastest round')
+    parser.add_argument('--generate-runs', type=int, default=2)
+    parser.add_argument('--mode', choices=['inprocess', 'http', 'both'], default='both')
+    parser.add_argument('--only', help='comma-separated scenario names or functions to run')
+    parser.add_argument('--reuse', action='store_true', help='keep an already loaded schema instead of reseeding it')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed relative drop in throughput or rise in p50 and peak RSS; tighten on a quiet dedicated host')
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    args = parser.parse_args()
+
+    dsn = schema_dsn(args.dsn, args.schema)
+    if not args.reuse:
+        conn = connect(args.dsn, args.schema)
+        apply_migrations(conn)
+        start = time.perf_counter()
+        load_articles(conn, args.articles, args.words)
+        seed_views(conn, args.articles)
+        conn.close()
+        print(f'loaded {args.articles} articles x {args.words} words in {time.perf_counter() - start:.1f}s')
+
+    fake = FakeDeepSeek(words=args.words, latency=args.latency).start()
+    os.environ.update({
+        'DATABASE_URL': dsn,
+        'DEEPSEEK_API_URL': fake.url,
+        'DEEPSEEK_API_KEY': 'bench',
+        'AUTO_GENERATE_URL': '',
+        'DB_POOL_MAX': str(max(args.concurrency + 2, 10))
+    })
+    count_queries()
+    handlers = {name: load_function(name).handler for name in FUNCTIONS}
+
+    from stats import refresh_trending
+    conn = psycopg2.connect(dsn)
+    cur = conn.cursor()
+    refresh_trending(cur)
+    conn.commit()
+    conn.close()
+
+    config = {key: getattr(args, key) for key in CONFIG_KEYS}
+    baseline = {} if args.save_baseline else load_baseline(args.baseline, config)
+    selected = scenarios(args.articles, args.requests, args.generate_runs)
+    if args.only:
+        wanted = set(args.only.split(','))
+        selected = [scenario for scenario in selected if scenario['name'] in wanted or scenario['function'] in wanted]
+
+    modes = ['inprocess', 'http'] if args.mode == 'both' else [args.mode]
+    results: Dict[str, Dict[str, Any]] = {}
+    regressions: List[str] = []
+    print(
+        f"{'mode':<10} {'scenario':<22} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'RSS MiB':>8} {'q/req':>6} {'KiB/req':>8} {'errors':>6}"
+    )
+    for mode in modes:
+        shim = HandlerShim(handlers).start() if mode == 'http' else None
+        client = HttpClient(shim.port) if shim else InProcessClient(handlers)
+        for index, scenario in enumerate(selected):
+            key = f"{mode}/{scenario['name']}"
+            result = run_scenario(client, scenario, args.requests, args.concurrency, args.rounds, seed=index)
+            expected = baseline.get('results', {}).get(key)
+            if expected and not result['errors'] and compare(result, expected, args.tolerance) and scenario.get('rounds', args.rounds) > 1:
+                # confirm an apparent slowdown with a second measurement before failing on noise
+                retry = run_scenario(client, scenario, args.requests, args.concurrency, args.rounds, seed=index)
+                result = min([result, retry], key=lambda measured: len(compare(measured, expected, args.tolerance)))
+            results[key] = result
+            regressions.extend(f'{key}: {regression}' for regression in compare(result, expected, args.tolerance))
+            print(
+                f"{mode:<10} {scenario['name']:<22} {result['throughput']:8.1f} {result['p50_ms']:8.2f} "
+                f"{result['p95_ms']:8.2f} {result['p99_ms']:8.2f} {result['peak_rss_mb']:8.1f} "
+                f"{result['queries_per_request']:6.2f} {result['bytes_per_request'] / 1024:8.1f} {result['errors']:6d}"
+            )
+        client.close()
+        if shim:
+            shim.stop()
+    fake.stop()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump({'config': config, 'results': results}, output, indent=2, ensure_ascii=False)
+            output.write('\n')
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    if regressions:
+        sys.exit(1)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as output:
+            json.dump({'config': config, 'results': results}, output, indent=2, ensure_ascii=False)
+            output.write('\n')
+        print(f'baseline saved to {os.path.relpath(args.baseline)}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+'''
+Benchmark: list latency and table size as history grows: unpartitioned, monthly partitions, partitions plus archive
+Usage: python bench/partition_bench.py --dsn postgresql://localhost/postgres [--months 6,12,24,48] [--per-month 500] [--archive-after 6]
+'''
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from psycopg2.extras import RealDictCursor
+
+from pg import connect, apply_migrations, load_articles, load_function, percentile
+
+LAYOUTS = ['plain', 'partitioned', 'archived']
+SCENARIOS = ['validator', 'feed', 'feed_nowindow', 'category', 'deep_page', 'article', 'old_article']
+
+def timed(samples: list, call) -> None:
+    start = time.perf_counter()
+    call()
+    samples.append((time.perf_counter() - start) * 1000)
+
+def build(args, months: int, layout: str):
+    from articles import add_months
+    from partitions import archive_partitions
+
+    conn = connect(args.dsn, f'{args.schema}_{layout}')
+    apply_migrations(conn, until='V0017' if layout == 'plain' else None)
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("SELECT date_trunc('month', LOCALTIMESTAMP) AS month, LOCALTIMESTAMP AS now")
+    row = cur.fetchone()
+    started = add_months(row['month'], -months)
+    count = months * args.per_month
+    load_articles(conn, count, args.words, started=started, spacing=(row['now'] - started) / count)
+
+    if layout == 'archived':
+        while archive_partitions(cur, months=args.archive_after, limit=1000):
+            conn.commit()
+        conn.commit()
+
+    conn.autocommit = True
+    cur.execute('VACUUM ANALYZE')
+    cur.execute(
+        """SELECT COALESCE(SUM(pg_total_relation_size(relid)), 0) AS hot,
+                  pg_total_relation_size('news_articles_archive') AS archive
+           FROM pg_partition_tree('news_articles')"""
+        if layout != 'plain' else
+        "SELECT pg_total_relation_size('news_articles') AS hot, 0 AS archive"
+    )
+    sizes = cur.fetchone()
+    cur.execute("SELECT MIN(id) AS first, MAX(id) AS last FROM news_articles")
+    ids = cur.fetchone()
+    cur.close()
+    return conn, count, sizes, ids
+
+def measure(conn, args, count: int, ids: dict, layout: str) -> dict:
+    import articles
+    from articles import LIST_FIELDS, fetch_feed, fetch_article
+    from http_cache import fetch_validator
+
+    # the id -> month index is cached per process; every layout lives in its own schema
+    articles._month_index['expires'] = 0.0
+    rng = random.Random(7)
+    cur = conn.cursor()
+    samples = {scenario: [] for scenario in SCENARIOS}
+    deep_cursor = (datetime.now() - timedelta(days=90), 2 ** 31 - 1)
+    for _ in range(args.requests):
+        # the validator reads category_stats.archived_count, added after the plain layout's migrations
+        if layout != 'plain':
+            timed(samples['validator'], lambda: fetch_validator(cur))
+        timed(samples['feed'], lambda: fetch_feed(cur, LIST_FIELDS, None, None, args.limit))
+        timed(samples['feed_nowindow'], lambda: fetch_feed(cur, LIST_FIELDS, None, None, args.limit, window=0))
+        timed(samples['category'], lambda: fetch_feed(cur, LIST_FIELDS, 'IT', None, args.limit))
+        timed(samples['deep_page'], lambda: fetch_feed(cur, LIST_FIELDS, None, deep_cursor, args.limit))
+        timed(samples['article'], lambda: fetch_article(cur, rng.randint(ids['first'], ids['last'])))
+        timed(samples['old_article'], lambda: fetch_article(cur, rng.randint(1, max(1, count // 10))))
+    cur.close()
+    return {scenario: percentile(values, 0.5) if values else float('nan') for scenario, values in samples.items()}
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dsn', required=True)
+    parser.add_argument('--schema', default='bench_partition')
+    parser.add_argument('--months', default='6,12,24,48', help='history lengths to load, in months')
+    parser.add_argument('--per-month', type=int, default=500)
+    parser.add_argument('--words', type=int, default=600)
+    parser.add_argument('--archive-after', type=int, default=6)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    load_function('get-news')
+    load_function('auto-generate')
+
+    print(f'{"months":>6} {"layout":>11} {"hot MB":>7} {"arch MB":>7} ' + ' '.join(f'{scenario:>13}' for scenario in SCENARIOS) + '  (p50 ms)')
+    for months in [int(value) for value in args.months.split(',')]:
+        for layout in LAYOUTS:
+            conn, count, sizes, ids = build(args, months, layout)
+            result = measure(conn, args, count, ids, layout)
+            conn.close()
+            print(
+                f'{months:>6} {layout:>11} {sizes["hot"] / 2 ** 20:7.1f} {sizes["archive"] / 2 ** 20:7.1f} '
+                + ' '.join(f'{result[scenario]:13.3f}' for scenario in SCENARIOS)
+            )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+'''
+Benchmark: JSON serialization time and bytes on the wire for a page of full articles
+Usage: python bench/payload_bench.py [--articles 100] [--words 5000] [--rounds 20]
+'''
+
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'shared'))
+
+import payload
+from corpus import synthetic_article
+
+COLUMNS = ['id', 'title', 'content', 'category', 'image_url', 'word_count', 'created_at', 'view_count']
+
+def build_rows(count: int, words: int) -> list:
+    rng = random.Random(7)
+    now = datetime(2025, 1, 1)
+    rows = []
+    for i in range(count):
+        content = synthetic_article(rng, words)
+        rows.append((
+            i + 1,
+            synthetic_article(rng, 8),
+            content,
+            'IT',
+            f'https://picsum.photos/seed/{i}/1200/630',
+            len(content.split()),
+            now - timedelta(minutes=i),
+            rng.randint(0, 10000)
+        ))
+    return rows
+
+def dict_rows_dumps(rows: list) -> bytes:
+    result = []
+    for row in rows:
+        article = dict(zip(COLUMNS, row))
+        result.append({
+            'id': article['id'],
+            'title': article['title'],
+            'content': article['content'],
+            'category': article['category'],
+            'image_url': article['image_url'],
+            'word_count': article['word_count'],
+            'created_at': article['created_at'].isoformat(),
+            'view_count': article['view_count']
+        })
+    return json.dumps(result).encode('utf-8')
+
+def timed(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=100)
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = build_rows(args.articles, args.words)
+    print(f'{args.articles} articles x {args.words} words, orjson: {payload.orjson is not None}, brotli: {payload.brotli is not None}')
+
+    legacy_ms = timed(lambda: dict_rows_dumps(rows), args.rounds)
+    objects_ms = timed(lambda: payload.rows_to_objects_json(COLUMNS, rows), args.rounds)
+    fast_ms = timed(lambda: payload.rows_to_json(COLUMNS, rows), args.rounds)
+    print(
+        f'serialize  json.dumps per-row dicts: {legacy_ms:8.1f} ms | rows_to_objects_json: {objects_ms:8.1f} ms | '
+        f'rows_to_json (columnar): {fast_ms:8.1f} ms'
+    )
+
+    legacy = dict_rows_dumps(rows)
+    body = payload.rows_to_json(COLUMNS, rows)
+    print(f'wire       legacy ascii-escaped JSON: {len(legacy) / 1024:9.1f} KiB')
+    print(f'           utf-8 JSON:               {len(body) / 1024:9.1f} KiB')
+
+    for encoding in payload.SUPPORTED_ENCODINGS:
+        event = {'headers': {'Accept-Encoding': encoding}}
+        compress_ms = timed(lambda: payload.compress(body, encoding), max(1, args.rounds // 4))
+        response = payload.json_response(event, body, {})
+        wire = len(base64.b64decode(response['body'])) if response['isBase64Encoded'] else len(body)
+        print(
+            f'           {encoding:<5} compressed:         {wire / 1024:9.1f} KiB '
+            f'(base64 {len(response["body"]) / 1024:.1f} KiB, {compress_ms:.1f} ms)'
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+'''
+Disposable Postgres schema for benchmarks: applies db_migrations and bulk-loads a synthetic corpus
+'''
+
+import glob
+import importlib.util
+import io
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+import psycopg2
+from psycopg2.extensions import make_dsn
+
+from corpus import synthetic_article
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CATEGORIES = ['IT', 'Криптовалюта', 'Игры', 'Финансы', 'Мир']
+
+def connect(dsn: str, schema: str):
+    conn = psycopg2.connect(dsn)
+    cur = conn.cursor()
+    cur.execute(f'DROP SCHEMA IF EXISTS {schema} CASCADE')
+    cur.execute(f'CREATE SCHEMA {schema}')
+    # extensions are per database, so pgvector lives in public and every bench schema resolves it from there
+    cur.execute('CREATE EXTENSION IF NOT EXISTS vector SCHEMA public')
+    cur.execute(f'SET search_path TO {schema}, public')
+    conn.commit()
+    cur.close()
+    return conn
+
+def schema_dsn(dsn: str, schema: str) -> str:
+    return make_dsn(dsn, options=f'-c search_path={schema},public')
+
+def apply_migrations(conn, until: Optional[str] = None) -> None:
+    cur = conn.cursor()
+    for path in sorted(glob.glob(os.path.join(ROOT, 'db_migrations', 'V*.sql'))):
+        if until and os.path.basename(path) >= until:
+            break
+        with open(path, encoding='utf-8') as migration:
+            cur.execute(migration.read())
+    conn.commit()
+    cur.close()
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return '\\N'
+    text = value.isoformat() if isinstance(value, datetime) else str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+def ensure_partitions(conn, since: datetime) -> None:
+    shared = os.path.join(ROOT, 'backend', 'shared')
+    if shared not in sys.path:
+        sys.path.insert(0, shared)
+    from psycopg2.extras import RealDictCursor
+    import partitions
+
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("SELECT relkind = 'p' AS partitioned FROM pg_class WHERE oid = 'news_articles'::regclass")
+    if cur.fetchone()['partitioned']:
+        partitions.ensure_partitions(cur, since)
+    conn.commit()
+    cur.close()
+
+def load_articles(
+    conn, count: int, words: int, seed: int = 1, batch: int = 5000,
+    started: Optional[datetime] = None, spacing: timedelta = timedelta(minutes=1),
+    article: Callable[[random.Random, int], str] = synthetic_article
+) -> None:
+    rng = random.Random(seed)
+    # by default the corpus ends an hour ago, so it spans as many monthly partitions as a live table would
+    started = started or datetime.now() - timedelta(hours=1) - spacing * count
+    ensure_partitions(conn, started)
+    cur = conn.cursor()
+    columns = ['title', 'content', 'category', 'image_url', 'word_count', 'created_at', 'excerpt', 'reading_time']
+    for offset in range(0, count, batch):
+        buffer = io.StringIO()
+        for i in range(offset, min(offset + batch, count)):
+            content = article(rng, words)
+            row = [
+                article(rng, 8),
+                content,
+                CATEGORIES[i % len(CATEGORIES)],
+                None,
+                len(content.split()),
+                started + spacing * i,
+                content[:280],
+                max(1, words // 200)
+            ]
+            buffer.write('\t'.join(_copy_value(value) for value in row) + '\n')
+        buffer.seek(0)
+        cur.copy_expert(f"COPY news_articles ({', '.join(columns)}) FROM STDIN", buffer)
+        conn.commit()
+    # the generation path keeps category_stats current; COPY bypasses it
+    cur.execute(
+        """INSERT INTO category_stats AS s (category, article_count, total_words, latest_created_at)
+           SELECT category, COUNT(*), SUM(word_count), MAX(created_at) FROM news_articles GROUP BY category
+           ON CONFLICT (category) DO UPDATE
+           SET article_count = EXCLUDED.article_count, total_words = EXCLUDED.total_words, latest_created_at = EXCLUDED.latest_created_at"""
+    )
+    cur.execute('ANALYZE news_articles')
+    conn.commit()
+    cur.close()
+
+def load_function(name: str):
+    directory = os.path.join(ROOT, 'backend', name)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(f"{name.replace('-', '_')}_index", os.path.join(directory, 'index.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
@@ -0,0 +1,75 @@
+'''
+Benchmark: SequenceMatcher plagiarism check vs MinHash/LSH lookup on synthetic Russian articles
+Usage: python bench/plagiarism_bench.py [--words 5000] [--archive 20] [--seed 42]
+'''
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'shared'))
+
+from plagiarism import minhash_signature, estimate_jaccard, lsh_buckets, get_jaccard_threshold
+from corpus import synthetic_article, mutate
+
+def sequence_matcher_check(candidate: str, archive: list) -> bool:
+    for article in archive:
+        if SequenceMatcher(None, candidate.lower(), article.lower()).ratio() > 0.7:
+            return True
+    return False
+
+def build_lsh_index(signatures: list) -> dict:
+    index = defaultdict(set)
+    for article_id, signature in enumerate(signatures):
+        for bucket in lsh_buckets(signature):
+            index[bucket].add(article_id)
+    return index
+
+def minhash_check(candidate: str, signatures: list, index: dict, threshold: float) -> bool:
+    signature = minhash_signature(candidate)
+    candidates = set()
+    for bucket in lsh_buckets(signature):
+        candidates |= index.get(bucket, set())
+    return any(estimate_jaccard(signature, signatures[i]) >= threshold for i in candidates)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--archive', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    archive = [synthetic_article(rng, args.words) for _ in range(args.archive)]
+    fresh = synthetic_article(rng, args.words)
+    near_duplicate = mutate(rng, archive[args.archive // 2], 0.05)
+    threshold = get_jaccard_threshold()
+
+    start = time.perf_counter()
+    signatures = [minhash_signature(article) for article in archive]
+    index = build_lsh_index(signatures)
+    index_time = time.perf_counter() - start
+    print(f'archive: {args.archive} articles x {args.words} words, jaccard threshold {threshold}')
+    print(f'minhash index build: {index_time * 1000:.1f} ms ({index_time / args.archive * 1000:.1f} ms/article)')
+
+    for label, candidate in (('fresh', fresh), ('near-duplicate', near_duplicate)):
+        start = time.perf_counter()
+        minhash_result = minhash_check(candidate, signatures, index, threshold)
+        minhash_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matcher_result = sequence_matcher_check(candidate, archive)
+        matcher_time = time.perf_counter() - start
+
+        print(
+            f'{label:>15}: SequenceMatcher {matcher_time * 1000:9.1f} ms -> {matcher_result} | '
+            f'MinHash/LSH {minhash_time * 1000:7.1f} ms -> {minhash_result} | '
+            f'speedup x{matcher_time / minhash_time:.0f}'
+        )
+
+if __name__ == '__main__':
+    main()
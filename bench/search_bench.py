@@ -0,0 +1,97 @@
+'''
+Benchmark: get-news full-text search (GIN) against an ILIKE scan on a Zipf-vocabulary corpus
+Usage: python bench/search_bench.py --dsn postgresql://localhost/postgres [--articles 200000] [--words 300]
+'''
+
+import argparse
+import random
+import time
+
+from corpus import topic_words, zipf_article, zipf_vocabulary
+from pg import connect, apply_migrations, load_articles, load_function, percentile
+
+def timed_query(cur, sql: str, params: list) -> tuple:
+    start = time.perf_counter()
+    cur.execute(sql, tuple(params))
+    rows = cur.fetchall()
+    return (time.perf_counter() - start) * 1000, rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dsn', required=True)
+    parser.add_argument('--schema', default='bench_search')
+    parser.add_argument('--articles', type=int, default=200000)
+    parser.add_argument('--words', type=int, default=300)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--ilike-queries', type=int, default=10, help='terms also run as an ILIKE scan (each reads the whole table)')
+    args = parser.parse_args()
+
+    get_news = load_function('get-news')
+    conn = connect(args.dsn, args.schema)
+    apply_migrations(conn)
+
+    start = time.perf_counter()
+    load_articles(conn, args.articles, args.words, article=zipf_article)
+    print(f'loaded {args.articles} articles x {args.words} words in {time.perf_counter() - start:.1f} s', flush=True)
+
+    rng = random.Random(3)
+    vocabulary, _ = zipf_vocabulary()
+    # readers search for what an article is about (one or two of its topic words); common words show the worst case
+    topical = [' '.join(rng.sample(topic_words(rng.randrange(1000)), rng.randint(1, 2))) for _ in range(args.queries)]
+    common = [rng.choice(vocabulary[20:200]) for _ in range(args.queries // 5)]
+    cur = conn.cursor()
+    cur.execute('ANALYZE news_articles')
+    conn.commit()
+
+    for kind, terms, sort in [
+        ('topical', topical, 'rank'), ('topical', topical, 'date'), ('common', common, 'rank'), ('common', common, 'date')
+    ]:
+        first_page, next_page, ilike, matched = [], [], [], []
+        for index, term in enumerate(terms):
+            sql, params, selected = get_news.build_search_query(get_news.LIST_FIELDS, term, sort, None, None, args.limit)
+            elapsed, rows = timed_query(cur, sql, params)
+            first_page.append(elapsed)
+
+            if len(rows) > args.limit:
+                last = rows[args.limit - 1]
+                sort_value = last[selected.index('rank' if sort == 'rank' else 'created_at')]
+                after = (sort_value, last[selected.index('id')])
+                sql, params, _ = get_news.build_search_query(get_news.LIST_FIELDS, term, sort, None, after, args.limit)
+                next_page.append(timed_query(cur, sql, params)[0])
+
+            if sort == 'date' and index < args.ilike_queries:
+                patterns = [f'%{word}%' for word in term.split()]
+                elapsed, _ = timed_query(
+                    cur,
+                    f"SELECT id, title FROM news_articles WHERE {' AND '.join(['(title ILIKE %s OR content ILIKE %s)'] * len(patterns))}"
+                    ' ORDER BY created_at DESC LIMIT %s',
+                    [value for pattern in patterns for value in (pattern, pattern)] + [args.limit]
+                )
+                ilike.append(elapsed)
+            if sort == 'date':
+                cur.execute(
+                    "SELECT COUNT(*) FROM news_articles WHERE search_vector @@ websearch_to_tsquery('russian', %s)",
+                    (term,)
+                )
+                matched.append(cur.fetchone()[0])
+            conn.commit()
+
+        report = [('first page', first_page), ('next page', next_page)]
+        if ilike:
+            report.append(('ILIKE scan', ilike))
+        for label, samples in report:
+            if samples:
+                print(
+                    f'{kind:<7} sort={sort:<4} {label:<10}: p50 {percentile(samples, 0.5):8.1f} ms | '
+                    f'p95 {percentile(samples, 0.95):8.1f} ms | max {max(samples):8.1f} ms',
+                    flush=True
+                )
+        if matched:
+            print(f'{kind:<7} terms match a median of {percentile(matched, 0.5):.0f} of {args.articles} articles', flush=True)
+
+    cur.close()
+    conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+'''
+Benchmark: semantic duplicate lookup via pgvector HNSW against an exact category scan and the old latest-500 unnest
+Usage: python bench/semantic_bench.py --dsn postgresql://localhost/postgres [--articles 20000] [--months 15] [--queries 50]
+'''
+
+import argparse
+import random
+import subprocess
+import sys
+import time
+
+from psycopg2.extras import RealDictCursor
+
+from corpus import mutate, zipf_article
+from pg import ROOT, connect, schema_dsn, apply_migrations, load_articles, load_function, percentile
+
+EXACT_QUERY = '''SELECT id FROM (
+        SELECT id, embedding <#> %(query)s::vector AS distance FROM news_articles WHERE category = %(category)s AND embedding IS NOT NULL
+        UNION ALL
+        SELECT id, embedding <#> %(query)s::vector FROM news_articles_archive WHERE category = %(category)s AND embedding IS NOT NULL
+    ) candidates
+    ORDER BY distance
+    LIMIT %(limit)s'''
+
+# the lookup before V0021: the latest articles of the category, scored by unnesting their REAL[] embeddings
+RECENT_QUERY = '''SELECT a.id
+    FROM (
+        SELECT id, embedding::real[] AS embedding FROM news_articles
+        WHERE category = %(category)s AND embedding IS NOT NULL
+        ORDER BY created_at DESC, id DESC
+        LIMIT 500
+    ) a
+    CROSS JOIN LATERAL (SELECT SUM(e * q) AS similarity FROM unnest(a.embedding, %(query)s::real[]) AS t(e, q)) s
+    ORDER BY s.similarity DESC
+    LIMIT %(limit)s'''
+
+def timed(cur, sql: str, params) -> tuple:
+    start = time.perf_counter()
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+    return (time.perf_counter() - start) * 1000, [row['id'] for row in rows]
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dsn', required=True)
+    parser.add_argument('--schema', default='bench_semantic')
+    parser.add_argument('--articles', type=int, default=20000)
+    parser.add_argument('--words', type=int, default=300)
+    parser.add_argument('--months', type=int, default=15, help='history length; months past ARCHIVE_AFTER_MONTHS are archived')
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    load_function('auto-generate')
+    from articles import add_months, decompress_content
+    from embeddings import embed, find_similar, get_similarity_threshold
+    from partitions import archive_partitions
+
+    conn = connect(args.dsn, args.schema)
+    apply_migrations(conn)
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("SELECT date_trunc('month', LOCALTIMESTAMP) AS month, LOCALTIMESTAMP AS now")
+    row = cur.fetchone()
+    started = add_months(row['month'], -args.months)
+    load_articles(conn, args.articles, args.words, started=started, spacing=(row['now'] - started) / args.articles, article=zipf_article)
+    while archive_partitions(cur, limit=5000):
+        conn.commit()
+    conn.commit()
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, f'{ROOT}/scripts/rebuild_embeddings.py', '--dsn', schema_dsn(args.dsn, args.schema)], check=True)
+    print(f'rebuild_embeddings: {time.perf_counter() - start:.1f} s for {args.articles} articles')
+    conn.autocommit = True
+    cur.execute('VACUUM ANALYZE')
+    conn.autocommit = False
+    cur.execute('SELECT COUNT(*) AS archived FROM news_articles_archive')
+    archived = cur.fetchone()['archived']
+
+    rng = random.Random(9)
+    cur.execute('SELECT id, title, content, category FROM news_articles ORDER BY random() LIMIT %s', (args.queries,))
+    queries = [(row['category'], embed(cur, f"{row['title']}\n{mutate(rng, row['content'], 0.2)}"), row['id']) for row in cur.fetchall()]
+    cur.execute('SELECT id, title, content, category FROM news_articles_archive ORDER BY random() LIMIT %s', (args.queries // 5,))
+    queries += [(row['category'], embed(cur, f"{row['title']}\n{mutate(rng, decompress_content(row['content']), 0.2)}"), row['id']) for row in cur.fetchall()]
+    queries += [(category, embed(cur, zipf_article(rng, args.words)), None) for category in ['IT', 'Мир'] * (args.queries // 2)]
+    conn.commit()
+
+    indexed, exact, recent = [], [], []
+    top1 = overlap = own_found = own_recent = own_total = 0
+    for category, query, own in queries:
+        start = time.perf_counter()
+        found = [match['id'] for match in find_similar(cur, query, category, args.limit)]
+        indexed.append((time.perf_counter() - start) * 1000)
+        conn.commit()
+        params = {'query': query, 'category': category, 'limit': args.limit}
+        elapsed, expected = timed(cur, EXACT_QUERY, params)
+        exact.append(elapsed)
+        elapsed, latest = timed(cur, RECENT_QUERY, params)
+        recent.append(elapsed)
+        conn.commit()
+        top1 += bool(found) and found[0] == expected[0]
+        overlap += len(set(found) & set(expected))
+        if own is not None:
+            own_total += 1
+            own_found += bool(found) and found[0] == own
+            own_recent += bool(latest) and latest[0] == own
+
+    for label, samples in [('HNSW find_similar', indexed), ('exact category scan', exact), ('latest 500 unnest', recent)]:
+        print(f'{label:<20}: p50 {percentile(samples, 0.5):7.1f} ms | p95 {percentile(samples, 0.95):7.1f} ms | max {max(samples):7.1f} ms')
+    print(
+        f'{len(queries)} queries over {args.articles} articles ({archived} archived): top-1 equals exact {top1}/{len(queries)}, '
+        f'recall@{args.limit} {overlap / (args.limit * len(queries)):.2f}; reworded article found first: '
+        f'HNSW {own_found}/{own_total}, latest 500 {own_recent}/{own_total} (threshold {get_similarity_threshold()})'
+    )
+
+    cur.close()
+    conn.close()
+
+if __name__ == '__main__':
+    main()
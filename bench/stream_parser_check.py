@@ -0,0 +1,123 @@
+'''
+Streaming parser check: randomly chunked streams parse like the plain response; a duplicate abort closes the stream
+Usage: python bench/stream_parser_check.py [--trials 40] [--fuzz 500] [--seed 11]
+'''
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from corpus import synthetic_article
+from fake_deepseek import FakeDeepSeek
+from pg import ROOT
+
+TRICKY = ['"', '\\', '\n', '\t', '\r', '/', '\b', '\f', '«', '»', '—', '…', '🚀', '₽', '{', '}', '[', ']', ',', ':', '```']
+
+def tricky_text(rng: random.Random, words: int) -> str:
+    parts = synthetic_article(rng, words).split(' ')
+    for _ in range(max(1, words // 10)):
+        parts.insert(rng.randrange(len(parts) + 1), rng.choice(TRICKY))
+    return ' '.join(parts)
+
+def tricky_article(rng: random.Random, words: int) -> dict:
+    return {'title': tricky_text(rng, 8), 'content': tricky_text(rng, words)}
+
+def encode(rng: random.Random, value) -> str:
+    text = json.dumps(value, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2]))
+    if rng.random() < 0.3:
+        text = f'```json\n{text}\n```'
+    return text
+
+def split_randomly(rng: random.Random, text: str) -> list:
+    chunks = []
+    index = 0
+    while index < len(text):
+        size = rng.randint(1, 12)
+        chunks.append(text[index:index + size])
+        index += size
+    return chunks
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trials', type=int, default=40, help='articles streamed over HTTP per parser')
+    parser.add_argument('--fuzz', type=int, default=500, help='articles fed in-process in chunks of 1-12 characters')
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    fake = FakeDeepSeek(chunk_size=64, jitter=True, seed=args.seed).start()
+    os.environ.update({
+        'DEEPSEEK_API_URL': fake.url,
+        'DEEPSEEK_API_KEY': 'test',
+        'LLM_RATE_PER_SECOND': '1000',
+        'LLM_BURST': '1000'
+    })
+    sys.path.insert(0, os.path.join(ROOT, 'backend', 'shared'))
+    from deepseek import ArticleStreamParser, StreamAborted, generate_with_deepseek
+    from plagiarism import make_duplicate_guard
+
+    rng = random.Random(args.seed)
+    failures = []
+
+    def report(name: str, problems: list, detail: str) -> None:
+        print(f"{'PASS' if not problems else 'FAIL'} {name:<28} {detail} {'; '.join(problems[:3])}")
+        if problems:
+            failures.append(name)
+
+    problems = []
+    for trial in range(args.fuzz):
+        article = tricky_article(rng, rng.randint(20, 200))
+        stream_parser = ArticleStreamParser()
+        for chunk in split_randomly(rng, encode(rng, article)):
+            stream_parser.feed(chunk)
+        if stream_parser.finish() != article:
+            problems.append(f'article {trial} differs')
+
+    report('in-process random chunks', problems, f'{args.fuzz} articles')
+
+    problems = []
+    for trial in range(args.trials):
+        article = tricky_article(rng, rng.randint(50, 500))
+        fake.completion = encode(rng, article)
+        streamed = generate_with_deepseek('IT', [], stream=True)
+        plain = generate_with_deepseek('IT', [], stream=False)
+        if (streamed['title'], streamed['content']) != (plain['title'], plain['content']):
+            problems.append(f'article {trial}: streamed and plain parses differ')
+        elif (plain['title'], plain['content']) != (article['title'], article['content']):
+            problems.append(f'article {trial}: parse differs from the encoded article')
+    report('streamed == plain article', problems, f'{args.trials} articles')
+
+    article = tricky_article(rng, 3000)
+    fake.completion = encode(rng, article)
+    chunks = len(fake.completion) / 32
+    fake.script('trickle:0.01')
+    guard = make_duplicate_guard(None, [article['title']], check_every=10 ** 9)
+    start = time.perf_counter()
+    try:
+        generate_with_deepseek('IT', [], should_abort=guard, stream=True)
+        outcome = 'completed'
+    except StreamAborted as e:
+        outcome = str(e)
+    elapsed = time.perf_counter() - start
+    waited = 0.0
+    while (fake.disconnects < 1 or fake.active) and waited < 5:
+        time.sleep(0.05)
+        waited += 0.05
+    problems = []
+    if not outcome.startswith('Title repeats'):
+        problems.append(f'expected a duplicate-title abort, got {outcome[:60]!r}')
+    if elapsed > chunks * 0.01 / 4:
+        problems.append(f'took {elapsed:.2f}s of a ~{chunks * 0.01:.1f}s stream')
+    if fake.disconnects != 1 or fake.active:
+        problems.append(f'server saw {fake.disconnects} closed streams, {fake.active} still open')
+    report('duplicate abort closes stream', problems, f'{elapsed:.2f}s, server saw {fake.disconnects} closed stream(s)')
+
+    fake.stop()
+    if failures:
+        print(f"failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+'''
+Benchmark: concurrent article view events, hot-row UPDATE counter vs the get-news write-behind view buffer
+Usage: python bench/views_bench.py --dsn postgresql://localhost/postgres [--events 20000] [--threads 64]
+'''
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from pg import connect, schema_dsn, apply_migrations, load_articles, load_function, percentile
+
+def view_stream(count: int, articles: int, hot: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    return [rng.randint(1, hot) if rng.random() < 0.8 else rng.randint(1, articles) for _ in range(count)]
+
+def run(label: str, events: list, threads: int, record) -> None:
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(article_id: int) -> None:
+        start = time.perf_counter()
+        record(article_id)
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, events))
+    total = time.perf_counter() - start
+    print(
+        f'{label:<14}: {len(events) / total:9.0f} events/s | p50 {percentile(latencies, 0.5):7.2f} ms | '
+        f'p95 {percentile(latencies, 0.95):7.2f} ms | p99 {percentile(latencies, 0.99):7.2f} ms'
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dsn', required=True)
+    parser.add_argument('--schema', default='bench_views')
+    parser.add_argument('--articles', type=int, default=1000)
+    parser.add_argument('--hot', type=int, default=20)
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=64)
+    args = parser.parse_args()
+
+    conn = connect(args.dsn, args.schema)
+    apply_migrations(conn)
+    load_articles(conn, args.articles, 50)
+    dsn = schema_dsn(args.dsn, args.schema)
+    os.environ['DATABASE_URL'] = dsn
+    os.environ.setdefault('DB_POOL_MAX', str(args.threads))
+    get_news = load_function('get-news')
+    import views
+
+    events = view_stream(args.events, args.articles, args.hot)
+    local = threading.local()
+
+    def hot_row_update(article_id: int) -> None:
+        if not hasattr(local, 'conn'):
+            local.conn = psycopg2.connect(dsn)
+        cur = local.conn.cursor()
+        cur.execute('UPDATE news_articles SET view_count = view_count + 1 WHERE id = %s', (article_id,))
+        local.conn.commit()
+        cur.close()
+
+    def buffered_view(article_id: int) -> None:
+        response = get_news.handler({'httpMethod': 'POST', 'body': json.dumps({'article_id': article_id})}, None)
+        assert response['statusCode'] == 202, response
+
+    run('hot-row UPDATE', events, args.threads, hot_row_update)
+    run('write-behind', events, args.threads, buffered_view)
+
+    print(f'left buffered : {sum(views.take_buffer().values())} views once every request returned')
+    flush_conn = psycopg2.connect(dsn)
+    cur = flush_conn.cursor()
+    start = time.perf_counter()
+    views.rollup_views(cur)
+    flush_conn.commit()
+    print(f'final rollup  : {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    cur.execute('SELECT COALESCE(SUM(view_count), 0) FROM article_view_counts')
+    counted = cur.fetchone()[0]
+    cur.execute('SELECT COUNT(*) FROM article_views')
+    pending = cur.fetchone()[0]
+    print(f'views counted : {counted} of {len(events)} ({pending} delta rows pending)')
+    cur.close()
+    flush_conn.close()
+    conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+-- Store a MinHash signature per article for near-duplicate detection
+ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS minhash BIGINT[];
+
+-- LSH bucket index: one row per (band, bucket) of every article signature
+CREATE TABLE IF NOT EXISTS article_lsh_buckets (
+    band SMALLINT NOT NULL,
+    bucket BIGINT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES news_articles(id) ON DELETE CASCADE,
+    PRIMARY KEY (band, bucket, article_id)
+);
+
+-- Create index for cleaning up buckets of a single article
+CREATE INDEX IF NOT EXISTS idx_lsh_buckets_article_id ON article_lsh_buckets(article_id);
@@ -0,0 +1,5 @@
+-- Keyset pagination on (created_at, id): category-filtered pages become an index range scan
+CREATE INDEX IF NOT EXISTS idx_news_articles_category_created_id ON news_articles(category, created_at DESC, id DESC);
+
+-- Same ordering for the unfiltered feed
+CREATE INDEX IF NOT EXISTS idx_news_articles_created_id ON news_articles(created_at DESC, id DESC);
@@ -0,0 +1,31 @@
+-- Summary columns computed once at write time so list queries never read the TOASTed content
+ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS excerpt TEXT;
+ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS preview TEXT;
+ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS reading_time INTEGER;
+
+ALTER TABLE news ADD COLUMN IF NOT EXISTS excerpt TEXT;
+ALTER TABLE news ADD COLUMN IF NOT EXISTS preview TEXT;
+ALTER TABLE news ADD COLUMN IF NOT EXISTS reading_time INTEGER;
+
+-- Backfill existing rows: strip heading lines and markdown markup, cut at a word boundary
+UPDATE news_articles AS a SET
+    excerpt = CASE WHEN length(p.plain) > 280 THEN regexp_replace(LEFT(p.plain, 281), '\s+\S*$', '') || '…' ELSE p.plain END,
+    preview = CASE WHEN length(p.plain) > 1000 THEN regexp_replace(LEFT(p.plain, 1001), '\s+\S*$', '') || '…' ELSE p.plain END,
+    reading_time = GREATEST(1, CEIL(COALESCE(a.word_count, 0) / 200.0))::INTEGER
+FROM (
+    SELECT id, trim(regexp_replace(regexp_replace(regexp_replace(content, '^\s*#{1,6}\s+[^\n]*$', '', 'gn'), '[*_`~>]+', '', 'g'), '\s+', ' ', 'g')) AS plain
+    FROM news_articles
+    WHERE excerpt IS NULL
+) AS p
+WHERE a.id = p.id;
+
+UPDATE news AS a SET
+    excerpt = CASE WHEN length(p.plain) > 280 THEN regexp_replace(LEFT(p.plain, 281), '\s+\S*$', '') || '…' ELSE p.plain END,
+    preview = CASE WHEN length(p.plain) > 1000 THEN regexp_replace(LEFT(p.plain, 1001), '\s+\S*$', '') || '…' ELSE p.plain END,
+    reading_time = GREATEST(1, CEIL(COALESCE(a.word_count, 0) / 200.0))::INTEGER
+FROM (
+    SELECT id, trim(regexp_replace(regexp_replace(regexp_replace(content, '^\s*#{1,6}\s+[^\n]*$', '', 'gn'), '[*_`~>]+', '', 'g'), '\s+', ' ', 'g')) AS plain
+    FROM news
+    WHERE excerpt IS NULL
+) AS p
+WHERE a.id = p.id;
@@ -0,0 +1,26 @@
+-- Durable work queue for article generation, drained by workers with FOR UPDATE SKIP LOCKED
+CREATE TABLE IF NOT EXISTS generation_jobs (
+    id SERIAL PRIMARY KEY,
+    category VARCHAR(50) NOT NULL CHECK (category IN ('IT', 'Криптовалюта', 'Игры', 'Финансы', 'Мир')),
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    progress VARCHAR(50),
+    title TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at TIMESTAMP,
+    locked_by VARCHAR(100),
+    article_id INTEGER REFERENCES news_articles(id),
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create index for claiming the next runnable job
+CREATE INDEX IF NOT EXISTS idx_generation_jobs_queued ON generation_jobs(run_after, id) WHERE status = 'queued';
+
+-- At most one pending job per category, so overlapping triggers cannot duplicate work
+CREATE UNIQUE INDEX IF NOT EXISTS idx_generation_jobs_active_category ON generation_jobs(category) WHERE status IN ('queued', 'running');
+
+-- Link log entries to the job that produced them
+ALTER TABLE generation_log ADD COLUMN IF NOT EXISTS job_id INTEGER REFERENCES generation_jobs(id);
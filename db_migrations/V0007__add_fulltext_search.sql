@@ -0,0 +1,9 @@
+-- Russian full-text search vector maintained by Postgres: title weighted above body
+ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(content, '')), 'B')
+    ) STORED;
+
+-- Create GIN index for @@ matching
+CREATE INDEX IF NOT EXISTS idx_news_articles_search_vector ON news_articles USING GIN(search_vector);
@@ -0,0 +1,25 @@
+-- Append-only log of buffered view deltas: writers only insert, no hot-row contention on news_articles
+CREATE TABLE IF NOT EXISTS article_views (
+    id BIGSERIAL PRIMARY KEY,
+    article_id INTEGER NOT NULL,
+    views INTEGER NOT NULL CHECK (views > 0),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Aggregated view counts, folded in from article_views by the periodic rollup
+CREATE TABLE IF NOT EXISTS article_view_counts (
+    article_id INTEGER PRIMARY KEY REFERENCES news_articles(id) ON DELETE CASCADE,
+    view_count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create index for the popular feed keyset
+CREATE INDEX IF NOT EXISTS idx_article_view_counts_popular ON article_view_counts(view_count DESC, article_id DESC);
+
+-- Create index for the list ETag validator
+CREATE INDEX IF NOT EXISTS idx_article_view_counts_updated_at ON article_view_counts(updated_at);
+
+-- Carry over counts already stored on the articles
+INSERT INTO article_view_counts (article_id, view_count)
+SELECT id, view_count FROM news_articles WHERE view_count > 0
+ON CONFLICT (article_id) DO NOTHING;
@@ -0,0 +1,2 @@
+-- Store an L2-normalized hashed term vector (float4) per article for semantic novelty checks
+ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS embedding REAL[];
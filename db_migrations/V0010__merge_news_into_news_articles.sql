@@ -0,0 +1,30 @@
+-- Merge the legacy news table into news_articles so every function reads one table
+INSERT INTO news_articles (title, content, category, image_url, word_count, created_at, view_count, excerpt, preview, reading_time)
+SELECT n.title, n.content, n.category, n.image_url, COALESCE(n.word_count, 0), n.created_at, 0, n.excerpt, n.preview, n.reading_time
+FROM news n
+WHERE NOT EXISTS (
+    SELECT 1 FROM news_articles a WHERE a.title = n.title AND a.category = n.category
+);
+
+-- Carry legacy view counts over to the aggregated counters
+INSERT INTO article_view_counts (article_id, view_count)
+SELECT a.id, SUM(n.view_count)
+FROM news n
+JOIN news_articles a ON a.title = n.title AND a.category = n.category
+WHERE n.view_count > 0
+GROUP BY a.id
+ON CONFLICT (article_id) DO UPDATE
+SET view_count = article_view_counts.view_count + EXCLUDED.view_count;
+
+-- Keep the old rows for rollback under a new name, without the indexes that shadowed news_articles' index names
+DROP INDEX IF EXISTS idx_news_category;
+DROP INDEX IF EXISTS idx_news_created_at;
+ALTER TABLE news RENAME TO news_legacy;
+
+-- Read-only compatibility view for anything still selecting from news
+CREATE VIEW news AS
+SELECT a.id, a.title, a.category, a.content, a.image_url, a.created_at, a.word_count,
+       COALESCE(vc.view_count, 0) AS view_count, a.excerpt, a.preview, a.reading_time
+FROM news_articles a
+LEFT JOIN article_view_counts vc ON vc.article_id = a.id;
+
@@ -0,0 +1,20 @@
+-- Paid LLM completions keyed by normalized prompt hash, with token usage per call
+CREATE TABLE IF NOT EXISTS llm_completions (
+    id SERIAL PRIMARY KEY,
+    prompt_hash CHAR(64) NOT NULL,
+    job_id INTEGER REFERENCES generation_jobs(id),
+    model VARCHAR(50) NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    total_tokens INTEGER,
+    prompt_cache_hit_tokens INTEGER,
+    prompt_cache_miss_tokens INTEGER,
+    article_id INTEGER REFERENCES news_articles(id) ON DELETE SET NULL,
+    consumed_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create index for reusing a completion that was paid for but never stored as an article
+CREATE INDEX IF NOT EXISTS idx_llm_completions_unconsumed ON llm_completions(prompt_hash, id DESC) WHERE consumed_at IS NULL;
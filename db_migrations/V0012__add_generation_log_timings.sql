@@ -0,0 +1,14 @@
+-- Per-stage durations (milliseconds) and token counts for every generation attempt
+ALTER TABLE generation_log ADD COLUMN IF NOT EXISTS total_ms REAL;
+ALTER TABLE generation_log ADD COLUMN IF NOT EXISTS db_connect_ms REAL;
+ALTER TABLE generation_log ADD COLUMN IF NOT EXISTS fetch_existing_ms REAL;
+ALTER TABLE generation_log ADD COLUMN IF NOT EXISTS llm_request_ms REAL;
+ALTER TABLE generation_log ADD COLUMN IF NOT EXISTS parse_ms REAL;
+ALTER TABLE generation_log ADD COLUMN IF NOT EXISTS similarity_check_ms REAL;
+ALTER TABLE generation_log ADD COLUMN IF NOT EXISTS insert_ms REAL;
+ALTER TABLE generation_log ADD COLUMN IF NOT EXISTS prompt_tokens INTEGER;
+ALTER TABLE generation_log ADD COLUMN IF NOT EXISTS completion_tokens INTEGER;
+ALTER TABLE generation_log ADD COLUMN IF NOT EXISTS prompt_cache_hit_tokens INTEGER;
+
+-- Create index for windowed metrics queries
+CREATE INDEX IF NOT EXISTS idx_generation_log_created_at ON generation_log(created_at DESC);
@@ -0,0 +1,8 @@
+-- Rendered article covers keyed by the SHA-256 of the full-size WebP, one row per responsive width
+CREATE TABLE IF NOT EXISTS cover_images (
+    digest CHAR(64) NOT NULL,
+    width SMALLINT NOT NULL,
+    content BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (digest, width)
+);
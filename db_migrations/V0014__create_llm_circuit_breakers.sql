@@ -0,0 +1,10 @@
+-- Circuit breaker state for LLM providers, shared by every function invocation
+CREATE TABLE IF NOT EXISTS llm_circuit_breakers (
+    name VARCHAR(50) PRIMARY KEY,
+    state VARCHAR(20) NOT NULL DEFAULT 'closed' CHECK (state IN ('closed', 'open', 'half_open')),
+    failures INTEGER NOT NULL DEFAULT 0,
+    opened_until TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO llm_circuit_breakers (name) VALUES ('deepseek') ON CONFLICT (name) DO NOTHING;
@@ -0,0 +1,34 @@
+-- Time-decayed view score, folded in by the view rollup (half-life 12 hours)
+ALTER TABLE article_view_counts ADD COLUMN IF NOT EXISTS trending_score DOUBLE PRECISION NOT NULL DEFAULT 0;
+
+UPDATE article_view_counts vc
+SET trending_score = vc.view_count * exp(GREATEST(-ln(2) * EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - a.created_at)) / 43200, -700))
+FROM news_articles a
+WHERE a.id = vc.article_id;
+
+-- Per-category aggregates maintained incrementally by the generation path and the view rollup
+CREATE TABLE IF NOT EXISTS category_stats (
+    category VARCHAR(50) PRIMARY KEY,
+    article_count BIGINT NOT NULL DEFAULT 0,
+    total_words BIGINT NOT NULL DEFAULT 0,
+    total_views BIGINT NOT NULL DEFAULT 0,
+    latest_created_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO category_stats (category, article_count, total_words, total_views, latest_created_at)
+SELECT a.category, COUNT(*), COALESCE(SUM(a.word_count), 0), COALESCE(SUM(vc.view_count), 0), MAX(a.created_at)
+FROM news_articles a
+LEFT JOIN article_view_counts vc ON vc.article_id = a.id
+GROUP BY a.category
+ON CONFLICT (category) DO NOTHING;
+
+-- Precomputed trending lists: scope 'all' plus one list per category
+CREATE TABLE IF NOT EXISTS trending_articles (
+    scope VARCHAR(50) NOT NULL,
+    position SMALLINT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES news_articles(id) ON DELETE CASCADE,
+    score DOUBLE PRECISION NOT NULL,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (scope, position)
+);
@@ -0,0 +1,12 @@
+-- Article content split at its subheadings, read by the paged article endpoint
+CREATE TABLE IF NOT EXISTS article_sections (
+    article_id INTEGER NOT NULL REFERENCES news_articles(id) ON DELETE CASCADE,
+    ordinal SMALLINT NOT NULL,
+    heading TEXT,
+    body TEXT NOT NULL,
+    word_count INTEGER NOT NULL,
+    PRIMARY KEY (article_id, ordinal)
+);
+
+-- Number of stored sections; NULL until the article has been split
+ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS section_count SMALLINT;
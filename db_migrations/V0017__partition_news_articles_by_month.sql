@@ -0,0 +1,84 @@
+-- Range-partition news_articles by month. The existing table is attached as one legacy partition
+-- (no rows are copied); new months get their own partitions, created ahead by the auto-generate maintenance.
+
+-- Foreign keys cannot reference a partitioned table by id alone; dependent rows of archived articles are removed by the archiver
+ALTER TABLE article_lsh_buckets DROP CONSTRAINT IF EXISTS article_lsh_buckets_article_id_fkey;
+ALTER TABLE generation_jobs DROP CONSTRAINT IF EXISTS generation_jobs_article_id_fkey;
+ALTER TABLE article_view_counts DROP CONSTRAINT IF EXISTS article_view_counts_article_id_fkey;
+ALTER TABLE llm_completions DROP CONSTRAINT IF EXISTS llm_completions_article_id_fkey;
+ALTER TABLE trending_articles DROP CONSTRAINT IF EXISTS trending_articles_article_id_fkey;
+ALTER TABLE article_sections DROP CONSTRAINT IF EXISTS article_sections_article_id_fkey;
+
+DROP VIEW IF EXISTS news;
+
+-- Move the current table and its index names out of the way
+ALTER TABLE news_articles RENAME TO news_articles_legacy;
+ALTER TABLE news_articles_legacy DROP CONSTRAINT news_articles_pkey;
+ALTER INDEX idx_news_articles_category_created_id RENAME TO idx_news_articles_legacy_category_created_id;
+ALTER INDEX idx_news_articles_created_id RENAME TO idx_news_articles_legacy_created_id;
+ALTER INDEX idx_news_articles_search_vector RENAME TO idx_news_articles_legacy_search_vector;
+
+-- The partition key has to be part of the primary key and cannot be NULL
+UPDATE news_articles_legacy SET created_at = TIMESTAMP '1970-01-01' WHERE created_at IS NULL;
+ALTER TABLE news_articles_legacy ALTER COLUMN created_at SET NOT NULL;
+
+CREATE TABLE news_articles (
+    LIKE news_articles_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED INCLUDING STORAGE,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Same indexes as before; the legacy partition's existing indexes are attached to them instead of being rebuilt
+CREATE INDEX idx_news_articles_category_created_id ON news_articles(category, created_at DESC, id DESC);
+CREATE INDEX idx_news_articles_created_id ON news_articles(created_at DESC, id DESC);
+CREATE INDEX idx_news_articles_search_vector ON news_articles USING GIN(search_vector);
+
+ALTER SEQUENCE news_articles_id_seq OWNED BY news_articles.id;
+
+-- Legacy rows keep one partition up to the end of their newest month; monthly partitions follow, two months ahead
+DO $$
+DECLARE
+    bound TIMESTAMP;
+    month TIMESTAMP;
+BEGIN
+    SELECT date_trunc('month', MAX(created_at)) + INTERVAL '1 month' INTO bound FROM news_articles_legacy;
+    IF bound IS NULL THEN
+        DROP TABLE news_articles_legacy;
+        bound := date_trunc('month', LOCALTIMESTAMP);
+    ELSE
+        EXECUTE format('ALTER TABLE news_articles ATTACH PARTITION news_articles_legacy FOR VALUES FROM (MINVALUE) TO (%L)', bound);
+    END IF;
+
+    month := bound;
+    WHILE month <= date_trunc('month', LOCALTIMESTAMP) + INTERVAL '2 months' LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF news_articles FOR VALUES FROM (%L) TO (%L)',
+            'news_articles_p' || to_char(month, 'YYYYMM'), month, month + INTERVAL '1 month'
+        );
+        month := month + INTERVAL '1 month';
+    END LOOP;
+END $$;
+
+-- Cold tier: months older than ARCHIVE_AFTER_MONTHS are moved here with zlib-compressed content and without
+-- search vectors, embeddings, signatures or sections; archived articles stay readable by id
+CREATE TABLE IF NOT EXISTS news_articles_archive (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    image_url TEXT,
+    word_count INTEGER NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    excerpt TEXT,
+    reading_time INTEGER,
+    content BYTEA NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Content is already compressed; keep TOAST from trying again
+ALTER TABLE news_articles_archive ALTER COLUMN content SET STORAGE EXTERNAL;
+
+-- Read-only compatibility view, recreated over the partitioned table
+CREATE VIEW news AS
+SELECT a.id, a.title, a.category, a.content, a.image_url, a.created_at, a.word_count,
+       COALESCE(vc.view_count, 0) AS view_count, a.excerpt, a.preview, a.reading_time
+FROM news_articles a
+LEFT JOIN article_view_counts vc ON vc.article_id = a.id;
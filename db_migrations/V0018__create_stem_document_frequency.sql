@@ -0,0 +1,13 @@
+-- Number of articles containing each embedding stem, so vocabulary shared by most articles is down-weighted (IDF);
+-- the row with an empty stem holds the number of articles counted
+CREATE TABLE IF NOT EXISTS stem_document_frequency (
+    stem VARCHAR(16) PRIMARY KEY,
+    documents INTEGER NOT NULL
+);
+
+-- Whether the article's stems are already included in stem_document_frequency
+ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS stems_counted BOOLEAN NOT NULL DEFAULT FALSE;
+CREATE INDEX IF NOT EXISTS idx_news_articles_stems_uncounted ON news_articles(id) WHERE NOT stems_counted;
+
+-- Embeddings without IDF weights are not comparable with the new ones; they are recomputed once every article is counted
+UPDATE news_articles SET embedding = NULL WHERE embedding IS NOT NULL;
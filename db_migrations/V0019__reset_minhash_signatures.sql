@@ -0,0 +1,4 @@
+-- MinHash permutations moved to the 2^31 - 1 prime, so stored signatures and their LSH buckets no longer match new ones;
+-- auto-generate maintenance recomputes them for every article with a NULL minhash
+DELETE FROM article_lsh_buckets;
+UPDATE news_articles SET minhash = NULL WHERE minhash IS NOT NULL;
@@ -0,0 +1,6 @@
+-- Archived articles keep their MinHash signature and LSH buckets, so new articles are still checked against them
+ALTER TABLE news_articles_archive ADD COLUMN IF NOT EXISTS minhash BIGINT[];
+
+-- Articles (live or archived) still waiting for a signature after V0019
+CREATE INDEX IF NOT EXISTS idx_news_articles_minhash_missing ON news_articles(id) WHERE minhash IS NULL;
+CREATE INDEX IF NOT EXISTS idx_news_articles_archive_minhash_missing ON news_articles_archive(id) WHERE minhash IS NULL;
@@ -0,0 +1,12 @@
+-- Embeddings are L2-normalized, so the inner product is the cosine; an HNSW index over it lets the semantic check cover
+-- the whole category history instead of unnesting REAL[] for the latest rows
+CREATE EXTENSION IF NOT EXISTS vector;
+
+ALTER TABLE news_articles ALTER COLUMN embedding TYPE vector(512) USING embedding::vector(512);
+CREATE INDEX IF NOT EXISTS idx_news_articles_embedding ON news_articles USING hnsw (embedding vector_ip_ops);
+
+-- Archived articles keep their embedding, so new articles are still checked against them
+ALTER TABLE news_articles_archive ADD COLUMN IF NOT EXISTS embedding vector(512);
+CREATE INDEX IF NOT EXISTS idx_news_articles_archive_embedding ON news_articles_archive USING hnsw (embedding vector_ip_ops);
+CREATE INDEX IF NOT EXISTS idx_news_articles_embedding_missing ON news_articles(id) WHERE embedding IS NULL;
+CREATE INDEX IF NOT EXISTS idx_news_articles_archive_embedding_missing ON news_articles_archive(id) WHERE embedding IS NULL;
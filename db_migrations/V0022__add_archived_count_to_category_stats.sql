@@ -0,0 +1,8 @@
+-- Articles moved to the archive per category: article_count - archived_count is the live row count, so HTTP validators read
+-- category_stats instead of counting the partitioned table on every request
+ALTER TABLE category_stats ADD COLUMN IF NOT EXISTS archived_count BIGINT NOT NULL DEFAULT 0;
+
+UPDATE category_stats s
+SET archived_count = a.archived
+FROM (SELECT category, COUNT(*) AS archived FROM news_articles_archive GROUP BY category) a
+WHERE s.category = a.category;
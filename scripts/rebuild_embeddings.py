@@ -0,0 +1,31 @@
+'''
+One-off rebuild of stem counts and embeddings for live and archived articles that have none; safe to re-run
+Usage: python scripts/rebuild_embeddings.py --dsn postgresql://localhost/postgres [--batch 500]
+'''
+
+import argparse
+import os
+import sys
+import time
+
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'shared'))
+from embeddings import rebuild_embeddings
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--batch', type=int, default=500, help='articles embedded and committed per transaction')
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error('--dsn or DATABASE_URL is required')
+
+    conn = psycopg2.connect(args.dsn)
+    start = time.perf_counter()
+    embedded = rebuild_embeddings(conn, args.batch)
+    conn.close()
+    print(f'embedded {embedded} articles in {time.perf_counter() - start:.1f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+const COVER_WIDTHS = [320, 640, 1200];
+
+export function coverSrcSet(imageUrl: string): string | undefined {
+  if (!imageUrl.includes('cover=')) {
+    return undefined;
+  }
+  return COVER_WIDTHS
+    .map((width) => `${imageUrl.replace(/([?&]w=)\d+/, `$1${width}`)} ${width}w`)
+    .join(', ');
+}
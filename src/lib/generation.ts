@@ -0,0 +1,48 @@
+const GENERATE_NEWS_URL = 'https://functions.poehali.dev/2cddb11e-55d0-46d8-b217-654842785853';
+
+export interface GenerationJob {
+  job_id: number;
+  category: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  progress: string | null;
+  title: string | null;
+  attempts: number;
+  max_attempts: number;
+  article_id: number | null;
+  error: string | null;
+}
+
+export async function queueGeneration(category: string): Promise<GenerationJob> {
+  const response = await fetch(GENERATE_NEWS_URL, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ category })
+  });
+  const data = await response.json();
+  if (!response.ok) {
+    throw new Error(data.error || 'Не удалось поставить генерацию в очередь');
+  }
+  return data;
+}
+
+export async function waitForGeneration(
+  jobId: number,
+  onUpdate?: (job: GenerationJob) => void,
+  intervalMs = 5000,
+  timeoutMs = 15 * 60 * 1000
+): Promise<GenerationJob> {
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    const response = await fetch(`${GENERATE_NEWS_URL}?job_id=${jobId}`);
+    const job: GenerationJob = await response.json();
+    if (!response.ok) {
+      throw new Error((job as unknown as { error?: string }).error || 'Не удалось получить статус генерации');
+    }
+    onUpdate?.(job);
+    if (job.status === 'succeeded' || job.status === 'failed') {
+      return job;
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+  throw new Error('Генерация заняла слишком много времени');
+}
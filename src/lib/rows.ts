@@ -0,0 +1,13 @@
+export interface ColumnarRows {
+  columns: string[];
+  rows: unknown[][];
+}
+
+export function decodeRows<T>(data: ColumnarRows | T[]): T[] {
+  if (Array.isArray(data)) {
+    return data;
+  }
+  return data.rows.map((row) =>
+    Object.fromEntries(data.columns.map((column, index) => [column, row[index]])) as T
+  );
+}
@@ -6,6 +6,7 @@ import { useToast } from '@/hooks/use-toast';
 import { Loader2 } from 'lucide-react';
 import Icon from '@/components/ui/icon';
 import { useNavigate } from 'react-router-dom';
+import { queueGeneration, waitForGeneration } from '@/lib/generation';
 
 const CATEGORIES = ['IT', 'Криптовалюта', 'Игры', 'Финансы', 'Мир'];
 
@@ -18,23 +19,16 @@ export default function Admin() {
   const handleGenerate = async () => {
     setIsGenerating(true);
     try {
-      const response = await fetch('https://functions.poehali.dev/2cddb11e-55d0-46d8-b217-654842785853', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ category: selectedCategory }),
-      });
-
-      const data = await response.json();
+      const job = await queueGeneration(selectedCategory);
+      const result = await waitForGeneration(job.job_id);
 
-      if (!response.ok) {
-        throw new Error(data.error || 'Ошибка генерации');
+      if (result.status !== 'succeeded') {
+        throw new Error(result.error || 'Ошибка генерации');
       }
 
       toast({
         title: 'Новость создана!',
-        description: `Сгенерирована новость: "${data.title}" (${data.word_count} слов)`,
+        description: `Сгенерирована новость: "${result.title}"`,
       });
     } catch (error) {
       toast({
@@ -8,18 +8,45 @@ import { Input } from '@/components/ui/input';
 
 import Icon from '@/components/ui/icon';
 import { useToast } from '@/hooks/use-toast';
+import { queueGeneration, waitForGeneration } from '@/lib/generation';
+import { coverSrcSet } from '@/lib/covers';
+import { decodeRows } from '@/lib/rows';
 
 interface NewsArticle {
   id: number;
   title: string;
   category: string;
-  content: string;
+  excerpt?: string;
+  content?: string;
   image_url: string;
   created_at: string;
   word_count: number;
   view_count: number;
+  snippet?: string;
 }
 
+interface CategoryStats {
+  category: string;
+  article_count: number;
+  total_words: number;
+  total_views: number;
+  latest_created_at: string | null;
+}
+
+interface NewsStats {
+  categories: CategoryStats[];
+  trending: NewsArticle[];
+}
+
+const GET_NEWS_URL = 'https://functions.poehali.dev/af8bded5-e442-41d9-b777-b7b7c0f5a349';
+
+const renderSnippet = (snippet: string) =>
+  snippet.split(/(<mark>.*?<\/mark>)/g).map((part, index) =>
+    part.startsWith('<mark>')
+      ? <mark key={index} className="bg-[#1EAEDB]/30 text-white rounded px-0.5">{part.slice(6, -7)}</mark>
+      : part
+  );
+
 const categories = [
   { name: 'Все', value: 'all', icon: 'Newspaper' },
   { name: 'IT', value: 'IT', icon: 'Code' },
@@ -31,6 +58,7 @@ const categories = [
 
 export default function Index() {
   const [news, setNews] = useState<NewsArticle[]>([]);
+  const [stats, setStats] = useState<NewsStats | null>(null);
   const [filteredNews, setFilteredNews] = useState<NewsArticle[]>([]);
   const [selectedCategory, setSelectedCategory] = useState('all');
   const [searchQuery, setSearchQuery] = useState('');
@@ -43,9 +71,9 @@ export default function Index() {
   const loadNews = async () => {
     setLoading(true);
     try {
-      const response = await fetch('https://functions.poehali.dev/af8bded5-e442-41d9-b777-b7b7c0f5a349');
+      const response = await fetch(`${GET_NEWS_URL}?format=columnar`);
       if (response.ok) {
-        const data = await response.json();
+        const data = decodeRows<NewsArticle>(await response.json());
         setNews(data);
         setFilteredNews(data);
       }
@@ -56,6 +84,31 @@ export default function Index() {
     }
   };
 
+  const loadStats = async () => {
+    try {
+      const response = await fetch(`${GET_NEWS_URL}?stats=1`);
+      if (response.ok) {
+        setStats(await response.json());
+      }
+    } catch (error) {
+      console.error('Failed to load stats:', error);
+    }
+  };
+
+  const categoryCount = (value: string) => {
+    if (!stats) {
+      return null;
+    }
+    const rows = value === 'all' ? stats.categories : stats.categories.filter(row => row.category === value);
+    return rows.reduce((total, row) => total + row.article_count, 0);
+  };
+
+  useEffect(() => {
+    loadStats();
+    const interval = setInterval(loadStats, 60000);
+    return () => clearInterval(interval);
+  }, []);
+
   useEffect(() => {
     loadNews();
     const interval = setInterval(loadNews, 30000);
@@ -63,45 +116,49 @@ export default function Index() {
   }, []);
 
   useEffect(() => {
-    let filtered = news;
-    
-    if (selectedCategory !== 'all') {
-      filtered = filtered.filter(article => article.category === selectedCategory);
+    const query = searchQuery.trim();
+    if (!query) {
+      setFilteredNews(selectedCategory === 'all' ? news : news.filter(article => article.category === selectedCategory));
+      return;
     }
-    
-    if (searchQuery) {
-      filtered = filtered.filter(article => 
-        article.title.toLowerCase().includes(searchQuery.toLowerCase()) ||
-        article.content.toLowerCase().includes(searchQuery.toLowerCase())
-      );
-    }
-    
-    setFilteredNews(filtered);
+
+    const timeout = setTimeout(async () => {
+      const params = new URLSearchParams({ q: query, format: 'columnar' });
+      if (selectedCategory !== 'all') {
+        params.set('category', selectedCategory);
+      }
+      try {
+        const response = await fetch(`${GET_NEWS_URL}?${params}`);
+        if (response.ok) {
+          setFilteredNews(decodeRows<NewsArticle>(await response.json()));
+        }
+      } catch (error) {
+        console.error('Failed to search news:', error);
+      }
+    }, 300);
+    return () => clearTimeout(timeout);
   }, [selectedCategory, searchQuery, news]);
 
   const handleGenerateNews = async () => {
     setGenerating(true);
     try {
-      const response = await fetch('https://functions.poehali.dev/2cddb11e-55d0-46d8-b217-654842785853', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ 
-          category: selectedCategory === 'all' ? 'IT' : selectedCategory 
-        })
+      const job = await queueGeneration(selectedCategory === 'all' ? 'IT' : selectedCategory);
+      toast({
+        title: "Генерация запущена",
+        description: `Задача #${job.job_id} поставлена в очередь`,
       });
 
-      if (response.ok) {
-        const newArticle = await response.json();
-        setNews(prev => [newArticle, ...prev]);
+      const result = await waitForGeneration(job.job_id);
+      if (result.status === 'succeeded') {
+        await loadNews();
         toast({
           title: "Новость сгенерирована!",
-          description: `Статья "${newArticle.title}" успешно создана`,
+          description: `Статья "${result.title}" успешно создана`,
         });
       } else {
-        const error = await response.json();
         toast({
           title: "Ошибка генерации",
-          description: error.error || "Не удалось сгенерировать новость",
+          description: result.error || "Не удалось сгенерировать новость",
           variant: "destructive"
         });
       }
@@ -191,11 +248,36 @@ export default function Index() {
               >
                 <Icon name={cat.icon as any} size={16} className="mr-2" />
                 {cat.name}
+                {categoryCount(cat.value) !== null && (
+                  <span className="ml-2 text-xs opacity-70">{categoryCount(cat.value)}</span>
+                )}
               </TabsTrigger>
             ))}
           </TabsList>
         </Tabs>
 
+        {stats && stats.trending.length > 0 && !searchQuery.trim() && (
+          <div className="mb-8">
+            <h2 className="text-lg font-semibold text-white mb-3 flex items-center gap-2">
+              <Icon name="Flame" className="text-[#1EAEDB]" size={20} />
+              В тренде
+            </h2>
+            <div className="flex flex-wrap gap-2">
+              {stats.trending.slice(0, 5).map((article) => (
+                <Button
+                  key={article.id}
+                  variant="outline"
+                  onClick={() => navigate(`/news/${article.id}`)}
+                  className="border-white/10 bg-white/5 text-gray-300 hover:bg-white/10 hover:text-white max-w-xs truncate"
+                >
+                  <Icon name="Eye" size={14} className="mr-2 flex-shrink-0" />
+                  <span className="truncate">{article.title}</span>
+                </Button>
+              ))}
+            </div>
+          </div>
+        )}
+
         {loading ? (
           <div className="flex items-center justify-center py-20">
             <Icon name="Loader2" className="animate-spin text-[#1EAEDB]" size={48} />
@@ -223,6 +305,8 @@ export default function Index() {
                     >
                       <img 
                         src={article.image_url} 
+                        srcSet={coverSrcSet(article.image_url)}
+                        sizes="128px"
                         alt={article.title}
                         className="w-full h-full object-cover hover:scale-105 transition-transform"
                       />
@@ -254,7 +338,7 @@ export default function Index() {
                       </span>
                     </div>
                     <p className="text-gray-400 text-sm line-clamp-2 mb-3">
-                      {article.content}
+                      {article.snippet ? renderSnippet(article.snippet) : (article.excerpt ?? article.content)}
                     </p>
                     <Button
                       onClick={() => navigate(`/news/${article.id}`)}
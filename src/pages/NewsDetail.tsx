@@ -5,34 +5,81 @@ import { Card, CardContent } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import Icon from '@/components/ui/icon';
 import { Loader2 } from 'lucide-react';
+import { coverSrcSet } from '@/lib/covers';
+
+interface ArticleSection {
+  ordinal: number;
+  heading: string | null;
+  body: string;
+}
 
 interface NewsArticle {
   id: number;
   title: string;
-  content: string;
   category: string;
   image_url: string;
   word_count: number;
   view_count: number;
   created_at: string;
+  section_count: number;
+  sections: ArticleSection[];
+  next_section: number | null;
 }
 
+const GET_NEWS_URL = 'https://functions.poehali.dev/af8bded5-e442-41d9-b777-b7b7c0f5a349';
+const SECTIONS_PER_REQUEST = 4;
+
 export default function NewsDetail() {
   const { id } = useParams();
   const navigate = useNavigate();
   const [article, setArticle] = useState<NewsArticle | null>(null);
+  const [sections, setSections] = useState<ArticleSection[]>([]);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    fetchArticle();
+    let cancelled = false;
+    fetchArticle(() => cancelled);
+    return () => {
+      cancelled = true;
+    };
   }, [id]);
 
-  const fetchArticle = async () => {
-    try {
-      const response = await fetch('https://functions.poehali.dev/d2ba2aca-bc92-410e-a5ed-a3f14a22b0dc');
+  const fetchRemainingSections = async (articleId: number, start: number, total: number, isCancelled: () => boolean) => {
+    for (let next = start; next < total && !isCancelled(); next += SECTIONS_PER_REQUEST) {
+      const end = Math.min(next + SECTIONS_PER_REQUEST, total) - 1;
+      const response = await fetch(`${GET_NEWS_URL}?id=${articleId}&sections=${next}-${end}`);
+      if (!response.ok) {
+        return;
+      }
       const data = await response.json();
-      const found = data.news.find((n: NewsArticle) => n.id === Number(id));
-      setArticle(found || null);
+      if (!isCancelled()) {
+        setSections((loaded) => [...loaded, ...data.sections]);
+      }
+    }
+  };
+
+  const fetchArticle = async (isCancelled: () => boolean) => {
+    try {
+      const response = await fetch(`${GET_NEWS_URL}?id=${id}&paged=1`);
+      const data = response.ok ? await response.json() : null;
+      if (isCancelled()) {
+        return;
+      }
+      setArticle(data);
+      setSections(data ? data.sections : []);
+      if (data) {
+        setLoading(false);
+        if (data.next_section !== null) {
+          fetchRemainingSections(data.id, data.next_section, data.section_count, isCancelled)
+            .catch((error) => console.error('Error fetching sections:', error));
+        }
+        fetch(GET_NEWS_URL, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ article_id: data.id }),
+          keepalive: true
+        }).catch(() => undefined);
+      }
     } catch (error) {
       console.error('Error fetching article:', error);
     } finally {
@@ -76,6 +123,8 @@ export default function NewsDetail() {
         <Card className="bg-white/10 border-white/20 backdrop-blur-lg overflow-hidden">
           <img
             src={article.image_url}
+            srcSet={coverSrcSet(article.image_url)}
+            sizes="(max-width: 768px) 100vw, 896px"
             alt={article.title}
             className="w-full h-96 object-cover"
           />
@@ -111,11 +160,23 @@ export default function NewsDetail() {
             </div>
 
             <div className="prose prose-invert prose-lg max-w-none">
-              {article.content.split('\n').map((paragraph, index) => (
-                <p key={index} className="text-white/90 mb-4 leading-relaxed">
-                  {paragraph}
-                </p>
+              {sections.map((section) => (
+                <section key={section.ordinal}>
+                  {section.heading && (
+                    <h2 className="text-2xl font-semibold text-white mt-8 mb-4">{section.heading}</h2>
+                  )}
+                  {section.body.split('\n').map((paragraph, index) => (
+                    <p key={index} className="text-white/90 mb-4 leading-relaxed">
+                      {paragraph}
+                    </p>
+                  ))}
+                </section>
               ))}
+              {sections.length < article.section_count && (
+                <div className="flex justify-center py-4">
+                  <Loader2 className="h-6 w-6 animate-spin text-white/60" />
+                </div>
+              )}
             </div>
           </CardContent>
         </Card>